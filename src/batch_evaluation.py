@@ -0,0 +1,98 @@
+import numpy as np
+
+from .poker_main import DECK, LookupEvaluator
+
+
+class BatchEvaluator(object):
+    """
+    Vectorised version of LookupEvaluator for scoring millions of hands per call.
+
+    Hands are given as an (N, k) integer array of card indices (Card.index, 0..51), -1 can be used to pad hands
+    with fewer than k cards. The LookupEvaluator tables are copied into NumPy arrays once: the rank table becomes a
+    sorted array of keys searched with np.searchsorted and the flush table an 8192 entry array indexed by suit mask.
+    """
+
+    rank_keys = None
+    rank_strengths = None
+    flush_table = None
+
+    # per card index arrays, the extra last entry is the padding card -1
+    card_keys = np.array(LookupEvaluator.card_keys + [0], dtype=np.int64)
+    card_suits = np.array([card.index // 13 for card in DECK] + [-1], dtype=np.int64)
+    card_bits = np.array([1 << card.value - 2 for card in DECK] + [0], dtype=np.int64)
+
+    @classmethod
+    def build_tables(cls):
+        """
+        Copies the LookupEvaluator tables into NumPy arrays
+        """
+        LookupEvaluator.ensure_tables()
+
+        keys = np.fromiter(LookupEvaluator.rank_table.keys(), dtype=np.int64)
+        strengths = np.fromiter(LookupEvaluator.rank_table.values(), dtype=np.int64)
+        order = np.argsort(keys)
+
+        cls.rank_keys = keys[order]
+        cls.rank_strengths = strengths[order]
+        cls.flush_table = np.array(LookupEvaluator.flush_table, dtype=np.int64)
+
+    @classmethod
+    def evaluate(cls, cards):
+        """
+        Evaluates a batch of hands
+
+        Args:
+            cards: array_like
+                (N, k) integer card indices, k is at most 7 and -1 marks a missing card, every hand needs at
+                least 5 cards
+
+        Returns:
+            tuple of (N,) int64 strengths (comparable with LookupEvaluator.evaluate) and (N,) hand classes
+        """
+        if cls.rank_keys is None:
+            cls.build_tables()
+
+        cards = np.asarray(cards, dtype=np.int64)
+        if cards.ndim != 2:
+            raise ValueError("cards must be a 2-dimensional array of card indices")
+        if cards.shape[1] > 7:
+            raise ValueError("at most 7 cards per hand can be evaluated in a batch")
+        number_of_cards = (cards >= 0).sum(axis=1)
+        if len(cards) and number_of_cards.min() < 5:
+            row = int(number_of_cards.argmin())
+            raise ValueError(f"every hand needs at least 5 cards, hand {row} has {number_of_cards[row]}")
+
+        keys = cls.card_keys[cards].sum(axis=1)
+        positions = np.searchsorted(cls.rank_keys, keys)
+        positions[positions == len(cls.rank_keys)] = 0
+        if not np.array_equal(cls.rank_keys[positions], keys):
+            raise ValueError("hands must not contain more than four cards of a value")
+        strengths = cls.rank_strengths[positions]
+
+        suits = cls.card_suits[cards]
+        bits = cls.card_bits[cards]
+        for suit in range(4):
+            suit_masks = np.bitwise_or.reduce(np.where(suits == suit, bits, 0), axis=1)
+            np.maximum(strengths, cls.flush_table[suit_masks], out=strengths)
+
+        return strengths, strengths >> 20
+
+
+def hands_to_array(hands, size=7):
+    """
+    Converts lists of Card objects into the index array used by BatchEvaluator
+
+    Args:
+        hands: list
+            lists of Card objects
+        size: int
+            number of columns, shorter hands are padded with -1
+
+    Returns:
+        (N, size) int64 array
+    """
+    array = np.full((len(hands), size), -1, dtype=np.int64)
+    for i, hand in enumerate(hands):
+        array[i, : len(hand)] = [card.index for card in hand]
+    return array
+
@@ -0,0 +1,100 @@
+import numpy as np
+
+from .poker_main import BETTING_ROUND_INDEX, ActionType, Strategy
+
+
+def decision_arrays(decisions):
+    """
+    Packs DecisionState objects into NumPy arrays, one entry per decision
+
+    Returns:
+        dict of (N,) int64 arrays for pot, to_call, current_bet, called_for, stack, min_raise, max_raise,
+        betting_round (index into poker_main.BETTING_ROUNDS) and players (number still in the hand), an (N, 7)
+        int64 array board of card indices padded with -1, an (N, 2) int64 array cards and an (N, 4) bool array
+        legal indexed by ActionType
+    """
+    number_of_decisions = len(decisions)
+    arrays = {
+        name: np.fromiter(
+            (getattr(decision, name) for decision in decisions), dtype=np.int64, count=number_of_decisions
+        )
+        for name in ("pot", "to_call", "current_bet", "called_for", "stack", "min_raise", "max_raise")
+    }
+    arrays["betting_round"] = np.fromiter(
+        (BETTING_ROUND_INDEX[decision.betting_round] for decision in decisions),
+        dtype=np.int64,
+        count=number_of_decisions,
+    )
+    arrays["players"] = np.fromiter(
+        (len(decision.stacks) for decision in decisions), dtype=np.int64, count=number_of_decisions
+    )
+
+    board = np.full((number_of_decisions, 7), -1, dtype=np.int64)
+    cards = np.full((number_of_decisions, 2), -1, dtype=np.int64)
+    legal = np.zeros((number_of_decisions, len(ActionType)), dtype=bool)
+    for i, decision in enumerate(decisions):
+        board[i, : len(decision.board)] = [card.index for card in decision.board]
+        cards[i, : len(decision.cards)] = [card.index for card in decision.cards]
+        legal[i, list(decision.legal_actions)] = True
+    arrays["board"] = board
+    arrays["cards"] = cards
+    arrays["legal"] = legal
+    return arrays
+
+
+class ArrayStrategy(Strategy):
+    """
+    A Strategy deciding whole batches with NumPy
+
+    Subclasses implement decide_arrays, which gets the arrays of decision_arrays and returns an (N,) array of
+    ActionType values and an (N,) array of raise amounts in chip units. Single decisions are decided as a batch of
+    one, so these strategies are best played with InteractivePoker.play_tables.
+    """
+
+    def decide_arrays(self, arrays):
+        raise NotImplementedError
+
+    def decide(self, decision):
+        return self.decide_batch([decision])[0]
+
+    def decide_batch(self, decisions):
+        if not decisions:
+            return []
+        kinds, amounts = self.decide_arrays(decision_arrays(decisions))
+        return [(ActionType(kind), amount) for kind, amount in zip(kinds.tolist(), amounts.tolist())]
+
+
+class PotOddsStrategy(ArrayStrategy):
+    """
+    Checks whenever it can, calls when the price is at most max_price of the pot after calling and folds otherwise
+
+    With a raise_fraction it bets or raises to that fraction of the pot on top of the call whenever the price is
+    below half of max_price.
+    """
+
+    def __init__(self, max_price=0.25, raise_fraction=0.0):
+        self.max_price = max_price
+        self.raise_fraction = raise_fraction
+
+    def decide_arrays(self, arrays):
+        to_call = arrays["to_call"]
+        price = to_call / np.maximum(arrays["pot"] + to_call, 1)
+        legal = arrays["legal"]
+
+        kinds = np.where(
+            to_call == 0,
+            ActionType.CHECK,
+            np.where(price <= self.max_price, ActionType.CALL, ActionType.FOLD),
+        )
+        amounts = np.zeros_like(to_call)
+
+        if self.raise_fraction:
+            target = arrays["current_bet"] + to_call + (self.raise_fraction * (arrays["pot"] + to_call)).astype(
+                np.int64
+            )
+            amounts = np.clip(target, arrays["min_raise"], arrays["max_raise"])
+            raising = legal[:, ActionType.RAISE] & (price <= self.max_price / 2)
+            kinds = np.where(raising, ActionType.RAISE, kinds)
+            amounts = np.where(raising, amounts, 0)
+
+        return kinds, amounts
@@ -0,0 +1,155 @@
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .poker_main import DECK, HAND_CLASS_NAMES, BoardAnalysis, LookupEvaluator, Player
+
+# exact number of hands of each class (index = hand class) for all 5 and 7 card hands
+EXPECTED_FREQUENCIES = {
+    5: [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 36, 4],
+    7: [23294460, 58627800, 31433400, 6461620, 6180020, 4047644, 3473184, 224848, 37260, 4324],
+}
+
+
+def lookup_shard(number_of_cards, first, second):
+    """
+    Counts hand classes of all hands whose two lowest card indices are first and second with LookupEvaluator
+
+    The remaining cards are streamed as prefixes plus a last card so the rank key, card mask and suit counts are
+    built incrementally and each hand costs one table lookup (two if a suit reaches five cards).
+    """
+    LookupEvaluator.ensure_tables()
+    rank_table = LookupEvaluator.rank_table
+    flush_table = LookupEvaluator.flush_table
+    card_keys = LookupEvaluator.card_keys
+
+    counts = [0] * 10
+    base_key = card_keys[first] + card_keys[second]
+    base_mask = 1 << first | 1 << second
+    base_suit_counts = [0] * 4
+    base_suit_counts[first // 13] += 1
+    base_suit_counts[second // 13] += 1
+
+    for prefix in itertools.combinations(range(second + 1, 52), number_of_cards - 3):
+        key = base_key
+        mask = base_mask
+        suit_counts = list(base_suit_counts)
+        for i in prefix:
+            key += card_keys[i]
+            mask |= 1 << i
+            suit_counts[i // 13] += 1
+        flush_suits = [suit for suit in range(4) if suit_counts[suit] >= 5]
+
+        for i in range(prefix[-1] + 1 if prefix else second + 1, 52):
+            strength = rank_table[key + card_keys[i]]
+            suit = i // 13
+            if flush_suits or suit_counts[suit] == 4:
+                for flush_suit in set(flush_suits + [suit]):
+                    flush = flush_table[(mask | 1 << i) >> 13 * flush_suit & 0x1FFF]
+                    if flush > strength:
+                        strength = flush
+            counts[strength >> 20] += 1
+
+    return counts
+
+
+def frequency_shard(task):
+    """
+    Counts the hand classes of one shard, run inside the worker processes
+
+    Args:
+        task: tuple
+            (number of cards, lowest card index, second lowest card index, engine)
+
+    Returns:
+        list of counts indexed by hand class
+    """
+    number_of_cards, first, second, engine = task
+    if engine == "lookup":
+        return lookup_shard(number_of_cards, first, second)
+
+    counts = [0] * 10
+    for rest in itertools.combinations(range(second + 1, 52), number_of_cards - 2):
+        cards = [DECK[first], DECK[second]] + [DECK[i] for i in rest]
+        player = Player("enumeration", cards=cards)
+        BoardAnalysis([player], [], engine=engine)
+        counts[player.hand_ranking.hand_class] += 1
+    return counts
+
+
+def hand_frequencies(number_of_cards=7, workers=None, engine="lookup"):
+    """
+    Exact number of hands of each class over all hands of 5 to 7 cards
+
+    The hands are split into 1326 shards by their two lowest cards and streamed shard by shard across a process
+    pool, nothing is materialised beyond one shard's prefixes. The counts can be checked against
+    EXPECTED_FREQUENCIES to validate an evaluator engine.
+
+    Args:
+        number_of_cards: int
+            5, 6 or 7
+        workers: int
+            number of worker processes, defaults to the number of cores
+        engine: str
+            'lookup' for the LookupEvaluator tables or a BoardAnalysis engine name ('legacy' is much slower)
+
+    Returns:
+        list of counts indexed by hand class
+    """
+    if number_of_cards not in (5, 6, 7):
+        raise ValueError("Only 5, 6 and 7 card hands can be enumerated")
+    if engine != "lookup" and engine not in BoardAnalysis.engines:
+        raise ValueError(f"Unknown engine {engine}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    tasks = [
+        (number_of_cards, first, second, engine)
+        for first, second in itertools.combinations(range(52), 2)
+        if second <= 52 - number_of_cards + 1
+    ]
+
+    counts = [0] * 10
+
+    def add_counts(shard_counts):
+        for shard in shard_counts:
+            for hand_class, count in enumerate(shard):
+                counts[hand_class] += count
+
+    if workers == 1:
+        add_counts(map(frequency_shard, tasks))
+    else:
+        LookupEvaluator.ensure_tables()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            add_counts(executor.map(frequency_shard, tasks, chunksize=8))
+
+    return counts
+
+
+def frequency_table(counts):
+    """
+    Formats hand class counts with their percentages, highest class first
+    """
+    total = sum(counts)
+    lines = []
+    for hand_class in range(9, -1, -1):
+        frequency = 100 * counts[hand_class] / total
+        lines.append(
+            f"A {HAND_CLASS_NAMES[hand_class]} occurs {counts[hand_class]} times ({frequency:.6f} %)"
+        )
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Enumerate the hand class frequencies of all hands")
+    parser.add_argument("cards", type=int, nargs="?", default=7, help="number of cards per hand (5-7)")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--engine", default="lookup", help="lookup or a BoardAnalysis engine")
+    arguments = parser.parse_args()
+
+    frequencies = hand_frequencies(arguments.cards, arguments.workers, arguments.engine)
+    print(frequency_table(frequencies))
+    if arguments.cards in EXPECTED_FREQUENCIES:
+        matches = frequencies == EXPECTED_FREQUENCIES[arguments.cards]
+        print("Counts match the expected frequencies" if matches else "Counts do NOT match")
@@ -0,0 +1,418 @@
+import hashlib
+import itertools
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .poker_main import DECK, Hand, LookupEvaluator, cards_to_mask
+
+# least common multiple of 1..9, every split pot share is a whole number of these units
+SHARE_UNITS = 2520
+
+
+class EquityResult(object):
+    """
+    Equity of one player's hole cards over a set of runouts
+    """
+
+    def __init__(self, cards, runouts, wins, ties, share_units, share_square_units=None):
+        """
+
+        Args:
+            cards: list
+                the player's hole cards
+            runouts: int
+                number of runouts evaluated
+            wins: int
+                runouts won outright
+            ties: int
+                runouts where the pot is split with at least one other player
+            share_units: int
+                pot share summed over all runouts, in units of 1 / SHARE_UNITS of a pot
+            share_square_units: int
+                sum of the squared per runout shares (in units squared) for sampled runouts, None if the runouts
+                were enumerated exactly
+        """
+        self.cards = cards
+        self.runouts = runouts
+        self.wins = wins
+        self.ties = ties
+        self.share_units = share_units
+        self.share_square_units = share_square_units
+
+    @property
+    def win(self):
+        return self.wins / self.runouts
+
+    @property
+    def tie(self):
+        return self.ties / self.runouts
+
+    @property
+    def lose(self):
+        return (self.runouts - self.wins - self.ties) / self.runouts
+
+    @property
+    def equity(self):
+        return self.share_units / (SHARE_UNITS * self.runouts)
+
+    @property
+    def standard_error(self):
+        """
+        Standard error of the equity, 0 for exact results
+        """
+        if self.share_square_units is None or self.runouts < 2:
+            return 0.0
+        mean_square = self.share_square_units / (SHARE_UNITS ** 2 * self.runouts)
+        variance = max(mean_square - self.equity ** 2, 0.0) * self.runouts / (self.runouts - 1)
+        return math.sqrt(variance / self.runouts)
+
+    def __repr__(self):
+        cards = "".join([str(x) for x in self.cards]) if self.cards else "random"
+        return (
+            f"{cards}: equity {self.equity:.4f} (win {self.win:.4f}, tie {self.tie:.4f}, "
+            f"lose {self.lose:.4f}, standard error {self.standard_error:.4f})"
+        )
+
+
+def parse_cards(cards):
+    """
+    Accepts a string of cards ("AhKd"), a list of Card objects or None
+
+    Returns:
+        list of Card objects
+    """
+    if not cards:
+        return []
+    if isinstance(cards, str):
+        return Hand(cards).cards
+    return list(cards)
+
+
+def check_spot(hands, board, dead_cards, random_hands=False):
+    """
+    Validates an equity spot and returns the parsed cards
+
+    Args:
+        random_hands: bool
+            if True a hand given as None is kept as None, meaning it is dealt at random
+
+    Raises:
+        ValueError: for an invalid number of players, hole or board cards, or a card used twice
+    """
+    hands = [
+        None if hand is None and random_hands else parse_cards(hand) for hand in hands
+    ]
+    board = parse_cards(board)
+    dead_cards = parse_cards(dead_cards)
+
+    if not 2 <= len(hands) <= 9:
+        raise ValueError("Equity needs between 2 and 9 players")
+    if any(hand is not None and len(hand) != 2 for hand in hands):
+        raise ValueError("Every player needs exactly 2 hole cards")
+    if len(board) > 5:
+        raise ValueError("The board cannot have more than 5 cards")
+
+    known_cards = [card for hand in hands if hand for card in hand] + board + dead_cards
+    if len(set(known_cards)) != len(known_cards):
+        raise ValueError("A card cannot be used more than once")
+
+    return hands, board, dead_cards
+
+
+def exact_equity(hands, board=None, dead_cards=None):
+    """
+    Enumerates every remaining runout and returns the exact equity of each player
+
+    The board context (its rank key, card mask and possible flush suit) is built incrementally once per runout and
+    shared by all players, each player then only adds their precomputed hole card key and mask.
+
+    Args:
+        hands: list
+            hole cards of 2 to 9 players, as lists of Card objects or strings like "AhKd"
+        board: Union[list, str]
+            0 to 5 known table cards
+        dead_cards: Union[list, str]
+            cards known to be out of the deck
+
+    Returns:
+        list of EquityResult in the order of hands
+    """
+    hands, board, dead_cards = check_spot(hands, board, dead_cards)
+
+    LookupEvaluator.ensure_tables()
+    rank_table = LookupEvaluator.rank_table
+    flush_table = LookupEvaluator.flush_table
+    card_keys = LookupEvaluator.card_keys
+
+    used_mask = cards_to_mask([card for hand in hands for card in hand] + board + dead_cards)
+    deck = [card for card in DECK if not card.mask & used_mask]
+    deck_keys = [card_keys[card.index] for card in deck]
+    deck_masks = [card.mask for card in deck]
+    deck_suits = [card.index // 13 for card in deck]
+
+    hole_keys = [card_keys[hand[0].index] + card_keys[hand[1].index] for hand in hands]
+    hole_masks = [hand[0].mask | hand[1].mask for hand in hands]
+    players = range(len(hands))
+
+    wins = [0] * len(hands)
+    ties = [0] * len(hands)
+    share_units = [0] * len(hands)
+    runouts = 0
+
+    board_key = sum([card_keys[card.index] for card in board])
+    board_mask = cards_to_mask(board)
+    board_suit_counts = [0] * 4
+    for card in board:
+        board_suit_counts[card.index // 13] += 1
+
+    cards_to_come = 5 - len(board)
+    prefixes = itertools.combinations(range(len(deck)), max(cards_to_come - 1, 0))
+    strengths = [0] * len(hands)
+
+    for prefix in prefixes:
+        prefix_key = board_key
+        prefix_mask = board_mask
+        suit_counts = list(board_suit_counts)
+        for i in prefix:
+            prefix_key += deck_keys[i]
+            prefix_mask |= deck_masks[i]
+            suit_counts[deck_suits[i]] += 1
+
+        prefix_flush_suit = None
+        for suit, count in enumerate(suit_counts):
+            if count >= 3:
+                prefix_flush_suit = suit
+
+        if cards_to_come:
+            last_cards = range(prefix[-1] + 1 if prefix else 0, len(deck))
+        else:
+            last_cards = [None]
+
+        for i in last_cards:
+            if i is None:
+                key, mask = prefix_key, prefix_mask
+                flush_suit = prefix_flush_suit
+            else:
+                key = prefix_key + deck_keys[i]
+                mask = prefix_mask | deck_masks[i]
+                if suit_counts[deck_suits[i]] == 2:
+                    flush_suit = deck_suits[i]
+                else:
+                    flush_suit = prefix_flush_suit
+
+            best = -1
+            leader = 0
+            number_of_winners = 0
+            for player in players:
+                strength = rank_table[key + hole_keys[player]]
+                if flush_suit is not None:
+                    flush = flush_table[(mask | hole_masks[player]) >> 13 * flush_suit & 0x1FFF]
+                    if flush > strength:
+                        strength = flush
+                strengths[player] = strength
+                if strength > best:
+                    best = strength
+                    leader = player
+                    number_of_winners = 1
+                elif strength == best:
+                    number_of_winners += 1
+
+            if number_of_winners == 1:
+                wins[leader] += 1
+            else:
+                for player in players:
+                    if strengths[player] == best:
+                        ties[player] += 1
+                        share_units[player] += SHARE_UNITS // number_of_winners
+            runouts += 1
+
+    for player in players:
+        share_units[player] += wins[player] * SHARE_UNITS
+
+    return [
+        EquityResult(hand, runouts, wins[i], ties[i], share_units[i])
+        for i, hand in enumerate(hands)
+    ]
+
+
+def chunk_seed(seed, chunk):
+    """
+    Derives the seed of one chunk of trials from the master seed
+
+    Every chunk gets an independent stream that only depends on (seed, chunk), not on which worker runs it.
+
+    Returns:
+        64-bit int
+    """
+    digest = hashlib.sha256(f"{seed}:{chunk}".encode()).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def monte_carlo_chunk(task):
+    """
+    Plays one chunk of Monte Carlo trials, run inside the worker processes
+
+    Args:
+        task: tuple
+            (hands, board, dead_cards, trials, seed) with cards as Card.index integers and None for random hands
+
+    Returns:
+        tuple of per player wins, ties, share units and squared share units
+    """
+    hands, board, dead_cards, trials, seed = task
+    rng = random.Random(seed)
+
+    LookupEvaluator.ensure_tables()
+    rank_table = LookupEvaluator.rank_table
+    flush_table = LookupEvaluator.flush_table
+    card_keys = LookupEvaluator.card_keys
+
+    known_cards = set(board + dead_cards + [i for hand in hands if hand for i in hand])
+    deck = [i for i in range(52) if i not in known_cards]
+
+    players = range(len(hands))
+    random_players = [player for player in players if hands[player] is None]
+    hole_keys = [0 if hand is None else card_keys[hand[0]] + card_keys[hand[1]] for hand in hands]
+    hole_masks = [0 if hand is None else 1 << hand[0] | 1 << hand[1] for hand in hands]
+    number_of_random_cards = 2 * len(random_players)
+    cards_needed = number_of_random_cards + 5 - len(board)
+
+    known_board_key = sum([card_keys[i] for i in board])
+    known_board_mask = 0
+    known_suit_counts = [0] * 4
+    for i in board:
+        known_board_mask |= 1 << i
+        known_suit_counts[i // 13] += 1
+
+    wins = [0] * len(hands)
+    ties = [0] * len(hands)
+    share_units = [0] * len(hands)
+    share_square_units = [0] * len(hands)
+    strengths = [0] * len(hands)
+
+    for _ in range(trials):
+        drawn = rng.sample(deck, cards_needed)
+
+        for j, player in enumerate(random_players):
+            first, second = drawn[2 * j], drawn[2 * j + 1]
+            hole_keys[player] = card_keys[first] + card_keys[second]
+            hole_masks[player] = 1 << first | 1 << second
+
+        board_key = known_board_key
+        board_mask = known_board_mask
+        suit_counts = list(known_suit_counts)
+        for i in drawn[number_of_random_cards:]:
+            board_key += card_keys[i]
+            board_mask |= 1 << i
+            suit_counts[i // 13] += 1
+        flush_shifts = [13 * suit for suit in range(4) if suit_counts[suit] >= 3]
+
+        best = -1
+        leader = 0
+        number_of_winners = 0
+        for player in players:
+            strength = rank_table[board_key + hole_keys[player]]
+            for shift in flush_shifts:
+                flush = flush_table[(board_mask | hole_masks[player]) >> shift & 0x1FFF]
+                if flush > strength:
+                    strength = flush
+            strengths[player] = strength
+            if strength > best:
+                best = strength
+                leader = player
+                number_of_winners = 1
+            elif strength == best:
+                number_of_winners += 1
+
+        if number_of_winners == 1:
+            wins[leader] += 1
+        else:
+            share = SHARE_UNITS // number_of_winners
+            for player in players:
+                if strengths[player] == best:
+                    ties[player] += 1
+                    share_units[player] += share
+                    share_square_units[player] += share * share
+
+    for player in players:
+        share_units[player] += wins[player] * SHARE_UNITS
+        share_square_units[player] += wins[player] * SHARE_UNITS ** 2
+
+    return wins, ties, share_units, share_square_units
+
+
+def monte_carlo_equity(
+    hands, board=None, dead_cards=None, trials=100000, seed=None, workers=None, chunk_size=10000
+):
+    """
+    Estimates equities by sampling runouts (and random opponent hands) across a process pool
+
+    The trials are split into fixed size chunks and chunk i draws from its own random.Random seeded with
+    chunk_seed(seed, i). Chunk results are combined in chunk order with integer arithmetic, so for a given seed the
+    result is identical for any number of workers.
+
+    Args:
+        hands: list
+            hole cards of 2 to 9 players as lists of Card objects or strings, None for a random hand
+        board: Union[list, str]
+            0 to 5 known table cards
+        dead_cards: Union[list, str]
+            cards known to be out of the deck
+        trials: int
+            number of sampled runouts
+        seed: int
+            master seed, a random one is used if None
+        workers: int
+            number of worker processes, defaults to the number of cores. 1 runs in this process
+        chunk_size: int
+            trials per chunk
+
+    Returns:
+        list of EquityResult in the order of hands, including the standard error of each equity
+    """
+    hands, board, dead_cards = check_spot(hands, board, dead_cards, random_hands=True)
+    if trials < 1:
+        raise ValueError("At least one trial is needed")
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    index_hands = [None if hand is None else [card.index for card in hand] for hand in hands]
+    index_board = [card.index for card in board]
+    index_dead_cards = [card.index for card in dead_cards]
+
+    tasks = []
+    for chunk, start in enumerate(range(0, trials, chunk_size)):
+        tasks.append(
+            (
+                index_hands,
+                index_board,
+                index_dead_cards,
+                min(chunk_size, trials - start),
+                chunk_seed(seed, chunk),
+            )
+        )
+
+    if workers == 1 or len(tasks) == 1:
+        chunk_results = map(monte_carlo_chunk, tasks)
+    else:
+        LookupEvaluator.ensure_tables()
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as executor:
+            chunk_results = list(executor.map(monte_carlo_chunk, tasks))
+
+    totals = [[0] * len(hands) for _ in range(4)]
+    for chunk_result in chunk_results:
+        for total, values in zip(totals, chunk_result):
+            for player, value in enumerate(values):
+                total[player] += value
+    wins, ties, share_units, share_square_units = totals
+
+    return [
+        EquityResult(
+            hand or [], trials, wins[i], ties[i], share_units[i], share_square_units[i]
+        )
+        for i, hand in enumerate(hands)
+    ]
@@ -0,0 +1,176 @@
+import itertools
+import json
+import sqlite3
+from collections import OrderedDict
+
+from .equity import EquityResult, check_spot, exact_equity
+from .poker_main import DECK
+
+SUIT_PERMUTATIONS = list(itertools.permutations(range(4)))
+
+
+def canonical_key(hands, board=None, dead_cards=None):
+    """
+    Maps an equity spot to a key shared by every spot that is identical up to a permutation of the suits
+
+    All 24 suit permutations are applied, the cards of each hand, the board and the dead cards are sorted (their
+    order does not change the equities) and the smallest result is used. Player order is kept so cached results
+    line up with the hands they were asked for.
+
+    Args:
+        hands: list
+            hole cards of each player as lists of Card objects or strings
+        board: Union[list, str]
+            table cards
+        dead_cards: Union[list, str]
+            cards known to be out of the deck
+
+    Returns:
+        str such as "AhKh,QhQs|2c7d9h|"
+    """
+    hands, board, dead_cards = check_spot(hands, board, dead_cards)
+    groups = [[card.index for card in cards] for cards in hands + [board, dead_cards]]
+
+    best = None
+    for permutation in SUIT_PERMUTATIONS:
+        candidate = tuple(
+            tuple(sorted((permutation[i // 13] * 13 + i % 13 for i in group), reverse=True))
+            for group in groups
+        )
+        if best is None or candidate < best:
+            best = candidate
+
+    strings = ["".join(DECK[i].string for i in group) for group in best]
+    return ",".join(strings[: len(hands)]) + "|" + "|".join(strings[len(hands):])
+
+
+class EquityCache(object):
+    """
+    A cache of exact equities keyed on canonical_key
+
+    Results are kept in an in-memory LRU of at most maxsize spots and, if a path is given, in an SQLite database
+    so they survive restarts. Memory and disk hits are counted so the hit rate can be reported.
+    """
+
+    def __init__(self, maxsize=100000, path=None):
+        """
+
+        Args:
+            maxsize: int
+                maximum number of spots kept in memory
+            path: str
+                SQLite database file, results are only kept in memory if None
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.memory = OrderedDict()
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self.connection = None
+        if path is not None:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS equities (key TEXT PRIMARY KEY, results TEXT NOT NULL)"
+            )
+            self.connection.commit()
+
+    @property
+    def lookups(self):
+        return self.memory_hits + self.disk_hits + self.misses
+
+    @property
+    def hit_rate(self):
+        if not self.lookups:
+            return 0.0
+        return (self.memory_hits + self.disk_hits) / self.lookups
+
+    def remember(self, key, results):
+        self.memory[key] = results
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+
+    def get(self, key):
+        """
+        Looks a canonical key up in memory and then on disk
+
+        Returns:
+            list of (runouts, wins, ties, share_units) per player or None
+        """
+        results = self.memory.get(key)
+        if results is not None:
+            self.memory.move_to_end(key)
+            self.memory_hits += 1
+            return results
+
+        if self.connection is not None:
+            row = self.connection.execute(
+                "SELECT results FROM equities WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                results = [tuple(result) for result in json.loads(row[0])]
+                self.remember(key, results)
+                self.disk_hits += 1
+                return results
+
+        self.misses += 1
+        return None
+
+    def put(self, key, results):
+        """
+        Stores results in memory and on disk
+
+        Args:
+            key: str
+                canonical key
+            results: list
+                (runouts, wins, ties, share_units) per player
+        """
+        self.remember(key, results)
+        if self.connection is not None:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO equities (key, results) VALUES (?, ?)",
+                (key, json.dumps(results)),
+            )
+            self.connection.commit()
+
+    def equity(self, hands, board=None, dead_cards=None):
+        """
+        Cached version of exact_equity
+
+        Returns:
+            list of EquityResult in the order of hands
+        """
+        hands, board, dead_cards = check_spot(hands, board, dead_cards)
+        key = canonical_key(hands, board, dead_cards)
+
+        results = self.get(key)
+        if results is None:
+            equities = exact_equity(hands, board, dead_cards)
+            results = [
+                (result.runouts, result.wins, result.ties, result.share_units)
+                for result in equities
+            ]
+            self.put(key, results)
+            return equities
+
+        return [EquityResult(hand, *result) for hand, result in zip(hands, results)]
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __repr__(self):
+        return (
+            f"EquityCache({len(self.memory)} spots in memory, hit rate {self.hit_rate:.2%})"
+        )
@@ -1,6 +1,5 @@
 import poker_main
 from poker_main import make_player, deck
-import itertools
 import random
 
 random.seed(1690)
@@ -72,32 +71,4 @@ for i in range(num_of_trials):
     wins += x
 
 win_percentage = 100 * wins / num_of_trials"""
-"""
-frequency_table = {0: 0,
-                   1: 0,
-                   2: 0,
-                   3: 0,
-                   4: 0,
-                   5: 0,
-                   6: 0,
-                   7: 0,
-                   8: 0,
-                   9: 0}
-for i, combination in enumerate(itertools.combinations(cards, 5)):
-    player = {"cards": [],
-              "player_cards": [],
-              "suits": {"hearts": 0,
-                        "diamonds": 0,
-                        "clubs": 0,
-                        "spades": 0},
-              "values": {i: 0 for i in range(2, 15)}}
-
-    player["cards"] += combination
-
-    hand = poker_main.analyse_cards(player)
-    frequency_table[hand[0]] += 1
-
-for key, val in frequency_table.items():
-    freq = 100 * val / 2598960
-    print(f"A {card_rankings[key]} occurs roughly {freq} % of the time")
-# pairs = poker_main.n_check(player, 2)"""
+# exact hand class frequencies are produced by enumeration.py, e.g. python -m src.enumeration 5
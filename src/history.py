@@ -0,0 +1,339 @@
+import gzip
+import json
+import lzma
+import os
+import struct
+
+from .poker_main import (
+    BETTING_ROUND_INDEX,
+    BETTING_ROUNDS,
+    DECK,
+    POSITION_INDEX,
+    POSITIONS,
+    ActionType,
+    EventSink,
+    Hand,
+    action_string,
+    compile_action,
+    to_chip_units,
+)
+
+MAGIC = b"PKRHH001"
+FORMATS = ("binary", "jsonl")
+OPENERS = {None: open, "gzip": gzip.open, "xz": lzma.open}
+
+# binary record layout, every integer is little endian and amounts are in chip units
+RECORD_LENGTH = struct.Struct("<I")
+RECORD_HEADER = struct.Struct("<IBBBHBB")  # hand, seats, board cards, blinds, actions, returns, payouts
+SEAT = struct.Struct("<BiBB")  # position, stack, first card, second card (after the name)
+AMOUNT = struct.Struct("<Bi")  # seat, amount, for blinds, returns and payouts
+ACTION = struct.Struct("<BBBi")  # seat, betting round, ActionType, amount
+NO_CARD = 255
+
+
+def card_codes(cards):
+    """
+    Cards as a string of codes such as "AhKd" that Hand can parse
+    """
+    return "".join([card.string for card in cards])
+
+
+class HandRecord(object):
+    """
+    Everything that happened in one hand, in chip units
+
+    Attributes:
+        hand: int
+            number of the hand in its stream
+        seats: list
+            (name, position, stack before the blinds, hole cards) of each player in seat order
+        board: list
+            table cards shown during the hand
+        blinds: list
+            (seat, amount) of each blind posted
+        actions: list
+            (seat, betting round, compiled action) of every action in order
+        returns: list
+            (seat, amount) of every uncalled bet returned
+        payouts: list
+            (seat, amount) of every pot won
+    """
+
+    __slots__ = ("hand", "seats", "board", "blinds", "actions", "returns", "payouts")
+
+    def __init__(self, hand, seats, board=None, blinds=None, actions=None, returns=None, payouts=None):
+        self.hand = hand
+        self.seats = seats
+        self.board = board or []
+        self.blinds = blinds or []
+        self.actions = actions or []
+        self.returns = returns or []
+        self.payouts = payouts or []
+
+    def to_json(self):
+        return {
+            "hand": self.hand,
+            "seats": [
+                {"name": name, "position": position, "stack": stack, "cards": card_codes(cards)}
+                for name, position, stack, cards in self.seats
+            ],
+            "board": card_codes(self.board),
+            "blinds": self.blinds,
+            "actions": [
+                [seat, betting_round, action_string(action)] for seat, betting_round, action in self.actions
+            ],
+            "returns": self.returns,
+            "payouts": self.payouts,
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            data["hand"],
+            [
+                (seat["name"], seat["position"], seat["stack"], Hand(seat["cards"]).cards if seat["cards"] else [])
+                for seat in data["seats"]
+            ],
+            Hand(data["board"]).cards if data["board"] else [],
+            [tuple(blind) for blind in data["blinds"]],
+            [(seat, betting_round, compile_action(action)) for seat, betting_round, action in data["actions"]],
+            [tuple(returned) for returned in data["returns"]],
+            [tuple(payout) for payout in data["payouts"]],
+        )
+
+    def to_bytes(self):
+        parts = [
+            RECORD_HEADER.pack(
+                self.hand,
+                len(self.seats),
+                len(self.board),
+                len(self.blinds),
+                len(self.actions),
+                len(self.returns),
+                len(self.payouts),
+            )
+        ]
+        for name, position, stack, cards in self.seats:
+            encoded_name = name.encode()[:255]
+            indices = [card.index for card in cards] + [NO_CARD] * (2 - len(cards))
+            parts.append(bytes([len(encoded_name)]) + encoded_name)
+            parts.append(SEAT.pack(POSITION_INDEX[position], stack, indices[0], indices[1]))
+        parts.append(bytes(card.index for card in self.board))
+
+        values = []
+        for seat, amount in self.blinds:
+            values += (seat, amount)
+        for seat, betting_round, (kind, amount) in self.actions:
+            values += (seat, BETTING_ROUND_INDEX[betting_round], kind, amount)
+        for seat, amount in self.returns:
+            values += (seat, amount)
+        for seat, amount in self.payouts:
+            values += (seat, amount)
+        # every amount and action is packed in one call, struct caches the compiled layouts
+        layout = "<" + "Bi" * len(self.blinds) + "BBBi" * len(self.actions)
+        layout += "Bi" * (len(self.returns) + len(self.payouts))
+        parts.append(struct.pack(layout, *values))
+        body = b"".join(parts)
+        return RECORD_LENGTH.pack(len(body)) + body
+
+    @classmethod
+    def from_bytes(cls, body):
+        hand, seats, board, blinds, actions, returns, payouts = RECORD_HEADER.unpack_from(body, 0)
+        offset = RECORD_HEADER.size
+
+        seat_list = []
+        for _ in range(seats):
+            length = body[offset]
+            name = body[offset + 1 : offset + 1 + length].decode()
+            offset += 1 + length
+            position, stack, first, second = SEAT.unpack_from(body, offset)
+            offset += SEAT.size
+            cards = [DECK[index] for index in (first, second) if index != NO_CARD]
+            seat_list.append((name, POSITIONS[position], stack, cards))
+
+        board_cards = [DECK[index] for index in body[offset : offset + board]]
+        offset += board
+
+        def amounts(count):
+            nonlocal offset
+            values = [AMOUNT.unpack_from(body, offset + i * AMOUNT.size) for i in range(count)]
+            offset += count * AMOUNT.size
+            return values
+
+        blind_list = amounts(blinds)
+        action_list = []
+        for i in range(actions):
+            seat, betting_round, kind, amount = ACTION.unpack_from(body, offset + i * ACTION.size)
+            action_list.append((seat, BETTING_ROUNDS[betting_round], (ActionType(kind), amount)))
+        offset += actions * ACTION.size
+        return_list = amounts(returns)
+        payout_list = amounts(payouts)
+        return cls(hand, seat_list, board_cards, blind_list, action_list, return_list, payout_list)
+
+    def __repr__(self):
+        return f"HandRecord({self.hand}, {len(self.seats)} seats, {len(self.actions)} actions)"
+
+
+# the events a hand history is built from
+RECORDED_KINDS = frozenset(
+    ["hand_start", "blind", "round_start", "action", "street", "bet_returned", "payout", "hand_end"]
+)
+
+
+class HandHistoryWriter(EventSink):
+    """
+    An event sink appending every hand it sees to a hand history file
+
+    The events of a hand are collected into a HandRecord, which is encoded as soon as the hand ends. Encoded hands
+    are buffered and written batch_size hands at a time in one write, so recording costs a few microseconds per
+    hand. The file is only ever appended to, a binary file starts with MAGIC followed by length prefixed records
+    and a jsonl file has one JSON object per line. With compression ('gzip' or 'xz') every batch is appended to
+    the compressed stream.
+    """
+
+    kinds = RECORDED_KINDS
+
+    def __init__(self, path, format="binary", compression=None, batch_size=1000):
+        """
+
+        Args:
+            path: str
+            format: str
+                'binary' or 'jsonl'
+            compression: str
+                None, 'gzip' or 'xz'
+            batch_size: int
+                number of hands buffered before they are written
+        """
+        if format not in FORMATS:
+            raise ValueError(f"Unknown hand history format {format}")
+        if compression not in OPENERS:
+            raise ValueError(f"Unknown compression {compression}")
+
+        self.format = format
+        self.batch_size = batch_size
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = OPENERS[compression](path, "ab")
+        self.buffer = []
+        if format == "binary" and new_file:
+            self.buffer.append(MAGIC)
+
+        self.hands = 0
+        self.record = None
+        self.players = []
+        self.stacks = []
+        self.seat_numbers = {}
+        self.betting_round = None
+        self.handlers = {
+            "hand_start": self.hand_start,
+            "blind": self.blind,
+            "round_start": self.round_start,
+            "action": self.action,
+            "street": self.street,
+            "bet_returned": self.bet_returned,
+            "payout": self.payout,
+            "hand_end": self.hand_end,
+        }
+
+    def emit(self, event):
+        handler = self.handlers.get(event.kind)
+        # a writer attached in the middle of a hand skips it and starts recording with the next one
+        if handler is not None and (self.record is not None or event.kind == "hand_start"):
+            handler(event.data)
+
+    def hand_start(self, data):
+        self.players = data["players"]
+        self.seat_numbers = {player: seat for seat, player in enumerate(self.players)}
+        self.stacks = [to_chip_units(chips) for chips in data["chips"]]
+        self.record = HandRecord(self.hands, [])
+        self.betting_round = None
+
+    def blind(self, data):
+        self.record.blinds.append((self.seat_numbers[data["player"]], to_chip_units(data["amount"])))
+
+    def round_start(self, data):
+        self.betting_round = data["betting_round"]
+
+    def action(self, data):
+        self.record.actions.append((self.seat_numbers[data["player"]], self.betting_round, data["action"]))
+
+    def street(self, data):
+        self.record.board = list(data["table_cards"])
+
+    def bet_returned(self, data):
+        self.record.returns.append((self.seat_numbers[data["player"]], to_chip_units(data["amount"])))
+
+    def payout(self, data):
+        if data["amount"]:
+            self.record.payouts.append((self.seat_numbers[data["player"]], to_chip_units(data["amount"])))
+
+    def hand_end(self, data):
+        record = self.record
+        record.seats = [
+            (player.name, player.current_position, stack, list(player.cards))
+            for player, stack in zip(self.players, self.stacks)
+        ]
+        if self.format == "binary":
+            self.buffer.append(record.to_bytes())
+        else:
+            self.buffer.append(json.dumps(record.to_json(), separators=(",", ":")).encode() + b"\n")
+        self.hands += 1
+        self.record = None
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write(b"".join(self.buffer))
+            self.buffer = []
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def open_history(path):
+    """
+    Opens a hand history file for reading, detecting gzip and xz compression from the first bytes
+    """
+    with open(path, "rb") as raw:
+        start = raw.read(6)
+    if start[:2] == b"\x1f\x8b":
+        return gzip.open(path, "rb")
+    if start == b"\xfd7zXZ\x00":
+        return lzma.open(path, "rb")
+    return open(path, "rb")
+
+
+def read_hand_history(path):
+    """
+    Streams the HandRecords of a file written by HandHistoryWriter, in either format
+
+    Yields:
+        HandRecord
+    """
+    with open_history(path) as history:
+        magic = history.read(len(MAGIC))
+        if magic != MAGIC:
+            # a jsonl file, the bytes already read start the first line
+            first_line = magic + history.readline()
+            if first_line.strip():
+                yield HandRecord.from_json(json.loads(first_line))
+            for line in history:
+                if line.strip():
+                    yield HandRecord.from_json(json.loads(line))
+            return
+
+        while True:
+            header = history.read(RECORD_LENGTH.size)
+            if not header:
+                return
+            (length,) = RECORD_LENGTH.unpack(header)
+            yield HandRecord.from_bytes(history.read(length))
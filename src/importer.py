@@ -0,0 +1,386 @@
+import argparse
+import collections
+import gc
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .poker_main import BETTING_ROUND_INDEX, Card, Player, Poker
+
+HEADER = re.compile(r"Hand #(\d+):.*?\(\D*?([\d.,]+)/\D*?([\d.,]+)")
+TABLE = re.compile(r"Table '([^']*)'.*?Seat #(\d+) is the button")
+SEAT = re.compile(r"Seat (\d+): (.+?) \(\D*?([\d.,]+) in chips")
+DEALT = re.compile(r"Dealt to (.+?) \[(.+?)\]")
+SHOWED = re.compile(r"Seat \d+: (.+?) (?:\(.*?\) )?(?:showed|mucked) \[(.+?)\]")
+COLLECTED = re.compile(r"(.+?) collected \D*?([\d.,]+) from")
+BRACKETS = re.compile(r"\[([^\]]*)\]")
+
+# street marker lines and the betting round they start
+STREETS = {"*** FLOP ***": "post-flop", "*** TURN ***": "turn", "*** RIVER ***": "river"}
+
+# a line starting a new hand, e.g. "PokerStars Hand #223646450352: ..."
+HAND_START = re.compile(rb"^(?:\xef\xbb\xbf)?PokerStars[^\n]* Hand #", re.M)
+READ_SIZE = 1 << 16
+CURRENCY_SYMBOLS = "$\u20ac\u00a3"
+
+
+def parse_amount(amount):
+    return float(amount.lstrip(CURRENCY_SYMBOLS).replace(",", ""))
+
+
+def parse_cards(cards):
+    return [Card(card) for card in cards.split()]
+
+
+class ImportedHand(object):
+    """
+    One hand of a text hand history, as the engine's Player objects and table cards
+
+    Every amount is in big blinds like the rest of the engine. The players are in post-flop order with their
+    positions, their chips at the start of the hand, any hole cards that were dealt to the hero or shown, their
+    actions of each betting round as action strings ("fold", "call", "raise to 3.5", ...) and their winnings.
+
+    The seats are held as plain tuples, which are cheap to send between processes, and the Player objects are
+    only built when players is first used.
+    """
+
+    __slots__ = ("hand_id", "table", "small_blind", "big_blind", "seats", "table_cards", "built_players")
+
+    def __init__(self, hand_id, table, small_blind, big_blind, seats, table_cards):
+        """
+
+        Args:
+            hand_id: str
+            table: str
+            small_blind: float
+            big_blind: float
+            seats: list
+                (name, position, chips, cards, actions of each betting round, winnings) of each player in
+                post-flop order
+            table_cards: list
+        """
+        self.hand_id = hand_id
+        self.table = table
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.seats = seats
+        self.table_cards = table_cards
+        self.built_players = None
+
+    @property
+    def players(self):
+        if self.built_players is None:
+            self.built_players = []
+            for name, position, chips, cards, (pre_flop, post_flop, turn, river), winnings in self.seats:
+                player = Player(
+                    name,
+                    chips=chips,
+                    cards=list(cards),
+                    table_cards=self.table_cards,
+                    current_position=position,
+                    pre_flop=list(pre_flop),
+                    post_flop=list(post_flop),
+                    turn=list(turn),
+                    river=list(river),
+                )
+                player.winnings = winnings
+                self.built_players.append(player)
+        return self.built_players
+
+    def known_players(self):
+        """
+        Players whose hole cards are known
+        """
+        return [player for player in self.players if len(player.cards) == 2]
+
+    def game(self, **kwargs):
+        """
+        A Poker game set up with the players and table cards of the hand, keyword arguments go to Poker
+        """
+        return Poker(self.players, table_cards=self.table_cards, **kwargs)
+
+    def __getstate__(self):
+        # built players stay in the process that built them
+        return self.hand_id, self.table, self.small_blind, self.big_blind, self.seats, self.table_cards
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def __repr__(self):
+        return f"ImportedHand({self.hand_id}, {len(self.seats)} players)"
+
+
+def parse_hand(lines):
+    """
+    Parses the lines of one hand
+
+    Args:
+        lines: list
+            decoded lines of the hand, starting with its header
+
+    Returns:
+        ImportedHand
+
+    Raises:
+        ValueError: if the hand cannot be parsed
+    """
+    header = HEADER.search(lines[0])
+    table = TABLE.search(lines[1]) if len(lines) > 1 else None
+    if header is None or table is None:
+        raise ValueError(f"Not a hand history header: {lines[0]!r}")
+    hand_id = header.group(1)
+    small_blind, big_blind = parse_amount(header.group(2)), parse_amount(header.group(3))
+    button = int(table.group(2))
+
+    seats = {}
+    small_blind_name = None
+    # chips, actions of each betting round, hole cards and winnings by player name
+    players = {}
+    actions = {}
+    cards = {}
+    winnings = {}
+    betting_round = "pre-flop"
+    table_cards = []
+    # seats are only listed before the hole cards are dealt
+    in_header = True
+    for line in lines[2:]:
+        if line.startswith("*** SUMMARY ***"):
+            betting_round = None
+            continue
+
+        if betting_round is None:
+            showed = SHOWED.match(line)
+            if showed is not None and showed.group(1) in players:
+                cards[showed.group(1)] = parse_cards(showed.group(2))
+            continue
+
+        if line.startswith("Seat ") and in_header:
+            seat = SEAT.match(line)
+            if seat is not None and "sitting out" not in line:
+                name = seat.group(2)
+                seats[int(seat.group(1))] = name
+                players[name] = round(parse_amount(seat.group(3)) / big_blind, 4)
+                actions[name] = ([], [], [], [])
+            continue
+
+        if line.startswith("***"):
+            in_header = False
+            for marker, street in STREETS.items():
+                if line.startswith(marker):
+                    betting_round = street
+                    table_cards = [card for group in BRACKETS.findall(line) for card in parse_cards(group)]
+            continue
+
+        # lines of the form "name: verb ..." are split once rather than matched against every pattern
+        name, separator, rest = line.partition(": ")
+        if separator and name in players:
+            words = rest.split()
+            verb = words[0] if words else None
+            if verb == "folds":
+                action_string = "fold"
+            elif verb == "checks":
+                action_string = "check"
+            elif verb == "calls":
+                action_string = "call"
+            elif verb in ("bets", "raises"):
+                # "bets $x" and "raises $y to $x" are both raises to a total of x within the betting round
+                size = words[3] if verb == "raises" else words[1]
+                action_string = f"raise to {round(parse_amount(size) / big_blind, 4):g}"
+            else:
+                if verb == "posts" and rest.startswith("posts small blind"):
+                    small_blind_name = name
+                elif verb == "shows":
+                    cards[name] = parse_cards(BRACKETS.search(rest).group(1))
+                continue
+            actions[name][BETTING_ROUND_INDEX[betting_round]].append(action_string)
+            continue
+
+        dealt = DEALT.match(line)
+        if dealt is not None and dealt.group(1) in players:
+            cards[dealt.group(1)] = parse_cards(dealt.group(2))
+            continue
+
+        collected = COLLECTED.match(line)
+        if collected is not None and collected.group(1) in players:
+            name = collected.group(1)
+            winnings[name] = winnings.get(name, 0.0) + round(parse_amount(collected.group(2)) / big_blind, 4)
+
+    if not 2 <= len(seats) <= 9:
+        raise ValueError(f"Hand {hand_id} has {len(seats)} players")
+
+    # seats in order from the small blind, or from the seat after the button if no small blind was posted
+    order = sorted(seats)
+    first = next((seat for seat in order if seats[seat] == small_blind_name), None)
+    if first is None:
+        first = next((seat for seat in order if seat > button), order[0])
+    start = order.index(first)
+    names = [seats[seat] for seat in order[start:] + order[:start]]
+
+    _, _, post_flop_order = Poker.position_map(len(names))
+    rows = [
+        (name, position, players[name], cards.get(name, []), actions[name], winnings.get(name, 0.0))
+        for name, position in zip(names, post_flop_order)
+    ]
+    return ImportedHand(hand_id, table.group(1), small_blind, big_blind, rows, table_cards)
+
+
+def parse_chunk(task):
+    """
+    Parses every hand whose header starts in one byte range of a file, run inside the worker processes
+
+    A hand that starts in the range is read to its end even past the range, so consecutive ranges split the file
+    into whole hands without overlapping.
+
+    Args:
+        task: tuple
+            (path, start offset, end offset, process), process is None or a function applied to every hand
+
+    Returns:
+        tuple of (list of ImportedHand or of process results, number of hands parsed, number of hands that
+        could not be parsed)
+    """
+    path, start, end, process = task
+    hands = []
+    errors = 0
+
+    # the range is read from one byte early so a hand starting exactly at start is seen as starting a line
+    base = max(start - 1, 0)
+    with open(path, "rb") as history:
+        history.seek(base)
+        data = history.read(end - base)
+
+        # read on to the start of the next hand so the last hand of the range is complete
+        while True:
+            following = HAND_START.search(data, end - base)
+            if following is not None:
+                data = data[: following.start()]
+                break
+            block = history.read(READ_SIZE)
+            if not block:
+                break
+            data += block
+
+    starts = [
+        match.start()
+        for match in HAND_START.finditer(data)
+        if match.start() < end - base and (start == 0 or match.start() > 0)
+    ]
+
+    # parsed hands hold no reference cycles, so the cyclic garbage collector would only rescan them
+    collecting = gc.isenabled()
+    gc.disable()
+    try:
+        for hand_start, hand_end in zip(starts, starts[1:] + [len(data)]):
+            try:
+                text = data[hand_start:hand_end].decode("utf-8", "replace").lstrip("\ufeff")
+                hands.append(parse_hand([line.strip() for line in text.splitlines() if line.strip()]))
+            except (ValueError, KeyError, IndexError):
+                errors += 1
+    finally:
+        if collecting:
+            gc.enable()
+
+    if process is not None:
+        return [process(hand) for hand in hands], len(hands), errors
+    return hands, len(hands), errors
+
+
+class HandHistoryImporter(object):
+    """
+    Streams ImportedHand objects out of PokerStars style text hand histories
+
+    Files are split into byte ranges of chunk_size which are parsed across a process pool, at most two ranges
+    per worker are in flight at a time so memory stays bounded however large the files are. Hands come out in file
+    order, and hands, errors, bytes and seconds are kept up to date for throughput reports. Analysis that only
+    needs one hand at a time can be run in the workers too by passing a process function to import_files.
+    """
+
+    def __init__(self, workers=None, chunk_size=1 << 22):
+        """
+
+        Args:
+            workers: int
+                number of worker processes, defaults to the number of cores
+            chunk_size: int
+                bytes per parsed range
+        """
+        self.workers = workers if workers is not None else os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.hands = 0
+        self.errors = 0
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def chunks(self, paths, process=None):
+        for path in paths:
+            size = os.path.getsize(path)
+            for start in range(0, size, self.chunk_size):
+                yield path, start, min(start + self.chunk_size, size), process
+
+    def import_files(self, paths, process=None):
+        """
+        Parses hand history files
+
+        Args:
+            paths: list
+                text hand history files
+            process: callable
+                picklable function of an ImportedHand run in the workers, its results are yielded instead of
+                the hands
+
+        Yields:
+            ImportedHand, or the result of process for each hand
+        """
+        start = time.perf_counter()
+        tasks = self.chunks(paths, process)
+
+        if self.workers == 1:
+            for task in tasks:
+                yield from self.count(task, *parse_chunk(task), start)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            in_flight = collections.deque()
+            for task in tasks:
+                in_flight.append((task, executor.submit(parse_chunk, task)))
+                if len(in_flight) >= 2 * self.workers:
+                    task, future = in_flight.popleft()
+                    yield from self.count(task, *future.result(), start)
+            while in_flight:
+                task, future = in_flight.popleft()
+                yield from self.count(task, *future.result(), start)
+
+    def count(self, task, results, number_of_hands, errors, start):
+        _, chunk_start, chunk_end, _ = task
+        self.hands += number_of_hands
+        self.errors += errors
+        self.bytes += chunk_end - chunk_start
+        self.seconds = time.perf_counter() - start
+        return results
+
+    @property
+    def hands_per_second(self):
+        return self.hands / self.seconds if self.seconds else 0.0
+
+    def __repr__(self):
+        return (
+            f"HandHistoryImporter({self.hands} hands, {self.errors} errors, "
+            f"{self.hands_per_second:.0f} hands/s)"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse PokerStars style hand histories")
+    parser.add_argument("paths", nargs="+", help="hand history files")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1 << 22, help="bytes per parsed range")
+    arguments = parser.parse_args()
+
+    importer = HandHistoryImporter(arguments.workers, arguments.chunk_size)
+    for _ in importer.import_files(arguments.paths):
+        pass
+    print(
+        f"{importer.hands} hands ({importer.errors} errors) from {importer.bytes / 1e6:.1f} MB in "
+        f"{importer.seconds:.2f} s: {importer.hands_per_second:.0f} hands per second"
+    )
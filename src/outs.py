@@ -0,0 +1,140 @@
+from .equity import check_spot
+from .poker_main import DECK, HAND_CLASS_NAMES, HandState, LookupEvaluator, cards_to_mask
+
+
+class Out(object):
+    """
+    The result of one unseen card falling next
+    """
+
+    __slots__ = ("card", "winners", "strengths", "improvements")
+
+    def __init__(self, card, winners, strengths, improvements):
+        """
+
+        Args:
+            card: Card
+                the unseen card
+            winners: tuple
+                indices of the players winning (or splitting) once the card is dealt
+            strengths: list
+                packed strength of each player once the card is dealt
+            improvements: list
+                new hand class of each player whose hand class went up with the card, None for the others
+        """
+        self.card = card
+        self.winners = winners
+        self.strengths = strengths
+        self.improvements = improvements
+
+    def improvement_names(self):
+        """
+        Names of the improved hand classes, e.g. ["flush", None]
+        """
+        return [
+            None if hand_class is None else HAND_CLASS_NAMES[hand_class]
+            for hand_class in self.improvements
+        ]
+
+    def __repr__(self):
+        return f"Out({self.card}, winners {list(self.winners)})"
+
+
+class OutsAnalysis(object):
+    """
+    Which unseen cards change the winner of a flop or turn spot with known hands
+
+    Every player's board plus hole cards is held as a HandState, each unseen card is then added to those states
+    with the rank key and flush lookups inlined, so the whole deck is covered in one pass without building any
+    BoardAnalysis or copying states.
+    """
+
+    def __init__(self, hands, board, dead_cards=None):
+        """
+
+        Args:
+            hands: list
+                hole cards of 2 to 9 players, as lists of Card objects or strings like "AhKd"
+            board: Union[list, str]
+                3 or 4 table cards
+            dead_cards: Union[list, str]
+                cards known to be out of the deck
+        """
+        hands, board, dead_cards = check_spot(hands, board, dead_cards)
+        if len(board) not in (3, 4):
+            raise ValueError("Outs need a flop or turn board")
+
+        self.hands = hands
+        self.board = board
+        table_state = HandState(board)
+        self.states = [table_state.copy().add(hand[0]).add(hand[1]) for hand in hands]
+        self.strengths = [state.strength for state in self.states]
+        self.winners = self.winning_players(self.strengths)
+
+        used_mask = cards_to_mask([card for hand in hands for card in hand] + board + dead_cards)
+        self.unseen_cards = [card for card in DECK if not card.mask & used_mask]
+        self.cards = [self.analyse_card(card) for card in self.unseen_cards]
+
+    @staticmethod
+    def winning_players(strengths):
+        best = max(strengths)
+        return tuple(i for i, strength in enumerate(strengths) if strength == best)
+
+    def analyse_card(self, card):
+        """
+        Evaluates every player with one more card
+
+        Returns:
+            Out
+        """
+        rank_table = LookupEvaluator.rank_table
+        flush_table = LookupEvaluator.flush_table
+        card_key = LookupEvaluator.card_keys[card.index]
+        suit = card.index // 13
+
+        strengths = []
+        improvements = []
+        for state in self.states:
+            strength = rank_table[state.key + card_key]
+            flush = state.flush
+            if state.suit_counts[suit] >= 4:
+                suit_flush = flush_table[(state.mask | card.mask) >> 13 * suit & 0x1FFF]
+                if suit_flush > flush:
+                    flush = suit_flush
+            if flush > strength:
+                strength = flush
+            strengths.append(strength)
+            hand_class = strength >> 20
+            improvements.append(hand_class if hand_class > state.hand_class else None)
+
+        return Out(card, self.winning_players(strengths), strengths, improvements)
+
+    def outs(self, player):
+        """
+        Cards that make a player win or split who is not winning or splitting now
+
+        Args:
+            player: int
+                index of the player in hands
+
+        Returns:
+            list of Card objects
+        """
+        if player in self.winners:
+            return []
+        return [out.card for out in self.cards if player in out.winners]
+
+    def number_of_outs(self):
+        """
+        Number of outs of each player, 0 for the current winners
+        """
+        return [len(self.outs(player)) for player in range(len(self.hands))]
+
+    def winner_changes(self):
+        """
+        Unseen cards after which the set of winners is different
+        """
+        return [out for out in self.cards if out.winners != self.winners]
+
+    def __repr__(self):
+        return f"OutsAnalysis(winners {list(self.winners)}, outs {self.number_of_outs()})"
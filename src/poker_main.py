@@ -1,53 +1,107 @@
-import random
+import bisect
+import functools
 import itertools
-from collections import Counter
-from copy import deepcopy
+import random
+from array import array
+from collections import Counter, namedtuple
+from enum import IntEnum
+
+
+RANKS_TO_VALUES = {
+    "2": 2,
+    "3": 3,
+    "4": 4,
+    "5": 5,
+    "6": 6,
+    "7": 7,
+    "8": 8,
+    "9": 9,
+    "T": 10,
+    "J": 11,
+    "Q": 12,
+    "K": 13,
+    "A": 14,
+}
+
+VALUES_TO_RANKS = {value: key for key, value in RANKS_TO_VALUES.items()}
+
+SUITS = ["c", "s", "d", "h"]
+
+SUIT_SYMBOLS = {
+    "s": "\u2660",
+    "h": "\u2665",
+    "c": "\u2663",
+    "d": "\u2666",
+}
 
 
 class Card(object):
-    def __init__(self, string):
+    """
+    An immutable playing card.
+
+    The 52 cards are interned, so Card("Ah") always returns the same object. Each card is identified by an
+    integer index 0..51 (suit_index * 13 + value - 2, the same order as a freshly built deck) and a single bit
+    mask (1 << index), so hashing and deck filtering only need integer operations.
+    """
+
+    __slots__ = ("string", "rank", "suit", "value", "index", "mask")
+
+    ranks_to_values = RANKS_TO_VALUES
+    values_to_ranks = VALUES_TO_RANKS
+    all_suits = SUIT_SYMBOLS
+
+    _interned = {}
+
+    def __new__(cls, string):
         """
 
         Args:
             string: str
                 string of rank (A, K, Q, J, T, 9, 8, 7, 6, 5, 4, 3, 2) + suit (c, d, s, h)
         """
-        self.string = string
-        self.ranks_to_values = {
-            "2": 2,
-            "3": 3,
-            "4": 4,
-            "5": 5,
-            "6": 6,
-            "7": 7,
-            "8": 8,
-            "9": 9,
-            "T": 10,
-            "J": 11,
-            "Q": 12,
-            "K": 13,
-            "A": 14,
-        }
-        self.values_to_ranks = {
-            value: key for key, value in self.ranks_to_values.items()
-        }
-        self.rank = string[0]
-        self.suit = string[1]
+        card = cls._interned.get(string)
+        if card is not None:
+            return card
+
+        rank, suit = string[0], string[1]
+        card = cls._interned.get(rank + suit)
+        if card is not None:
+            return card
+
+        if rank not in RANKS_TO_VALUES or suit not in SUIT_SYMBOLS:
+            raise ValueError(f"{string} is not a valid card")
+
+        card = object.__new__(cls)
+        value = RANKS_TO_VALUES[rank]
+        index = SUITS.index(suit) * 13 + value - 2
+        for name, attribute in zip(
+            cls.__slots__, (rank + suit, rank, suit, value, index, 1 << index)
+        ):
+            object.__setattr__(card, name, attribute)
 
-        self.value = self.ranks_to_values[self.rank]
+        cls._interned[rank + suit] = card
+        return card
 
-        self.all_suits = {
-            "s": "\u2660",
-            "h": "\u2665",
-            "c": "\u2663",
-            "d": "\u2666",
-        }
+    def __setattr__(self, name, value):
+        raise AttributeError("Card objects are immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Card objects are immutable")
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def __reduce__(self):
+        return Card, (self.string,)
 
     def __repr__(self):
-        return str(f"{self.rank}{self.all_suits[self.suit]}")
+        return str(f"{self.rank}{SUIT_SYMBOLS[self.suit]}")
 
     def __str__(self):
-        return str(f"{self.rank}{self.all_suits[self.suit]}")
+        return str(f"{self.rank}{SUIT_SYMBOLS[self.suit]}")
 
     def __lt__(self, other):
         return self.value < other.value
@@ -56,10 +110,185 @@ class Card(object):
         return self.value > other.value
 
     def __eq__(self, other):
-        return (self.value == other.value) and (self.suit == other.suit)
+        if isinstance(other, Card):
+            return self.index == other.index
+        return NotImplemented
 
     def __hash__(self):
-        return hash(str(self))
+        return self.index
+
+
+# all 52 interned cards ordered by index
+DECK = tuple(Card(rank + suit) for suit in SUITS for rank in RANKS_TO_VALUES)
+
+
+def cards_to_mask(cards):
+    """
+    Packs a collection of cards into a 52-bit integer
+
+    Args:
+        cards: iterable
+            Card objects
+
+    Returns:
+        int with bit card.index set for each card
+    """
+    mask = 0
+    for card in cards:
+        mask |= card.mask
+    return mask
+
+
+def mask_to_cards(mask):
+    """
+    Unpacks a 52-bit integer into a list of cards ordered by index
+
+    Args:
+        mask: int
+            bit mask as produced by cards_to_mask
+
+    Returns:
+        list of Card objects
+    """
+    cards = []
+    while mask:
+        lowest_bit = mask & -mask
+        cards.append(DECK[lowest_bit.bit_length() - 1])
+        mask ^= lowest_bit
+    return cards
+
+
+def hand_class(first, second):
+    """
+    Name of the starting hand class of two cards, e.g. "AA", "AKs" or "T9o"
+
+    Args:
+        first: Card
+        second: Card
+
+    Returns:
+        str
+    """
+    high, low = (first, second) if first.value >= second.value else (second, first)
+    if high.value == low.value:
+        return high.rank + low.rank
+    return high.rank + low.rank + ("s" if high.suit == low.suit else "o")
+
+
+# the 169 starting hand classes, pairs first then suited then offsuit hands, each from the highest down
+HAND_CLASSES = (
+    [rank * 2 for rank in reversed(list(RANKS_TO_VALUES))]
+    + [
+        high + low + suffix
+        for suffix in "so"
+        for high, low in itertools.combinations(reversed(list(RANKS_TO_VALUES)), 2)
+    ]
+)
+HAND_CLASS_INDEX = {name: i for i, name in enumerate(HAND_CLASSES)}
+
+
+# every two card combination as a pair of ascending card indices, combo i is COMBOS[i]
+COMBOS = tuple(itertools.combinations(range(52), 2))
+COMBO_INDEX = {combo: i for i, combo in enumerate(COMBOS)}
+
+
+def combo_index(cards):
+    """
+    Index of two cards in COMBOS
+
+    Args:
+        cards: Union[list, str]
+            two Card objects or a string like "AhKd"
+
+    Returns:
+        int
+    """
+    if isinstance(cards, str):
+        cards = Hand(cards).cards
+    first, second = sorted(card.index for card in cards)
+    return COMBO_INDEX[(first, second)]
+
+
+class Deck(object):
+    """
+    The 52 cards as a preallocated array of card indices, dealt by a partial Fisher-Yates shuffle
+
+    The cards still in the deck are cards[:size]. Dealing swaps a random live card to the end of that region and
+    shrinks it, and removing a known card swaps it to the end through its stored position, so both cost O(1) per
+    card. A reset only moves the cursor back to 52.
+    """
+
+    __slots__ = ("cards", "positions", "size", "dealt_mask", "rng")
+
+    def __init__(self, rng=None):
+        """
+
+        Args:
+            rng: random.Random
+                source of randomness, the global random module if None
+        """
+        self.rng = rng if rng is not None else random
+        self.cards = array("B", range(52))
+        self.positions = array("B", range(52))
+        self.reset()
+
+    def reset(self):
+        self.size = 52
+        self.dealt_mask = 0
+
+    def take(self, position):
+        """
+        Swaps the card at a position to the end of the live cards and removes it
+
+        Returns:
+            Card
+        """
+        last = self.size - 1
+        index = self.cards[position]
+        moved = self.cards[last]
+        self.cards[position] = moved
+        self.positions[moved] = position
+        self.cards[last] = index
+        self.positions[index] = last
+        self.size = last
+        self.dealt_mask |= 1 << index
+        return DECK[index]
+
+    def deal(self, number_of_cards=1):
+        """
+        Deals random cards
+
+        Returns:
+            list of Card objects
+        """
+        if number_of_cards > self.size:
+            raise ValueError("Not enough cards left in the deck")
+        return [self.take(self.rng.randrange(self.size)) for _ in range(number_of_cards)]
+
+    def remove(self, card):
+        if self.dealt_mask & card.mask:
+            raise ValueError(f"{card} is not in the deck")
+        self.take(self.positions[card.index])
+
+    def remove_cards(self, cards):
+        """
+        Removes known cards, skipping any that are already out of the deck
+        """
+        for card in cards:
+            if not self.dealt_mask & card.mask:
+                self.take(self.positions[card.index])
+
+    def remaining_cards(self):
+        return [DECK[index] for index in self.cards[: self.size]]
+
+    def __contains__(self, card):
+        return not self.dealt_mask & card.mask
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        return f"Deck({self.size} cards)"
 
 
 class Hand(object):
@@ -81,32 +310,12 @@ class Hand(object):
                 "Cards must be provided as a string or list of Card Objects"
             )
 
-        self.ranks_to_values = {
-            "2": 2,
-            "3": 3,
-            "4": 4,
-            "5": 5,
-            "6": 6,
-            "7": 7,
-            "8": 8,
-            "9": 9,
-            "T": 10,
-            "J": 11,
-            "Q": 12,
-            "K": 13,
-            "A": 14,
-        }
-
-        self.values_to_ranks = {
-            value: key for key, value in self.ranks_to_values.items()
-        }
+        self.ranks_to_values = RANKS_TO_VALUES
+        self.values_to_ranks = VALUES_TO_RANKS
+        self.all_suits = SUIT_SYMBOLS
 
-        self.all_suits = {
-            "s": "\u2660",
-            "h": "\u2665",
-            "c": "\u2663",
-            "d": "\u2666",
-        }
+        # integer bit mask of the hand for fast set operations against decks
+        self.mask = cards_to_mask(self.cards)
 
     def get_hand_from_string(self):
         cards = []
@@ -128,31 +337,635 @@ class Hand(object):
         return str(self.cards)
 
 
+# integer chip units per big blind, pots are settled in whole units so splits never lose chips to rounding
+CHIP_UNITS = 100
+
+
+def to_chip_units(amount):
+    """
+    Converts an amount in big blinds to whole chip units
+    """
+    return int(round(amount * CHIP_UNITS))
+
+
+class Pot(object):
+    """
+    A main or side pot settled by resolve_pots
+
+    Args:
+        amount: int
+            chip units in the pot
+        level: int
+            contribution level (in chip units) that a player needed to put in to be eligible
+        winners: list
+            players sharing the pot, in odd chip order
+        shares: list
+            chip units won by each winner
+    """
+
+    __slots__ = ("amount", "level", "winners", "shares")
+
+    def __init__(self, amount, level, winners, shares):
+        self.amount = amount
+        self.level = level
+        self.winners = winners
+        self.shares = shares
+
+    def __repr__(self):
+        return f"Pot({self.amount / CHIP_UNITS} BB won by {self.winners})"
+
+
+def resolve_pots(contributions, ranked_players, seat_order=None):
+    """
+    Builds the main and side pots from what each player put in and awards them
+
+    Players are sorted by contribution once. Every distinct contribution level forms a pot of the difference to
+    the level below from each player who put in at least that much, and the live players among them are
+    eligible. Walking the levels from the top down adds players to the eligible set one at a time, so the best
+    ranked eligible players are tracked incrementally and the whole settlement is O(n log n). Chips in a level
+    that no live player reached (dead money from folded players) go to the pot below it, or to the best live
+    players if none of them put anything in. Each pot is split in whole units and the odd units go one each to
+    the winners in seat order.
+
+    Args:
+        contributions: dict
+            player to the chip units they put in, folded players included
+        ranked_players: list
+            groups of live players with equal hands, best first (as BoardAnalysis.ranked_players)
+        seat_order: list
+            players in odd chip order (first left of the button), the order of contributions if None
+
+    Returns:
+        tuple of (dict of player to chip units won, list of Pot from the main pot up)
+    """
+    rank = {player: i for i, group in enumerate(ranked_players) for player in group}
+    if not any(player in rank for player in contributions):
+        raise ValueError("A pot needs at least one live player")
+    if seat_order is None:
+        seat_order = list(contributions)
+    seat = {player: i for i, player in enumerate(seat_order)}
+
+    players = sorted(contributions, key=lambda player: contributions[player])
+    levels = []
+    previous_level = 0
+    for i, player in enumerate(players):
+        level = contributions[player]
+        if level > previous_level:
+            levels.append((level, (level - previous_level) * (len(players) - i), i))
+            previous_level = level
+
+    winnings = {player: 0 for player in players}
+    pots = []
+    best_rank = None
+    leaders = []
+    dead_money = 0
+    end = len(players)
+    # a final level of 0 makes the live players who put nothing in eligible for any dead money left over
+    for level, amount, start in reversed([(0, 0, 0)] + levels):
+        for player in players[start:end]:
+            player_rank = rank.get(player)
+            if player_rank is None:
+                continue
+            if best_rank is None or player_rank < best_rank:
+                best_rank = player_rank
+                leaders = [player]
+            elif player_rank == best_rank:
+                leaders.append(player)
+        end = start
+
+        if not leaders:
+            dead_money += amount
+            continue
+
+        amount += dead_money
+        dead_money = 0
+        if not amount:
+            continue
+        winners = sorted(leaders, key=lambda player: seat.get(player, len(seat)))
+        share, odd_chips = divmod(amount, len(winners))
+        shares = [share + 1 if i < odd_chips else share for i in range(len(winners))]
+        for winner, winner_share in zip(winners, shares):
+            winnings[winner] += winner_share
+        pots.append(Pot(amount, level, winners, shares))
+
+    pots.reverse()
+    return winnings, pots
+
+
+class ActionType(IntEnum):
+    """
+    Kinds of betting action, a compiled action is a tuple of an ActionType and an amount in chip units
+    """
+
+    FOLD = 0
+    CHECK = 1
+    CALL = 2
+    RAISE = 3
+
+
+# betting round names and the Player attribute holding each round's scripted actions
+SCRIPT_ATTRIBUTES = {
+    "pre-flop": "pre_flop_actions",
+    "post-flop": "post_flop_actions",
+    "turn": "turn_actions",
+    "river": "river_actions",
+}
+BETTING_ROUNDS = list(SCRIPT_ATTRIBUTES)
+BETTING_ROUND_INDEX = {betting_round: i for i, betting_round in enumerate(BETTING_ROUNDS)}
+
+# number of table cards the players can see in each betting round, later cards may already be defined
+VISIBLE_TABLE_CARDS = {"pre-flop": 0, "post-flop": 3, "turn": 4, "river": 5}
+
+# every position name in post-flop order
+POSITIONS = ["SB", "BB", "UTG", "UTG+1", "UTG+2", "LJ", "HJ", "CO", "BTN"]
+POSITION_INDEX = {position: i for i, position in enumerate(POSITIONS)}
+
+# scripted action strings already compiled, so each distinct string is only parsed once
+def compile_action(action):
+    """
+    Compiles a scripted action such as "fold", "check", "call" or "raise to 2.5"
+
+    Args:
+        action: Union[str, tuple]
+            action string or an already compiled action
+
+    Returns:
+        tuple of (ActionType, amount in chip units), the amount is the total raised to and 0 for other actions
+    """
+    if isinstance(action, tuple):
+        kind, amount = action
+        return ActionType(kind), int(amount)
+    return parse_action(action)
+
+
+# bounded so that long runs over imported histories with many different raise sizes keep a flat memory footprint
+@functools.lru_cache(maxsize=4096)
+def parse_action(action):
+    """
+    Parses an action string for compile_action, the most recently used actions are cached
+    """
+    words = action.lower().split()
+    if len(words) == 1 and words[0] in ("fold", "check", "call"):
+        return ActionType[words[0].upper()], 0
+    if len(words) == 3 and words[:2] == ["raise", "to"]:
+        try:
+            amount = to_chip_units(float(words[2]))
+        except ValueError:
+            raise ValueError(f"Invalid raise size in {action}")
+        if amount <= 0:
+            raise ValueError(f"Raise size must be positive in {action}")
+        return ActionType.RAISE, amount
+    raise ValueError(f"Invalid action {action}")
+
+
+def action_string(action):
+    """
+    Display string of a compiled action, e.g. "raise to 2.5"
+    """
+    kind, amount = action
+    if kind == ActionType.RAISE:
+        return f"raise to {amount / CHIP_UNITS:g}"
+    return kind.name.lower()
+
+
+def compile_script(player):
+    """
+    Compiles a player's scripted actions for every betting round
+
+    Returns:
+        dict of betting round to list of compiled actions
+    """
+    return {
+        betting_round: [compile_action(action) for action in getattr(player, attribute)]
+        for betting_round, attribute in SCRIPT_ATTRIBUTES.items()
+    }
+
+
+def validate_script(player, script):
+    """
+    Checks a compiled script before the hand starts
+
+    A raise to more than the player's stack is not an error, it is capped at the stack when it is played and puts
+    the player all in.
+
+    Args:
+        player: Player
+        script: dict
+            compiled actions by betting round, as returned by compile_script
+
+    Raises:
+        ValueError: if the player acts after folding or raises to less than an earlier raise in the same round
+    """
+    folded = False
+    for betting_round in SCRIPT_ATTRIBUTES:
+        last_raise = 0
+        for kind, amount in script[betting_round]:
+            if folded:
+                raise ValueError(f"{player.name} has an action after folding")
+            if kind == ActionType.FOLD:
+                folded = True
+            elif kind == ActionType.RAISE:
+                if amount <= last_raise:
+                    raise ValueError(
+                        f"{player.name} raises to {amount / CHIP_UNITS:g} after raising to "
+                        f"{last_raise / CHIP_UNITS:g} on the {betting_round}"
+                    )
+                last_raise = amount
+
+
+class DecisionState(
+    namedtuple(
+        "DecisionState",
+        [
+            "player",
+            "position",
+            "betting_round",
+            "cards",
+            "board",
+            "pot",
+            "to_call",
+            "current_bet",
+            "called_for",
+            "stack",
+            "stacks",
+            "legal_actions",
+            "min_raise",
+            "max_raise",
+        ],
+    )
+):
+    """
+    Read-only view of one decision, handed to a Strategy
+
+    Every amount is in chip units (see CHIP_UNITS) and raise amounts are totals raised to, as in compiled actions.
+
+    Attributes:
+        player: Player
+            the player to act, only meant to identify them
+        position: str
+        betting_round: str
+            'pre-flop', 'post-flop', 'turn' or 'river'
+        cards: tuple
+            the player's hole cards
+        board: tuple
+            the table cards visible in this betting round
+        pot: int
+        to_call: int
+            amount needed to call, 0 if the player can check
+        current_bet: int
+            the total everyone has to match in this round
+        called_for: int
+            the amount the player already put in this round
+        stack: int
+            the player's chips behind
+        stacks: tuple
+            chips behind of every player still in the hand, in seat order
+        legal_actions: tuple
+            ActionType values the player can take
+        min_raise: int
+            smallest total that can be raised to
+        max_raise: int
+            largest total that can be raised to, 0 if the player cannot raise
+    """
+
+    __slots__ = ()
+
+
+def check_action(decision, action):
+    """
+    Compiles an action for a decision and checks that it is legal
+
+    Args:
+        decision: DecisionState
+        action: Union[str, tuple]
+            any action compile_action accepts
+
+    Returns:
+        the compiled action
+
+    Raises:
+        ValueError: if the action is invalid or not legal for the decision
+    """
+    action = compile_action(action)
+    kind, amount = action
+    if kind not in decision.legal_actions or (
+        kind == ActionType.RAISE and not decision.min_raise <= amount <= decision.max_raise
+    ):
+        raise ValueError(f"{action_string(action)} is not legal for {decision.player.name}")
+    return action
+
+
+class Strategy(object):
+    """
+    Decides the actions of a player, a bot plugged into InteractivePoker
+
+    decide gets a DecisionState and returns any action compile_action accepts, e.g. "call", "raise to 3" or
+    (ActionType.RAISE, 300). decide_batch gets many decisions at once, possibly from many tables, and can be
+    overridden by strategies that are cheaper when batched.
+    """
+
+    def decide(self, decision):
+        raise NotImplementedError
+
+    def decide_batch(self, decisions):
+        return [self.decide(decision) for decision in decisions]
+
+
+SEPARATOR = "=" * 40
+THIN_SEPARATOR = "-" * 40
+
+
+def cards_string(cards):
+    return "".join([str(card) for card in cards])
+
+
+class PokerEvent(object):
+    """
+    Something that happened during a hand, emitted by Poker to its event sink
+
+    The data holds the objects involved (players, cards, amounts) and the display string is only built when the
+    event is converted to a string, so headless games never format any text.
+
+    Kinds and their data:
+        hand_start: players (in seat order), chips (of each player before the blinds)
+        deal: hands (list of (player, cards))
+        blind: player, blind ('small' or 'big'), amount
+        round_start: betting_round
+        action: player, chips (before the action), action (compiled)
+        all_in: player
+        raise_adjusted: player, requested, size, reason ('chips' or 'covered')
+        pot: pot
+        bet_returned: player, amount
+        round_end: betting_round, pot
+        street: street ('flop', 'turn' or 'river'), cards (newly dealt), table_cards
+        no_more_betting: no data
+        showdown: hands (list of (player, cards, HandRanking))
+        payout: player, amount, chips (after the payout), rank (None if the pot was uncontested), ranking
+        hand_end: table_cards (every table card of the hand, including any that were never shown)
+    """
+
+    __slots__ = ("kind", "data")
+
+    kinds = [
+        "hand_start",
+        "deal",
+        "blind",
+        "round_start",
+        "action",
+        "all_in",
+        "raise_adjusted",
+        "pot",
+        "bet_returned",
+        "round_end",
+        "street",
+        "no_more_betting",
+        "showdown",
+        "payout",
+        "hand_end",
+    ]
+
+    def __init__(self, kind, **data):
+        self.kind = kind
+        self.data = data
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def __str__(self):
+        data = self.data
+        if self.kind == "deal":
+            lines = [f"{player.name}: {cards_string(cards)}" for player, cards in data["hands"]]
+            return "\n".join([SEPARATOR] + lines + [SEPARATOR])
+        if self.kind == "blind":
+            return f"{data['player'].name} posts {data['blind']} blind"
+        if self.kind == "round_start":
+            return "\n".join([SEPARATOR, str(data["betting_round"]).center(40), SEPARATOR])
+        if self.kind == "action":
+            return f"{SEPARATOR}\n{data['player']}({float(data['chips'])} BB) {action_string(data['action'])}"
+        if self.kind == "all_in":
+            return f"{data['player'].name} is all in"
+        if self.kind == "raise_adjusted":
+            if data["reason"] == "chips":
+                return f"raise size ({data['requested']}) is greater than number of chips ({data['size']})"
+            return (
+                f"raise size reduced from {data['requested']} to {data['size']} as this is the maximum needed.\n"
+                f"{data['requested'] - data['size']} returned to {data['player'].name}"
+            )
+        if self.kind == "pot":
+            return f"Pot = {data['pot']}"
+        if self.kind == "bet_returned":
+            return f"{data['amount']} uncalled bet returned to {data['player'].name}"
+        if self.kind == "round_end":
+            return "\n".join(
+                [
+                    THIN_SEPARATOR,
+                    f"After {data['betting_round']} betting, pot size is {data['pot']} BB",
+                    SEPARATOR,
+                ]
+            )
+        if self.kind == "street":
+            if data["street"] == "flop":
+                return f"Flop cards: {cards_string(data['cards'])}"
+            # the newest card is shown in brackets
+            table_cards = data["table_cards"]
+            shown_cards = table_cards[:-1] if data["street"] == "turn" else table_cards
+            table_string = cards_string(shown_cards[:-1]) + f"({cards_string(shown_cards[-1:])})"
+            return f"{data['street'].capitalize()} card: {data['cards'][0]}\nTable Cards: {table_string}"
+        if self.kind == "no_more_betting":
+            return f"No more betting as a player(s) are all in\n{SEPARATOR}"
+        if self.kind == "showdown":
+            lines = [THIN_SEPARATOR]
+            for player, cards, ranking in data["hands"]:
+                lines += [f"{player.name}({cards_string(cards)}): {ranking_display(ranking)}", THIN_SEPARATOR]
+            return "\n".join(lines)
+        if self.kind == "payout":
+            player = data["player"]
+            if data["rank"] is None:
+                return f"{player.name} wins {data['amount']} BB and has {data['chips']} BB"
+            if not data["amount"]:
+                return f"In Rank {data['rank']} {player.name} with {ranking_display(data['ranking'])} loses"
+            return (
+                f"In Rank {data['rank']} {player.name} with {ranking_display(data['ranking'])} "
+                f"and collects {data['amount']}"
+            )
+        return f"{self.kind}: {data}"
+
+    def __repr__(self):
+        return f"PokerEvent({self.kind})"
+
+
+def ranking_display(ranking):
+    """
+    Display string of a HandRanking such as "a pair: A♥A♦ with kickers K♠7♣2♦", None if there is no ranking
+    """
+    if not isinstance(ranking, HandRanking):
+        return None
+    return BoardAnalysis.ranking_string(ranking.hand_class, ranking.cards)
+
+
+class EventSink(object):
+    """
+    Receives the events of a Poker game
+    """
+
+    # kinds of event the sink wants, None for every kind, the game does not build any other event
+    kinds = None
+
+    def emit(self, event):
+        raise NotImplementedError
+
+
+class ConsoleSink(EventSink):
+    """
+    Prints every event with a display string, the default output of Poker
+    """
+
+    # events that only mark the boundaries of a hand
+    silent_kinds = ("hand_start", "hand_end")
+
+    def emit(self, event):
+        if event.kind not in self.silent_kinds:
+            print(event)
+
+
+class EventLog(EventSink):
+    """
+    Keeps every event in a list
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+    def of_kind(self, kind):
+        return [event for event in self.events if event.kind == kind]
+
+    def clear(self):
+        self.events = []
+
+
+class BettingRound(object):
+    """
+    State machine of one betting round over a circular array of seats
+
+    The players who can still act are linked in a ring by next and previous seat arrays, so the player to act is
+    one pointer away and a player who folds, goes all in or runs out of actions leaves the ring in O(1). A count
+    of the players still owed an action is the closed-action test. Effective stacks (chips plus the amount put in
+    this round, which stays constant for a player during the round) are kept sorted so the largest stack another
+    player can match is read directly rather than re-sorted on every action. The round is closed as soon as only
+    one player who has not folded is left. The largest raise increment of the round sets the minimum re-raise.
+    """
+
+    __slots__ = ("players", "next_seat", "previous_seat", "current", "size", "pending", "stacks", "last_raise")
+
+    def __init__(self, players, stacks):
+        """
+
+        Args:
+            players: list
+                players who can act, in betting order
+            stacks: iterable
+                effective stacks of every player who has not folded, including those who cannot act
+        """
+        number_of_players = len(players)
+        self.players = players
+        self.next_seat = [(seat + 1) % number_of_players for seat in range(number_of_players)]
+        self.previous_seat = [(seat - 1) % number_of_players for seat in range(number_of_players)]
+        self.current = 0
+        self.size = number_of_players
+        self.pending = number_of_players
+        self.stacks = sorted(stacks)
+        self.last_raise = 0
+
+    @property
+    def closed(self):
+        return self.pending <= 0 or not self.size or len(self.stacks) < 2
+
+    def player_to_act(self):
+        return self.players[self.current]
+
+    def acted(self):
+        """
+        The player to act checked or called and stays in the ring
+        """
+        self.pending -= 1
+        self.current = self.next_seat[self.current]
+
+    def unlink(self, seat):
+        self.next_seat[self.previous_seat[seat]] = self.next_seat[seat]
+        self.previous_seat[self.next_seat[seat]] = self.previous_seat[seat]
+        self.size -= 1
+
+    def leave(self):
+        """
+        The player to act folded, went all in calling or has no actions left
+        """
+        seat = self.current
+        self.unlink(seat)
+        self.pending -= 1
+        self.current = self.next_seat[seat]
+
+    def raised(self, all_in=False, increment=0):
+        """
+        The player to act raised by increment over the previous bet, every other player in the ring has to act
+        again
+
+        Only a raise touches other seats, it marks the players it reopens the action for. An all in raise smaller
+        than the last increment does not lower the next minimum raise.
+        """
+        self.last_raise = max(self.last_raise, increment)
+        seat = self.current
+        if all_in:
+            self.unlink(seat)
+            self.pending = self.size
+        else:
+            self.pending = self.size - 1
+
+        other_seat = self.next_seat[seat]
+        for _ in range(self.pending):
+            self.players[other_seat].to_act = True
+            other_seat = self.next_seat[other_seat]
+        self.current = self.next_seat[seat]
+
+    def remove_stack(self, stack):
+        del self.stacks[bisect.bisect_left(self.stacks, stack)]
+
+    def largest_matchable_stack(self):
+        """
+        Second largest effective stack, nobody can be made to put in more than this, 0 without an opponent
+        """
+        return self.stacks[-2] if len(self.stacks) > 1 else 0
+
+
 class Poker(object):
     """
     A class that plays a single game of no-limit texas hold-em poker
+
+    Args:
+        players: list
+            Player objects in the game
+        table_cards: list
+            any table cards that are already defined
+        rng: random.Random
+            source of randomness for dealing, the global random module if None. Pass a seeded instance to make
+            games reproducible independently of other users of random
+        sink: EventSink
+            receives a PokerEvent for everything that happens in the game, a ConsoleSink if None
+        headless: bool
+            if True and no sink is given events are dropped without being built, nothing is printed
     """
 
-    def __init__(self, players: list, table_cards=None):
+    # position names and betting orders by number of players, built once per table size and shared by all games
+    position_maps = {}
+
+    def __init__(self, players: list, table_cards=None, rng=None, sink=None, headless=False):
 
         self.suits = ["c", "s", "d", "h"]
-        self.hand_values = {
-            "2": 2,
-            "3": 3,
-            "4": 4,
-            "5": 5,
-            "6": 6,
-            "7": 7,
-            "8": 8,
-            "9": 9,
-            "T": 10,
-            "J": 11,
-            "Q": 12,
-            "K": 13,
-            "A": 14,
-        }
+        self.hand_values = RANKS_TO_VALUES
 
-        self.hand_rankings = {value: key for key, value in self.hand_values.items()}
+        self.hand_rankings = VALUES_TO_RANKS
 
         self.rankings = {
             9: "royal_flush",
@@ -167,48 +980,26 @@ class Poker(object):
             0: "high_card",
         }
 
-        self.pot = 0.0
-        self.deck = [
-            Card(value + suit) for suit in self.suits for value in self.hand_values
-        ]
-        self.remaining_deck = deepcopy(self.deck)
+        self.rng = rng if rng is not None else random
+        self.sink = sink if sink is not None or headless else ConsoleSink()
+        self.deck = Deck(self.rng)
+        self.betting_rounds = BETTING_ROUNDS
 
-        self.players = players
-        self.folded_players = []
-        self.ranked_players = None
-        self.current_raiser = None
-        self.player_hands = {}
-        self.number_of_players = len(self.players)
-        self.seat_numbers = list(range(self.number_of_players))
-        self.active_players = [
-            player.active for player in self.players if player.active is True
-        ]
-        self.betting_rounds = ["pre-flop", "post-flop", "turn", "river"]
+        self.new_hand(players, table_cards)
 
-        # determines up to what stage cards are already defined
-        if table_cards:
-            self.table_cards = table_cards
-            if len(table_cards) < 3:
-                self.flop_cards = table_cards
-            if len(table_cards) >= 3:
-                self.flop_cards = self.table_cards[0:3]
-            if len(table_cards) >= 4:
-                self.turn_card = table_cards[3]
-            else:
-                self.table_cards = []
-            if len(table_cards) >= 5:
-                self.river_card = table_cards[4]
-            else:
-                self.river_card = []
-        else:
-            self.table_cards = []
-            self.flop_cards = []
-            self.turn_card = []
-            self.river_card = []
+    @classmethod
+    def position_map(cls, number_of_players):
+        """
+        Position names and betting orders for a number of players
 
-        self.actions = {"pre-flop": [], "flop": [], "turn": [], "river": []}
+        Returns:
+            tuple of (seat number to position dict, pre-flop order, post-flop order)
+        """
+        position_map = cls.position_maps.get(number_of_players)
+        if position_map is not None:
+            return position_map
 
-        self.positions = {
+        positions = {
             0: "SB",
             1: "BB",
             2: "UTG",
@@ -220,9 +1011,6 @@ class Poker(object):
             8: "BTN",
         }
 
-        # inverted keys and values in self.positions
-        self.positions_keys = dict((v, k) for k, v in self.positions.items())
-
         # pre- and post-flop betting orders are different due to big blinds
         pre_flop_order = ["UTG", "UTG+1", "UTG+2", "LJ", "HJ", "CO", "BTN", "SB", "BB"]
         post_flop_order = ["SB", "BB", "UTG", "UTG+1", "UTG+2", "LJ", "HJ", "CO", "BTN"]
@@ -231,31 +1019,115 @@ class Poker(object):
         removal_order = [4, 3, 2, 5, 6, 7, 8]
 
         # rename positions based on the number of players
-        if self.number_of_players < 9:
+        if number_of_players < 9:
 
             # delete unnecessary players and get a playing order
-            for j in range(0, 9 - self.number_of_players):
-                del self.positions[removal_order[j]]
+            for j in range(0, 9 - number_of_players):
+                del positions[removal_order[j]]
 
         # orders of play
-        self.pre_flop_order = [
-            x for x in pre_flop_order if x in self.positions.values()
-        ]
-        self.post_flop_order = [
-            x for x in post_flop_order if x in self.positions.values()
+        position_map = (
+            positions,
+            [x for x in pre_flop_order if x in positions.values()],
+            [x for x in post_flop_order if x in positions.values()],
+        )
+        cls.position_maps[number_of_players] = position_map
+        return position_map
+
+    def new_hand(self, players=None, table_cards=None):
+        """
+        Resets all per-hand state in place so the same game can play another hand
+
+        The deck is reset by moving its cursor rather than rebuilt and the position maps are shared between games
+        with the same number of players. The players' own per-hand state is reset with Player.new_hand.
+
+        Args:
+            players: list
+                Player objects of the new hand with their current_position set, the players of the last hand if None
+            table_cards: list
+                any table cards that are already defined
+        """
+        if players is None:
+            players = self.seated_players
+
+        # chips in the pot, in chip units
+        self.pot_units = 0
+        self.deck.reset()
+
+        # players who fold are removed from self.players during the hand
+        self.seated_players = list(players)
+        self.players = players
+        self.folded_players = []
+        self.ranked_players = None
+        self.current_raiser = None
+        self.player_hands = {}
+        self.number_of_players = len(self.players)
+        self.seat_numbers = list(range(self.number_of_players))
+        self.active_players = [
+            player.active for player in self.players if player.active is True
         ]
 
+        # determines up to what stage cards are already defined
+        if table_cards:
+            self.table_cards = list(table_cards)
+            self.flop_cards = self.table_cards[0:3]
+            self.turn_card = table_cards[3] if len(table_cards) >= 4 else []
+            self.river_card = table_cards[4] if len(table_cards) >= 5 else []
+        else:
+            self.table_cards = []
+            self.flop_cards = []
+            self.turn_card = []
+            self.river_card = []
+
+        self.actions = {"pre-flop": [], "flop": [], "turn": [], "river": []}
+
+        self.positions, self.pre_flop_order, self.post_flop_order = self.position_map(
+            self.number_of_players
+        )
+
+        # inverted keys and values in self.positions
+        self.positions_keys = dict((v, k) for k, v in self.positions.items())
+
         self.player_positions = dict(
             (player.current_position, player) for player in self.players
         )
 
+        # cards already defined can never be dealt
+        self.deck.remove_cards(table_cards or [])
+
+        # incremental evaluator state of the table cards, extended as each street is dealt
+        self.table_state = HandState(self.table_cards)
+
+        # compiled action scripts of the players, built when the hand is played
+        self.scripts = None
+
         # showdown parameters
         self.showdown_card_analysis = None
         self.winners = None
+        self.pots = []
 
         # a side pot = current pot + (1 + N(call/raise)) * all_in_raise_size
         self.number_of_pots = 1
 
+    @property
+    def remaining_deck(self):
+        return self.deck.remaining_cards()
+
+    @property
+    def pot(self):
+        """
+        Chips in the pot in big blinds, for display
+        """
+        return self.pot_units / CHIP_UNITS
+
+    def emit(self, kind, **data):
+        """
+        Sends an event to the sink, if there is one and it wants this kind
+        """
+        sink = self.sink
+        if sink is not None and (sink.kinds is None or kind in sink.kinds):
+            sink.emit(PokerEvent(kind, **data))
+
     def deal(self):
         """
         Deals cards to each player than does not already have a set hand
@@ -263,13 +1135,8 @@ class Poker(object):
         Returns:
             None
         """
-        print("=" * 40)
-
         # if cards are already specified they are removed from the deck
-        if self.table_cards:
-            self.remaining_deck = [
-                card for card in self.remaining_deck if card not in self.table_cards
-            ]
+        self.deck.remove_cards(self.table_cards)
 
         # players split into those already dealt and not dealt so cards are not dealt twice
         pre_dealt_players = [player for player in self.players if player.cards != []]
@@ -278,383 +1145,335 @@ class Poker(object):
         for player in pre_dealt_players:
 
             # if player cards are already defined then remove from deck and don't deal them cards
-            self.remaining_deck = [
-                card for card in self.remaining_deck if card not in player.cards
-            ]
+            self.deck.remove_cards(player.cards)
             self.player_hands[player] = player.cards
-            print_cards = ""
-            for card in self.player_hands[player]:
-                print_cards += str(card)
-            print(f"{player.name}: {print_cards}")
 
         for player in other_players:
-            self.player_hands[player] = random.sample(self.remaining_deck, 2)
-            self.remaining_deck = [
-                card
-                for card in self.remaining_deck
-                if card not in self.player_hands[player]
-            ]
+            self.player_hands[player] = self.deck.deal(2)
             player.cards = self.player_hands[player]
-            print_cards = ""
-            for card in self.player_hands[player]:
-                print_cards += str(card)
-            print(f"{player.name}: {print_cards}")
-            self.remaining_deck = [
-                card
-                for card in self.remaining_deck
-                if card not in self.player_hands[player]
-            ]
-
-        print("=" * 40)
+
+        self.emit(
+            "deal",
+            hands=[(player, self.player_hands[player]) for player in pre_dealt_players + other_players],
+        )
+
+    def compile_scripts(self):
+        """
+        Compiles and validates every player's scripted actions once for the whole hand
+
+        Raises:
+            ValueError: if any script is invalid, see validate_script
+        """
+        self.scripts = {}
+        for player in self.players:
+            script = compile_script(player)
+            validate_script(player, script)
+            self.scripts[player] = script
 
     def post_blinds(self):
         """
         Takes a small blind from player in the SB position and a big blind from a player in the BB position
+
+        A player with less than their blind posts their whole stack and is all in.
+
+        Returns:
+            the largest blind posted in chip units, the bet the other players have to call
         """
+        largest_blind = 0
         for player in self.players:
 
             # small blind posts half a big blind
             if player.current_position == "SB":
-                player.chips -= 0.5
-                self.pot += 0.5
-                player.called_for = 0.5
-                player.contributed_to_pot += 0.5
-                print(f"{player.name} posts small blind")
+                blind, amount = "small", CHIP_UNITS // 2
 
             # big blind posts a full big blind
             elif player.current_position == "BB":
-                player.chips -= 1.0
-                self.pot += 1.0
-                player.called_for = 1.0
-                player.contributed_to_pot += 1.0
-                print(f"{player.name} posts big blind")
+                blind, amount = "big", CHIP_UNITS
             else:
                 continue
 
+            amount = min(amount, player.chip_units)
+            player.chip_units -= amount
+            self.pot_units += amount
+            player.called_for = amount
+            player.contributed_to_pot += amount
+            largest_blind = max(largest_blind, amount)
+            self.emit("blind", player=player, blind=blind, amount=amount / CHIP_UNITS)
+
+            if not player.chip_units:
+                player.all_in = True
+                player.active = False
+                player.all_in_round = "pre-flop"
+                self.emit("all_in", player=player)
+        return largest_blind
+
+    def strategy_for(self, player):
+        """
+        The Strategy deciding a player's actions, None for players who follow their script
+        """
+        return None
+
+    def play_decisions(self, steps):
+        """
+        Runs a generator of the game (see betting_steps), answering every decision with the player's strategy
+        """
+        decision = next(steps, None)
+        while decision is not None:
+            action = self.strategy_for(decision.player).decide(decision)
+            try:
+                decision = steps.send(action)
+            except StopIteration:
+                decision = None
+
     def betting_action(self, betting_round="pre-flop"):
         """
+        Plays one betting round, see betting_steps
+
         Args:
             betting_round: str
                 Defines the current betting round. Options are 'pre-flop', 'post-flop', 'turn' and 'river'
 
         """
+        self.play_decisions(self.betting_steps(betting_round))
 
-        # initialise all players as still to act
-        for player in self.player_positions.values():
-            player.to_act = True
-
-        i = 0
+    def decision_state(self, player, betting_round, current_raise_size, state):
+        """
+        Builds the DecisionState of the player to act
+        """
+        current_bet = current_raise_size
+        called_for = player.called_for
+        stack = player.chip_units
+        to_call = max(current_bet - called_for, 0)
+        stacks = tuple(other.chip_units for other in self.players if not other.folded)
+
+        # without an opponent left there is nothing to fold to or raise against
+        legal_actions = (ActionType.CHECK if to_call == 0 else ActionType.CALL,)
+        if len(stacks) > 1:
+            legal_actions = (ActionType.FOLD,) + legal_actions
+        max_raise = min(stack + called_for, state.largest_matchable_stack())
+        if len(stacks) > 1 and stack > to_call and max_raise > current_bet:
+            legal_actions += (ActionType.RAISE,)
+            # a raise has to be at least the last raise of the round and at least one big blind
+            min_raise = min(current_bet + max(state.last_raise, CHIP_UNITS), max_raise)
+        else:
+            max_raise = min_raise = 0
+
+        return DecisionState(
+            player,
+            player.current_position,
+            betting_round,
+            tuple(player.cards),
+            tuple(self.table_cards[: VISIBLE_TABLE_CARDS[betting_round]]),
+            self.pot_units,
+            to_call,
+            current_bet,
+            called_for,
+            stack,
+            stacks,
+            legal_actions,
+            min_raise,
+            max_raise,
+        )
 
-        # collect actions
-        round_actions = []
-        current_raise_size = 0
-        raiser = None
+    def betting_steps(self, betting_round="pre-flop"):
+        """
+        Generator playing one betting round
 
-        current_number_of_calls = 0
-        current_number_of_raises = 0
+        Every amount is kept in whole chip units. The round is driven by a BettingRound over the players who can
+        act in betting order. A player with a strategy (see strategy_for) gets their action by yielding a
+        DecisionState and receiving the action sent back, every other player uses the next action of their script
+        for the round and a player whose script runs out stops acting. Every action costs O(1) apart from a raise,
+        which reopens the action for the other players.
 
-        for player in self.players:
-            player.called_for = 0
+        Args:
+            betting_round: str
+                Defines the current betting round. Options are 'pre-flop', 'post-flop', 'turn' and 'river'
 
-        # players are no longer active after they fold
-        if betting_round == "pre-flop":
-            # post_blinds
-            self.post_blinds()
-            order = self.pre_flop_order
-            actions = {p: p.pre_flop_actions for p in self.player_positions.values()}
-            current_raise_size = 1
-        elif betting_round == "post-flop":
-            order = self.post_flop_order
-            actions = {p: p.post_flop_actions for p in self.player_positions.values()}
-        elif betting_round == "turn":
-            order = self.post_flop_order
-            actions = {p: p.turn_actions for p in self.player_positions.values()}
-        elif betting_round == "river":
-            order = self.post_flop_order
-            actions = {p: p.river_actions for p in self.player_positions.values()}
-        else:
+        Raises:
+            ValueError: if a strategy sends an action that is not legal
+        """
+        if betting_round not in SCRIPT_ATTRIBUTES:
             raise ValueError(
                 "Value of betting_round not valid. only "
                 "'pre_flop', 'post_flop', 'turn', 'river' are valid."
             )
+        if self.scripts is None:
+            self.compile_scripts()
 
-        # keeps looping until there is no more betting
-        while any(
-            [
-                player.to_act
-                for player in self.player_positions.values()
-                if player.active
-            ]
-        ):
+        current_raise_size = 0
 
-            current_raiser = None
-            all_in_players = [player for player in self.players if player.all_in]
+        # players who folded in an earlier round still count when the uncalled part of a bet is worked out
+        for player in self.seated_players:
+            player.called_for = 0
 
-            for position in order:
-                # current_number_of_calls = len([x.caller for x in self.players if x.caller])
-                # current_number_of_calls = len([x.raiser for x in self.players if x.raiser])
-                print("=" * 40)
-                stack_sizes = sorted(
-                    [p.chips + p.called_for for p in self.players], reverse=True
-                )
+        if betting_round == "pre-flop":
+            current_raise_size = self.post_blinds()
+            order = self.pre_flop_order
+        else:
+            order = self.post_flop_order
 
-                # check to see if any player is still active
-                if not any([player.to_act for player in self.players if player.to_act]):
-                    break
+        # players who are all in or out of actions are not seated in the ring
+        seats = [
+            self.player_positions[position]
+            for position in order
+            if position in self.player_positions
+            and self.player_positions[position].active
+            and not self.player_positions[position].all_in
+        ]
+        for player in self.player_positions.values():
+            player.to_act = False
+        for player in seats:
+            player.to_act = True
 
-                # check if position still active (this could be removed by changing the for loop iterator
-                if position not in self.player_positions:
-                    continue
+        round_stacks = {player: player.chip_units + player.called_for for player in self.players}
+        state = BettingRound(seats, round_stacks.values())
+        next_actions = dict.fromkeys(seats, 0)
+        folded_players = []
 
-                player = self.player_positions[position]
+        while not state.closed:
+            player = state.player_to_act()
 
-                if not player.to_act:
-                    continue
+            if self.strategy_for(player) is not None:
+                decision = self.decision_state(player, betting_round, current_raise_size, state)
+                current_action = check_action(decision, (yield decision))
+                kind, amount = current_action
+            else:
+                actions = self.scripts[player][betting_round]
 
-                # get current action from player
-                if not actions[player]:
+                # a player without any actions left stops acting
+                if next_actions[player] >= len(actions):
                     player.active = False
                     player.to_act = False
+                    state.leave()
                     continue
 
-                current_action = actions[player][i]
-                print(f"{player}({float(player.chips)} BB) {current_action}")
+                current_action = actions[next_actions[player]]
+                next_actions[player] += 1
+                kind, amount = current_action
+            self.emit("action", player=player, chips=player.chips, action=current_action)
 
-                round_actions.append(current_action)
-
-                # if player is not active for whatever reason remove them from active_players
-                if not player.active:
-                    del self.player_positions[position]
+            # a raise that the player's stack or the stacks covering it cap at the current bet is only a call
+            if kind == ActionType.RAISE and current_raise_size >= min(
+                amount, player.chip_units + player.called_for, state.largest_matchable_stack()
+            ):
+                kind = ActionType.CALL
+
+            # if action is fold make the player inactive
+            if kind == ActionType.FOLD:
+                player.active = False
+                player.to_act = False
+                player.folded = True
+                folded_players.append(player)
+                self.folded_players.append(player)
+                del self.player_positions[player.current_position]
+                state.remove_stack(round_stacks[player])
+                state.leave()
+
+            # if check, need to stay active but not to act
+            elif kind == ActionType.CHECK:
+                player.to_act = False
+                state.acted()
+
+            # if a player calls their balance loses the amount needed to call, and they remain active until all
+            # players are done. The player.called_for handles if there is a call and reraise
+            elif kind == ActionType.CALL:
+                player.caller = True
+                player.raiser = False
+                player.to_act = False
+
+                # check if calling the current raise size would put the player all in
+                if current_raise_size >= player.chip_units + player.called_for:
+                    self.emit("all_in", player=player)
+                    player.all_in = True
+                    player.active = False
+                    player.all_in_round = betting_round
+                    self.number_of_pots += 1
+
+                    # side pots are settled from contributed_to_pot by resolve_pots at showdown
+                    self.pot_units += player.chip_units
+                    player.called_for += player.chip_units
+                    player.contributed_to_pot += player.chip_units
+                    player.chip_units = 0
+                    state.leave()
                     continue
 
-                # if action is fold make the player inactive
-                if "fold" in current_action:
+                to_call = current_raise_size - player.called_for
+                player.chip_units -= to_call
+                player.contributed_to_pot += to_call
+                self.pot_units += to_call
+                player.called_for = current_raise_size
+                state.acted()
+
+            # betting increases pot size and decreases players chip pile
+            elif kind == ActionType.RAISE:
+
+                # get the size raised to (this will include the amount already called for)
+                raise_size = amount
+
+                # this will not throw an error if the raise size is bigger, it will simply chop down the raise size
+                if raise_size > player.chip_units + player.called_for:
+                    self.emit(
+                        "raise_adjusted",
+                        player=player,
+                        requested=raise_size / CHIP_UNITS,
+                        size=player.chips + player.called_for / CHIP_UNITS,
+                        reason="chips",
+                    )
+                    raise_size = player.chip_units + player.called_for
+
+                # this is to ensure a bet is never more than it needs to be
+                largest_matchable_stack = state.largest_matchable_stack()
+                if raise_size > largest_matchable_stack:
+                    self.emit(
+                        "raise_adjusted",
+                        player=player,
+                        requested=raise_size / CHIP_UNITS,
+                        size=largest_matchable_stack / CHIP_UNITS,
+                        reason="covered",
+                    )
+                    raise_size = largest_matchable_stack
+
+                player.raiser = True
+                player.caller = False
+                player.to_act = False
+                self.current_raiser = player
+
+                all_in = raise_size >= player.chip_units + player.called_for
+                if all_in:
+                    player.all_in = True
+                    player.all_in_round = betting_round
+                    self.emit("all_in", player=player)
                     player.active = False
-                    player.to_act = False
-                    player.folded = True
-                    self.players.remove(player)
-                    self.folded_players = player
-                    del self.player_positions[position]
 
-                # if check, need to stay active but not to act
-                if "check" in current_action:
-                    player.to_act = False
-
-                # if a player calls their balance loses the amount needed to call, and they remain active until all
-                # players are done. The player.called_for handles if there is a call and reraise
-
-                if "call" in current_action:
-                    current_number_of_calls += 1
-                    player.caller = True
-                    player.raiser = False
-
-                    # check if calling the current raise size would put the player all in
-                    if current_raise_size >= player.chips + player.called_for:
-                        print(f"{player.name} is all in")
-                        player.all_in = True
-                        player.to_act = False
-                        player.active = False
-                        player.all_in_round = betting_round
-
-                        all_in_players = [
-                            player for player in self.players if player.all_in
-                        ]
-                        self.number_of_pots += 1
-
-                        self.pot += player.chips
-                        player.side_pot_final_raise_size = (
-                            player.chips + player.called_for
-                        )
-                        player.called_for += player.chips
-                        player.contributed_to_pot += player.chips
-
-                        smaller_all_in_calls = len(
-                            [
-                                x
-                                for x in self.players
-                                if x.all_in
-                                and x.called_for < current_raise_size
-                                and x.all_in_round == betting_round
-                                and not x.raiser
-                            ]
-                        )
-                        player.side_pot += self.pot - sum(
-                            [
-                                x.called_for
-                                for x in self.active_players
-                                if x.name != player.name
-                            ]
-                        )
+                player.chip_units -= raise_size - player.called_for
+                player.contributed_to_pot += raise_size - player.called_for
+                self.pot_units += raise_size - player.called_for
 
-                        player.chips = 0
+                increment = raise_size - current_raise_size
+                current_raise_size = raise_size
+                player.called_for = current_raise_size
 
-                        # all in calls increases by the number of players who have already called
-                        player.number_of_all_in_calls += current_number_of_calls
+                # once a bet is made all other players in the ring now have to act
+                state.raised(all_in, increment)
 
-                        all_in_players = [
-                            player for player in self.players if player.all_in
-                        ]
-                        continue
+            self.emit("pot", pot=self.pot)
 
-                    all_in_players = [
-                        player for player in self.players if player.all_in
-                    ]
+        # folded players leave the hand once the round is over
+        if folded_players:
+            self.players[:] = [player for player in self.players if not player.folded]
 
-                    if player.called_for:
-                        player.chips -= current_raise_size - player.called_for
-                        player.contributed_to_pot += (
-                            current_raise_size - player.called_for
-                        )
-                        self.pot += current_raise_size - player.called_for
-                    else:
-                        player.chips -= current_raise_size
-                        player.contributed_to_pot += current_raise_size
-                        self.pot += current_raise_size
-
-                    player.called_for = current_raise_size
-                    if betting_round == "pre-flop" and player.current_position == "SB":
-                        player.called_for -= 0.5
-
-                    player.to_act = False
-
-                # betting increases pot size and decreases players chip pile
-                if "raise to" in current_action:
-
-                    # get the size raised to (this will include the amount already called for)
-                    raise_size = float(current_action.split()[2])
-
-                    # this will not throw an error if the raise size is bigger, it will simply chop down the raise size
-                    if raise_size > player.chips + player.called_for:
-                        print(
-                            f"raise size ({raise_size}) is greater than number of chips ({player.chips})"
-                        )
-                        raise_size = player.chips
-
-                    # this is to ensure a bet is never more than it needs to be
-                    if raise_size > stack_sizes[1]:
-                        print(
-                            f"raise size reduced from {raise_size} to {stack_sizes[1]} as this is the maximum needed."
-                        )
-                        print(
-                            f"{raise_size - stack_sizes[1]} returned to {player.name}"
-                        )
-                        raise_size = stack_sizes[1]
-
-                    # there can only be one raiser
-                    # for other_player in self.players:
-                    #    other_player.raiser = False
-
-                    player.raiser = True
-                    player.caller = False
-                    self.current_raiser = player
-
-                    current_number_of_raises = 1
-                    raiser = player
-                    current_number_of_calls = 0
-
-                    if raise_size >= player.chips + player.called_for:
-
-                        player.all_in = True
-                        player.all_in_round = betting_round
-                        print(f"{player.name} is all in!")
-                        player.active = False
-                        smaller_all_in_calls = len(
-                            [
-                                x
-                                for x in self.players
-                                if x.all_in
-                                and x.called_for < current_raise_size
-                                and x.current_position in order
-                                and x.name != player.name
-                            ]
-                        )
-
-                        player.side_pot_final_raise_size = (
-                            player.chips + player.called_for
-                        )
-                        player.side_pot += self.pot - sum(
-                            [
-                                x.called_for
-                                for x in self.active_players
-                                if x.name != player.name
-                            ]
-                        )
-
-                        all_in_players = [
-                            player for player in self.players if player.all_in
-                        ]
-
-                        if player.called_for:
-                            player.chips -= raise_size - player.called_for
-                            player.contributed_to_pot += raise_size - player.called_for
-                            self.pot += raise_size - player.called_for
-                        else:
-                            player.chips -= raise_size
-                            player.contributed_to_pot += raise_size
-                            self.pot += raise_size
-                    else:
-                        if player.called_for:
-                            player.chips -= raise_size - player.called_for
-                            player.contributed_to_pot += raise_size - player.called_for
-                            self.pot += raise_size - player.called_for
-                        else:
-                            player.chips -= raise_size
-                            player.contributed_to_pot += raise_size
-                            self.pot += raise_size
-
-                    current_raise_size = raise_size
-                    player.called_for = current_raise_size
-
-                    if betting_round == "pre-flop" and player.current_position == "SB":
-                        player.called_for -= 0.5
-
-                    # once a bet is made all other active players in the hand now have to act
-                    for active_player in self.player_positions.values():
-                        if not active_player.all_in:
-                            active_player.to_act = True
-
-                    player.to_act = False
-
-                print(f"Pot = {self.pot}")
-
-            i += 1
-
-        # sort the final amounts to add to each side pot
-        for player in self.players:
-            if player.all_in:
-                for other_player in self.players:
-                    if other_player.name == player.name:
-                        continue
-                    if (
-                        other_player.contributed_to_pot
-                        > player.side_pot_final_raise_size
-                    ):
-                        player.side_pot += player.side_pot_final_raise_size
-                    else:
-                        player.side_pot += other_player.called_for
-
-                # this may need unindented
-                if player.raiser:
-                    player.side_pot += player.side_pot_final_raise_size
-
-        # sort final pots of all in players
-        all_in_players = [player for player in self.players if player.all_in]
-
-        # return an uncalled bet
-        if (
-            current_number_of_calls == 0
-            and current_raise_size != 0
-            and len(self.players) - len(all_in_players) != 1
-        ):
-            self.current_raiser.chips += current_raise_size
-            self.pot -= current_raise_size
-            print(
-                f"{current_raise_size} uncalled bet returned to {self.current_raiser.name}"
-            )
+        # only the part of the largest bet that no other player matched, all in or before folding, is returned
+        bets = sorted(self.seated_players, key=lambda player: player.called_for, reverse=True)
+        uncalled = bets[0].called_for - bets[1].called_for if len(bets) > 1 else 0
+        if uncalled > 0:
+            bettor = bets[0]
+            bettor.chip_units += uncalled
+            bettor.called_for -= uncalled
+            bettor.contributed_to_pot -= uncalled
+            self.pot_units -= uncalled
+            self.emit("bet_returned", player=bettor, amount=uncalled / CHIP_UNITS)
 
-        print("-" * 40)
-        print(f"After {betting_round} betting, pot size is {self.pot} BB")
-        print("=" * 40)
+        self.emit("round_end", betting_round=betting_round, pot=self.pot)
 
     def call_bet(self):
         pass
@@ -665,16 +1484,14 @@ class Poker(object):
         Returns:
 
         """
-        if not self.flop_cards:
-            self.flop_cards = random.sample(self.remaining_deck, 3)
-            self.table_cards += self.flop_cards
-            for card in self.flop_cards:
-                self.remaining_deck.remove(card)
+        if len(self.flop_cards) < 3:
+            new_cards = self.deck.deal(3 - len(self.flop_cards))
+            self.flop_cards = self.flop_cards + new_cards
+            self.table_cards += new_cards
+            for card in new_cards:
+                self.table_state.add(card)
 
-        print_flop_cards = ""
-        for card in self.flop_cards:
-            print_flop_cards += str(card)
-        print(f"Flop cards: {print_flop_cards}")
+        self.emit("street", street="flop", cards=self.flop_cards, table_cards=list(self.table_cards))
 
     def turn(self):
         """
@@ -683,18 +1500,11 @@ class Poker(object):
 
         """
         if not self.turn_card:
-            self.turn_card = random.sample(self.remaining_deck, 1)[0]
+            self.turn_card = self.deck.deal()[0]
             self.table_cards.append(self.turn_card)
-            self.remaining_deck.remove(self.turn_card)
+            self.table_state.add(self.turn_card)
 
-        print(f"Turn card: {self.turn_card}")
-        print_table_cards = ""
-        for i, card in enumerate(self.table_cards[:-1]):
-            if i + 1 == len(self.table_cards[:-1]):
-                print_table_cards += f"({str(card)})"
-            else:
-                print_table_cards += str(card)
-        print(f"Table Cards: {print_table_cards}")
+        self.emit("street", street="turn", cards=[self.turn_card], table_cards=list(self.table_cards))
 
     def river(self):
         """
@@ -703,24 +1513,29 @@ class Poker(object):
 
         """
         if not self.river_card:
-            self.river_card = random.sample(self.remaining_deck, 1)[0]
+            self.river_card = self.deck.deal()[0]
             self.table_cards.append(self.river_card)
-            self.remaining_deck.remove(self.river_card)
+            self.table_state.add(self.river_card)
 
-        print(f"River card: {self.river_card}")
-        print_table_cards = ""
-        for i, card in enumerate(self.table_cards):
-            if i + 1 == len(self.table_cards):
-                print_table_cards += f"({str(card)})"
-            else:
-                print_table_cards += str(card)
-        print(f"Table Cards: {print_table_cards}")
+        self.emit("street", street="river", cards=[self.river_card], table_cards=list(self.table_cards))
 
-    def showdown(self):
+    def hand_states(self):
+        """
+        Extends the table state with each player's hole cards
+
+        Returns:
+            dict of player to HandState
         """
-        If game gets to showdown, this function determines the winner and how the pot is chopped up
+        return {
+            player: self.table_state.copy().add(player.cards[0]).add(player.cards[1])
+            if len(player.cards) == 2
+            else self.table_state.copy()
+            for player in self.players
+        }
 
-        TODO: multiway all in pots
+    def showdown(self):
+        """
+        If game gets to showdown, this function ranks the remaining players, the pot is then settled by summary
 
         Returns:
 
@@ -728,68 +1543,73 @@ class Poker(object):
         self.showdown_card_analysis = BoardAnalysis(self.players, self.table_cards)
         self.winners = self.showdown_card_analysis.winners
         self.ranked_players = self.showdown_card_analysis.ranked_players
+        self.emit(
+            "showdown",
+            hands=[(player, player.cards, player.hand_ranking) for player in self.players],
+        )
 
     def summary(self):
+        """
+        Settles the pot at showdown with resolve_pots and pays every ranked player
 
+        The main and side pots are built from what each player contributed to the pot, folded players included,
+        and odd chips go to the winners in post-flop order. A pot already won uncontested is left alone.
+        """
         for player in self.players:
-            if not player.side_pot:
-                player.side_pot = self.pot
             player.called_for = 0
 
-        print("-" * 40)
-        for player in self.players:
-            string_cards = "".join([str(x) for x in player.cards])
-            print(f"{player.name}({string_cards}): {player.print_ranking}")
-            print("-" * 40)
-
-        i = 0
-        paid_players = []
-        for i, ranking in enumerate(self.ranked_players):
+        if not self.pot_units:
+            return
 
-            for player in sorted(ranking, key=lambda x: x.side_pot):
-                if player.side_pot <= 0:
-                    player.side_pot = 0
-                    print(
-                        f"In Rank {i + 1} {player.name} with {player.print_ranking} "
-                        f"loses"
-                    )
-                    continue
+        contributions = {player: player.contributed_to_pot for player in self.seated_players}
 
-                number_of_splits = len(
-                    [x for x in ranking if x.side_pot >= player.side_pot]
-                )
-                if len(ranking) == 3:
-                    player.side_pot -= 0.01
+        # odd chips go to the first winners left of the button
+        def seat(player):
+            if player.current_position in self.post_flop_order:
+                return self.post_flop_order.index(player.current_position)
+            return len(self.post_flop_order)
 
-                player.winnings = round(player.side_pot / number_of_splits, 2)
-                player.chips += player.winnings
+        winnings, self.pots = resolve_pots(
+            contributions, self.ranked_players, sorted(self.seated_players, key=seat)
+        )
 
-                print(
-                    f"In Rank {i + 1} {player.name} with {player.print_ranking} "
-                    f"and collects {player.winnings}"
+        for i, ranking in enumerate(self.ranked_players):
+            for player in ranking:
+                player.winnings = winnings[player] / CHIP_UNITS
+                player.chip_units += winnings[player]
+                self.emit(
+                    "payout",
+                    player=player,
+                    amount=player.winnings,
+                    chips=player.chips,
+                    rank=i + 1,
+                    ranking=player.hand_ranking,
                 )
 
-                remove_from_pot = player.winnings
-                for other_player in self.players:
-                    if other_player.side_pot > player.side_pot:
-                        other_player.side_pot -= player.winnings
-                    else:
-                        other_player.side_pot = 0
+        self.pot_units = 0
 
-                self.pot -= remove_from_pot
-                paid_players.append(player)
-
-                winners_str = (
-                    " ".join(x.name for x in ranking[:-1]) + " and " + ranking[-1].name
-                )
+    def play_game(self):
+        """
+        Plays the whole hand, see play_steps
+        """
+        self.play_decisions(self.play_steps())
 
-        self.pot = 0
+    def play_steps(self):
+        """
+        Generator playing the whole hand, yielding every decision of a player with a strategy like betting_steps
+        """
 
-    def play_game(self):
+        # scripts are compiled and checked before any card is dealt
+        self.compile_scripts()
+        self.emit("hand_start", players=list(self.players), chips=[player.chips for player in self.players])
 
         # deal cards
         if not all([player.cards for player in self.players]):
             self.deal()
+        else:
+            # hands that are all defined still have to leave the deck before the table cards are dealt
+            for player in self.players:
+                self.deck.remove_cards(player.cards)
 
         for betting_round in self.betting_rounds:
 
@@ -803,34 +1623,31 @@ class Poker(object):
                 self.river()
             if len(self.active_players) <= 1:
                 continue
-            print("=" * 40)
-            print(str(betting_round).center(40))
-            print("=" * 40)
-            self.betting_action(betting_round=betting_round)
-
-            self.active_players = [player for player in self.players if player.active]
-
-            if (
-                len(self.active_players)
-                - len(
-                    [player.all_in for player in self.active_players if player.all_in]
+            self.emit("round_start", betting_round=betting_round)
+            yield from self.betting_steps(betting_round=betting_round)
+
+            # once everyone else has folded the last player wins the pot uncontested and the hand is over
+            if len(self.players) == 1:
+                winner = self.players[0]
+                winner.chip_units += self.pot_units
+                self.emit(
+                    "payout",
+                    player=winner,
+                    amount=self.pot,
+                    chips=winner.chips,
+                    rank=None,
+                    ranking=winner.hand_ranking,
                 )
-                == 1
-            ):
-                print("No more betting as a player(s) are all in")
-                print("=" * 40)
-                all_in = True
-                continue
+                self.pot_units = 0
+                break
 
+            self.active_players = [player for player in self.players if player.active]
             if len(self.active_players) == 1:
-                winner = self.active_players[0]
-                winner.chips += self.pot
-                print(f"{winner.name} wins {self.pot} BB and has {winner.chips} BB")
-                self.pot = 0
-                break
+                self.emit("no_more_betting")
 
         self.showdown()
         self.summary()
+        self.emit("hand_end", table_cards=list(self.table_cards))
 
     def __repr__(self):
         return repr(f"Poker Game {self.players}")
@@ -841,6 +1658,9 @@ class Player(object):
     A class for a poker player.
     """
 
+    # every player shares the interned deck
+    deck = DECK
+
     def __init__(
         self,
         name: str,
@@ -871,21 +1691,7 @@ class Player(object):
             hand_ranking = []
 
         self.suits = ["c", "s", "d", "h"]
-        self.values = {
-            "2": 2,
-            "3": 3,
-            "4": 4,
-            "5": 5,
-            "6": 6,
-            "7": 7,
-            "8": 8,
-            "9": 9,
-            "T": 10,
-            "J": 11,
-            "Q": 12,
-            "K": 13,
-            "A": 14,
-        }
+        self.values = RANKS_TO_VALUES
 
         self.rankings = {
             9: "royal_flush",
@@ -900,43 +1706,65 @@ class Player(object):
             0: "high_card",
         }
 
-        self.hand_ranking = hand_ranking
         self.chips = chips
         self.name = name
-        self.deck = [Card(value + suit) for suit in self.suits for value in self.values]
-        self.cards = cards
-        self.table_cards = table_cards
+        if not current_position:
+            self.current_position = None
+        else:
+            self.current_position = current_position
+
+        self.new_hand(cards, table_cards, pre_flop, post_flop, turn, river)
+        self.hand_ranking = hand_ranking
+
+    @property
+    def remaining_deck(self):
+        in_play_mask = cards_to_mask(self.in_play_cards)
+        return [card for card in self.deck if not card.mask & in_play_mask]
+
+    @property
+    def chips(self):
+        """
+        The player's stack in big blinds, for display. The stack itself is kept in whole chip units in chip_units
+        so chips are never lost to float rounding
+        """
+        return self.chip_units / CHIP_UNITS
+
+    @chips.setter
+    def chips(self, chips):
+        self.chip_units = to_chip_units(chips)
+
+    def new_hand(self, cards=None, table_cards=None, pre_flop=None, post_flop=None, turn=None, river=None):
+        """
+        Resets the per-hand state in place, keeping the name, chips and position
+
+        Args:
+            cards: list
+                hole cards of the new hand, dealt by the game if empty
+            table_cards: list
+                table cards known to the player
+            pre_flop, post_flop, turn, river: list
+                scripted actions of each betting round
+        """
+        self.cards = cards if cards is not None else []
+        self.table_cards = table_cards if table_cards is not None else []
         self.known_cards = self.table_cards + self.cards
         self.in_play_cards = self.cards + self.table_cards
-        self.remaining_deck = [
-            card for card in self.deck if card not in self.in_play_cards
-        ]
+        self.hand_ranking = []
         self.small_blind = False
         self.big_blind = False
         self.all_in = False
-        if not current_position:
-            self.current_position = None
-        else:
-            self.current_position = current_position
         self.active = True
         self.to_act = False
 
-        self.pre_flop_actions = pre_flop
-        self.post_flop_actions = post_flop
-        self.turn_actions = turn
-        self.river_actions = river
+        self.pre_flop_actions = pre_flop if pre_flop is not None else []
+        self.post_flop_actions = post_flop if post_flop is not None else []
+        self.turn_actions = turn if turn is not None else []
+        self.river_actions = river if river is not None else []
+        # amounts put in this betting round and this hand, in chip units
         self.called_for = 0
-        self.print_ranking = None
         self.raise_size = 0
-
-        self.side_pot = 0
-        self.current_pot = 0
-        self.side_pot_final_raise_size = 0
         self.contributed_to_pot = 0
-
-        self.all_in_callers = []
         self.all_in_round = None
-        self.number_of_all_in_calls = 0
 
         self.raiser = False
         self.caller = False
@@ -949,12 +1777,40 @@ class Player(object):
 
         # self.ranking = self.analyse_cards()
 
+    @property
+    def print_ranking(self):
+        """
+        Display string of the player's hand ranking, built only when it is read
+        """
+        return ranking_display(self.hand_ranking)
+
     def __repr__(self):
         return str(f"{self.name}")
 
 
 class BoardAnalysis(object):
-    def __init__(self, players=None, table_cards=None):
+    """
+    Ranks the hands of a set of players on a board
+
+    Args:
+        players: list
+            Player objects with their hole cards
+        table_cards: list
+            community cards
+        engine: str
+            'lookup' (the default) evaluates hands with the precomputed LookupEvaluator tables, 'legacy' with the
+            straight/flush/n-of-a-kind checks below
+    """
+
+    engines = ["lookup", "legacy"]
+
+    def __init__(self, players=None, table_cards=None, engine="lookup"):
+
+        if engine not in self.engines:
+            raise ValueError(
+                f"Value of engine not valid. only {', '.join(self.engines)} are valid."
+            )
+        self.engine = engine
 
         if table_cards is None:
             table_cards = []
@@ -964,23 +1820,9 @@ class BoardAnalysis(object):
         self.players = players
         self.table_cards = table_cards
         self.suits = ["c", "s", "d", "h"]
-        self.values = {
-            "2": 2,
-            "3": 3,
-            "4": 4,
-            "5": 5,
-            "6": 6,
-            "7": 7,
-            "8": 8,
-            "9": 9,
-            "T": 10,
-            "J": 11,
-            "Q": 12,
-            "K": 13,
-            "A": 14,
-        }
+        self.values = RANKS_TO_VALUES
 
-        self.values_to_ranks = {value: key for key, value in self.values.items()}
+        self.values_to_ranks = VALUES_TO_RANKS
 
         self.rankings = {
             9: "a royal flush",
@@ -995,7 +1837,7 @@ class BoardAnalysis(object):
             0: "high card",
         }
 
-        self.deck = [Card(value + suit) for suit in self.suits for value in self.values]
+        self.deck = list(DECK)
         self.all_player_cards = [player.cards for player in self.players]
 
         # this should be tidied up to have the in_play_cards as a list rather than list of lists
@@ -1003,126 +1845,122 @@ class BoardAnalysis(object):
         self.in_play_cards = set(
             [item for sublist in self.in_play_cards for item in sublist]
         )
+        self.in_play_mask = cards_to_mask(self.in_play_cards)
         self.remaining_deck = [
-            card for card in self.deck if card not in self.in_play_cards
+            card for card in self.deck if not card.mask & self.in_play_mask
         ]
         self.test_rankings = {}
-        self.data_analysis, self.print_analysis = self.analyse_cards()
+        self.data_analysis = self.analyse_cards()
         self.winners = self.data_analysis["winners"]
-        self.print_winning_combination = self.winners[0].print_ranking
 
         self.counter = {}
+        counted_strengths = set()
         for player in self.players:
-            if player.hand_ranking not in self.counter.values():
+            if player.hand_ranking.strength not in counted_strengths:
+                counted_strengths.add(player.hand_ranking.strength)
                 self.counter[player] = player.hand_ranking
 
         # players need to be sorted to figure out equal rankings
-        self.players = sorted(self.players, key=lambda x: x.hand_ranking, reverse=True)
+        self.players = sorted(
+            self.players, key=lambda x: x.hand_ranking.strength, reverse=True
+        )
 
-        # ordered rankings in player pool
+        # ordered rankings in player pool, players with equal strengths are grouped together
         self.rankings = []
-        for ranking in [player.hand_ranking for player in self.players]:
-            if ranking not in self.rankings:
-                self.rankings.append(ranking)
+        self.ranked_players = []
+        for player in self.players:
+            if (
+                not self.rankings
+                or player.hand_ranking.strength != self.rankings[-1].strength
+            ):
+                self.rankings.append(player.hand_ranking)
+                self.ranked_players.append([])
+            self.ranked_players[-1].append(player)
 
-        self.ranked_players = [[] for x in range(len(self.rankings))]
-        for i, ranking in enumerate(self.rankings):
-            for player in self.players:
-                if player.hand_ranking == ranking:
-                    self.ranked_players[i].append(player)
+    @staticmethod
+    def value_mask(cards):
+        """
+        Builds a 13-bit mask with bit (value - 2) set for every card value present
+
+        Args:
+            cards: list
+                cards to build the mask from
+
+        Returns:
+            int
+        """
+        mask = cards_to_mask(cards)
+        return (mask | mask >> 13 | mask >> 26 | mask >> 39) & 0x1FFF
 
     @staticmethod
     def straight_check(cards):
         """
         Checks for a straight in a set of cards
 
+        The values are folded into a 13-bit mask and the highest run of five set bits (or A-2-3-4-5) is found with
+        a shift-and-AND per possible top card.
+
         Args:
             cards: list
                 cards to check for a straight combination in
 
         Returns:
-
+            tuple of straight values (highest first, the ace last for the wheel), cards with those values (sorted by
+            value), hand class 4 and the value of the top card of the straight (5 for the wheel)
         """
-        if not len(set(cards)) > 4:
+        straight_ranking = LookupEvaluator.straight_top(BoardAnalysis.value_mask(cards))
+        if not straight_ranking:
             return None, None, None, None
-        card_values = [x.value for x in cards]
-        straight_values = [
-            combo
-            for combo in itertools.combinations(card_values, 5)
-            if sorted(combo) == [2, 3, 4, 5, 14]
-            or max(combo) - min(combo) == 4
-            and len(set(combo)) == 5
-        ]
 
-        if straight_values:
-            straight_cards = sorted(
-                [x for x in cards if x.value in max(straight_values)],
-                key=lambda x: x.value,
-                reverse=False,
-            )
-            if all([x in straight_values[0] for x in [14, 2, 3, 4, 5]]):
-                straight_ranking = 5
-            else:
-                straight_ranking = max(max(straight_values))
-            return list(max(straight_values))[::-1], straight_cards, 4, straight_ranking
-
-        return None, None, None, None
+        straight_values = list(range(straight_ranking, straight_ranking - 4, -1))
+        straight_values.append(straight_ranking - 4 if straight_ranking > 5 else 14)
+        straight_cards = sorted(
+            [x for x in cards if x.value in straight_values],
+            key=lambda x: x.value,
+            reverse=False,
+        )
+        return straight_values, straight_cards, 4, straight_ranking
 
     @staticmethod
     def flush_check(cards, straight_cards=None):
         """
         Checks for a flush in a given set of cards
+
+        Each suit's cards are folded into a 13-bit value mask, a suit with at least five bits set is a flush and a
+        straight within that mask is a straight flush.
+
         Args:
             cards: list
                 Cards for flush check
             straight_cards: list
-                Cards determined to form a straight used to check for straight flushes
+                Not needed to find straight flushes any more, kept for existing callers
 
         Returns:
-
+            tuple of the five flush cards (in ranking order), hand class (5, 8 or 9) and the value of the top card
         """
-        card_suits = [card.suit for card in cards]
-        card_counts = Counter(card_suits)
-
-        if any(val >= 5 for val in card_counts.values()):
+        mask = cards_to_mask(cards)
 
-            # flush suit
-            flush_suit = max(card_counts, key=card_counts.get)
-
-            # get flush cards
-            # the reverse sorted and indexing is needed to remove clubs that are outside the top 5 highest value
-            flush_cards = sorted(
-                [card for card in cards if card.suit == flush_suit],
-                key=lambda x: x.value,
-                reverse=True,
-            )[0:5]
-            # check for any straight flush
-            if straight_cards:
+        for suit_index in range(4):
+            suit_mask = mask >> 13 * suit_index & 0x1FFF
+            if bin(suit_mask).count("1") < 5:
+                continue
 
-                if all(x in straight_cards for x in flush_cards):
-                    # check for specific case of royal flush
-                    if all(x.value in [10, 11, 12, 13, 14] for x in flush_cards):
-                        # it is impossible for 2 players to have a royal flush so just return 9
-
-                        return flush_cards, 9, 14
-
-                    elif all(x.value in [14, 2, 3, 4, 5] for x in flush_cards):
-                        flush_ranking = 5
-                    else:
-                        flush_ranking = max(
-                            [
-                                card.value
-                                for card in flush_cards
-                                if card in straight_cards
-                            ]
-                        )
+            flush_ranking = LookupEvaluator.straight_top(suit_mask)
+            if flush_ranking:
+                flush_values = list(range(flush_ranking, flush_ranking - 4, -1))
+                flush_values.append(flush_ranking - 4 if flush_ranking > 5 else 14)
+                flush = 9 if flush_ranking == 14 else 8
+            else:
+                flush_values = [
+                    value for value in range(14, 1, -1) if suit_mask >> value - 2 & 1
+                ][0:5]
+                flush_ranking = flush_values[0]
+                flush = 5
 
-                    return flush_cards, 8, flush_ranking
+            flush_cards = [DECK[suit_index * 13 + value - 2] for value in flush_values]
+            return flush_cards, flush, flush_ranking
 
-            flush_ranking = max([card.value for card in flush_cards])
-            return flush_cards, 5, flush_ranking
-        else:
-            return None, None, None
+        return None, None, None
 
     @staticmethod
     def maxN(elements, n):
@@ -1170,14 +2008,17 @@ class BoardAnalysis(object):
         return four_of_a_kind_cards, three_of_a_kind_cards, pairs_of_cards
 
     def analyse_cards(self):
+        if self.engine == "lookup":
+            return self.lookup_analyse_cards()
+
         rankings = {}
-        print_rankings = {}
         data_rankings = {}
 
         for player in self.players:
 
-            # combine players cards and table cards to give rankable list
-            player_card_rankings = player.hand_ranking
+            # combine players cards and table cards to give rankable list, a fresh list per analysis so repeated
+            # analyses of the same player do not grow it
+            player_card_rankings = []
             all_cards = self.table_cards + player.cards
 
             # check for straight
@@ -1237,25 +2078,15 @@ class BoardAnalysis(object):
                     (7, four_of_a_kind_cards, max(four_of_a_kind), [kickers.value])
                 )
 
-            # full house
-            elif pairs and three_of_a_kind:
-                full_house_cards = [
-                    card
-                    for card in all_cards
-                    if card.value == max(three_of_a_kind) or card.value == max(pairs)
-                ]
-                ranking = dict(Counter([x.value for x in full_house_cards]))
-                ranking = {v: k for k, v in ranking.items()}
-
-                # sorts by count 3 then by count 2
-                full_house_cards = sorted(
-                    full_house_cards,
-                    key=lambda x: [a.value for a in full_house_cards].count(x.value),
-                    reverse=True,
-                )
-                ranking = [ranking[3], ranking[2]]
+            # full house, two of a second three of a kind make the pair
+            elif three_of_a_kind and (pairs or len(three_of_a_kind) > 1):
+                three_value = max(three_of_a_kind)
+                pair_value = max(pairs + [value for value in three_of_a_kind if value != three_value])
+                full_house_cards = [card for card in all_cards if card.value == three_value] + [
+                    card for card in all_cards if card.value == pair_value
+                ][:2]
                 player_card_rankings.append(
-                    (6, full_house_cards, max(three_of_a_kind), ranking)
+                    (6, full_house_cards, three_value, [three_value, pair_value])
                 )
 
             elif three_of_a_kind:
@@ -1353,36 +2184,58 @@ class BoardAnalysis(object):
 
             self.test_rankings[player.name] = HandRanking(highest_combination)
 
-            hand_ranking_string = self.ranking_string(
-                highest_combination[0], highest_combination[1]
+        # defines the maximum combination
+        self.test_rankings = sorted(self.test_rankings.values(), reverse=True)
+        data_rankings["winners"] = self.strongest_players()
+
+        return data_rankings
+
+    def lookup_analyse_cards(self):
+        """
+        Equivalent of analyse_cards using the LookupEvaluator tables, every player's hand is reduced to one
+        integer strength and the winners are all players sharing the highest strength
+
+        Returns:
+            dict of hand data keyed by player name, plus the winners
+        """
+        data_rankings = {}
+
+        for player in self.players:
+            all_cards = self.table_cards + player.cards
+            player.hand_ranking = HandRanking.from_strength(
+                LookupEvaluator.evaluate(all_cards), all_cards
             )
-            player.print_ranking = hand_ranking_string
-            print_rankings[player.name] = hand_ranking_string
+            self.test_rankings[player.name] = player.hand_ranking
+
+            data_rankings[player.name] = player.hand_ranking.hand_data
 
-        # defines the maximum combination
         self.test_rankings = sorted(self.test_rankings.values(), reverse=True)
-        max_combination = max(data_rankings.values())
-        max_combination_players = {
-            k: v for k, v in data_rankings.items() if v == max_combination
-        }
+        data_rankings["winners"] = self.strongest_players()
 
-        # defines the maximum ranking of the combination
-        max_ranking = max([x[1] for x in max_combination_players.values()])
-        max_ranking_players = {
-            k: v for k, v in max_combination_players.items() if v[1] == max_ranking
-        }
+        return data_rankings
 
-        # defines the maximum kickers
-        max_kicker = max([x[2] for x in max_ranking_players.values()])
-        max_ranking_players_with_kickers = {
-            k: v for k, v in max_ranking_players.items() if v[2] == max_kicker
-        }
+    @property
+    def print_analysis(self):
+        """
+        Display strings of every player's ranking keyed by name, plus the winners
+        """
+        print_rankings = {player.name: player.print_ranking for player in self.players}
+        print_rankings["winners"] = list(self.winners)
+        return print_rankings
 
-        winners = max_ranking_players_with_kickers.keys()
-        data_rankings["winners"] = list([x for x in self.players if x.name in winners])
-        print_rankings["winners"] = list([x for x in self.players if x.name in winners])
+    @property
+    def print_winning_combination(self):
+        return self.winners[0].print_ranking
+
+    def strongest_players(self):
+        """
+        Finds the players sharing the highest hand strength
 
-        return data_rankings, print_rankings
+        Returns:
+            list of players in their original order
+        """
+        max_strength = max(player.hand_ranking.strength for player in self.players)
+        return [x for x in self.players if x.hand_ranking.strength == max_strength]
 
     @staticmethod
     def ranking_string(rank, cards):
@@ -1415,44 +2268,536 @@ class BoardAnalysis(object):
 
 class InteractivePoker(Poker):
     """
-    An extension to the Poker class that allows for interactive play;
+    An extension to the Poker class where players are played by Strategy objects instead of scripts
+
+    Players without a strategy still follow their scripted actions. The original InteractivePoker(num_players,
+    num_bots, players) call form is still accepted and plays every player from their script.
     """
 
-    def __init__(self, num_players, num_bots, players: list):
-        super().__init__(players)
-        self.num_players = num_players
-        self.num_bots = num_bots
+    def __init__(
+        self,
+        players: list,
+        strategies=None,
+        table_cards=None,
+        rng=None,
+        sink=None,
+        headless=False,
+        num_players=None,
+        num_bots=None,
+    ):
+        """
+
+        Args:
+            players: list
+                Player objects
+            strategies: dict
+                Strategy of each bot player
+            table_cards: list
+                any table cards that are already defined
+            rng: random.Random
+                source of randomness for dealing
+            sink: EventSink
+                receives the events of the game
+            headless: bool
+                if True and no sink is given nothing is printed
+            num_players: int
+                number of players, defaults to the number of players given
+            num_bots: int
+                number of bots, defaults to the number of strategies
+        """
+        if isinstance(players, int):
+            num_players, num_bots, players, strategies, table_cards = players, strategies, table_cards, None, None
+        self.strategies = strategies or {}
+        super().__init__(players, table_cards=table_cards, rng=rng, sink=sink, headless=headless)
+        self.num_players = len(players) if num_players is None else num_players
+        self.num_bots = len(self.strategies) if num_bots is None else num_bots
+
+    def strategy_for(self, player):
+        return self.strategies.get(player)
+
+    @staticmethod
+    def play_tables(games):
+        """
+        Plays one hand on each of many games in lockstep, batching the decisions of every strategy
+
+        Each round all games waiting on a decision are grouped by strategy and each strategy is asked once with
+        decide_batch, so a vectorized bot decides for every table in a single call.
 
-    pass
+        Args:
+            games: list
+                InteractivePoker games ready to play a hand
+
+        Returns:
+            number of decision rounds played
+        """
+        pending = []
+        for game in games:
+            steps = game.play_steps()
+            decision = next(steps, None)
+            if decision is not None:
+                pending.append((game, steps, decision))
+
+        rounds = 0
+        while pending:
+            rounds += 1
+            batches = {}
+            for item in pending:
+                game, _, decision = item
+                batches.setdefault(game.strategy_for(decision.player), []).append(item)
+
+            pending = []
+            for strategy, items in batches.items():
+                actions = strategy.decide_batch([decision for _, _, decision in items])
+                for (game, steps, _), action in zip(items, actions):
+                    try:
+                        pending.append((game, steps, steps.send(action)))
+                    except StopIteration:
+                        pass
+        return rounds
+
+
+# name of each hand class, the class of a HandRanking is the top bits of its strength (see pack_strength)
+HAND_CLASS_NAMES = {
+    9: "royal flush",
+    8: "straight flush",
+    7: "four of a kind",
+    6: "full house",
+    5: "flush",
+    4: "straight",
+    3: "three of a kind",
+    2: "two pair",
+    1: "pair",
+    0: "high card",
+}
 
 
 class HandRanking(object):
     """
     A class for a players hand ranking
+
+    The ranking is held as a single packed integer strength (see pack_strength) which is used for every comparison.
+    The card list and display string are only built when they are first needed.
     """
 
+    __slots__ = ("strength", "_hand_data", "_all_cards", "_string")
+
     def __init__(self, hand_data):
-        self.hand_class = hand_data[0]
-        self.cards = hand_data[1]
-        self.hand_ranking = hand_data[2]
-        self.kickers = hand_data[3]
+        """
+
+        Args:
+            hand_data: tuple
+                (hand class, cards, ranking, kickers) as produced by BoardAnalysis.analyse_cards
+        """
+        self.strength = pack_strength(hand_data[0], [card.value for card in hand_data[1]])
+        self._hand_data = hand_data
+        self._all_cards = None
+        self._string = None
+
+    @classmethod
+    def from_strength(cls, strength, all_cards=None):
+        """
+        Creates a ranking straight from an evaluator strength without building the card list
 
-        self.single_parameter = [self.hand_class] + [card.value for card in self.cards]
+        Args:
+            strength: int
+                packed strength from LookupEvaluator.evaluate
+            all_cards: list
+                the evaluated cards, only needed if the hand cards or display string are used
+
+        Returns:
+            HandRanking
+        """
+        ranking = cls.__new__(cls)
+        ranking.strength = strength
+        ranking._hand_data = None
+        ranking._all_cards = all_cards
+        ranking._string = None
+        return ranking
+
+    @property
+    def hand_data(self):
+        if self._hand_data is None:
+            self._hand_data = LookupEvaluator.hand_data(self.strength, self._all_cards or [])
+        return self._hand_data
+
+    @property
+    def hand_class(self):
+        return self.strength >> 20
+
+    @property
+    def cards(self):
+        return self.hand_data[1]
+
+    @property
+    def hand_ranking(self):
+        return self.hand_data[2]
+
+    @property
+    def kickers(self):
+        return self.hand_data[3]
+
+    @property
+    def single_parameter(self):
+        hand_class, values = unpack_strength(self.strength)
+        return [hand_class] + values
 
     def __str__(self):
-        return "".join([str(x) for x in self.cards])
+        if self._string is None:
+            self._string = "".join([str(x) for x in self.cards])
+        return self._string
 
     def __repr__(self):
-        return "".join([str(x) for x in self.cards])
+        return str(self)
 
     def __lt__(self, other):
-        return self.single_parameter < other.single_parameter
+        return self.strength < other.strength
 
     def __gt__(self, other):
-        return self.single_parameter > other.single_parameter
+        return self.strength > other.strength
 
     def __eq__(self, other):
-        return self.single_parameter == other.single_parameter
+        if isinstance(other, HandRanking):
+            return self.strength == other.strength
+        return NotImplemented
 
     def __hash__(self):
-        return hash(str(self))
+        return hash(self.strength)
+
+
+def pack_strength(hand_class, values):
+    """
+    Packs a hand class and up to five ordered card values into a single integer
+
+    Args:
+        hand_class: int
+            0 (high card) to 9 (royal flush)
+        values: list
+            card values (2-14) in the order they are compared, missing values are packed as 0
+
+    Returns:
+        int that orders hands exactly like [hand_class] + values
+    """
+    strength = hand_class
+    for i in range(5):
+        strength = strength << 4 | (values[i] if i < len(values) else 0)
+    return strength
+
+
+def unpack_strength(strength):
+    """
+    Inverse of pack_strength
+
+    Args:
+        strength: int
+            packed hand strength
+
+    Returns:
+        tuple of hand class and list of card values
+    """
+    values = [strength >> shift & 0xF for shift in (16, 12, 8, 4, 0)]
+    return strength >> 20, [value for value in values if value]
+
+
+class LookupEvaluator(object):
+    """
+    A table driven hand evaluator that maps any set of cards straight to a single integer strength.
+
+    Non-flush hands only depend on the multiset of card values, which is identified by an additive perfect hash
+    (each card adds 5 ** (value - 2) + 5 ** 13) and looked up in rank_table. Flushes and straight flushes are
+    looked up in flush_table by the 13-bit value mask of each suit. The tables hold every set of up to 7 cards and
+    are built on first use; larger or partial hands are supported as well.
+    """
+
+    card_keys = [5 ** (card.value - 2) + 5 ** 13 for card in DECK]
+    straight_masks = [(top, 0x1F << (top - 6)) for top in range(14, 5, -1)] + [
+        (5, 0x100F)
+    ]
+    rank_table = {}
+    flush_table = []
+
+    @classmethod
+    def straight_top(cls, value_mask):
+        """
+        Finds the highest straight in a 13-bit value mask (bit value - 2 set for each value present)
+
+        Returns:
+            value of the top card of the straight (5 for the wheel) or 0 if there is no straight
+        """
+        for top, straight_mask in cls.straight_masks:
+            if value_mask & straight_mask == straight_mask:
+                return top
+        return 0
+
+    @classmethod
+    def flush_strength(cls, value_mask):
+        """
+        Strength of the best flush or straight flush made from the values of a single suit
+        """
+        top = cls.straight_top(value_mask)
+        if top == 14:
+            return pack_strength(9, [14, 13, 12, 11, 10])
+        if top:
+            values = list(range(top, top - 4, -1)) + [top - 4 if top > 5 else 14]
+            return pack_strength(8, values)
+        values = [value for value in range(14, 1, -1) if value_mask >> value - 2 & 1]
+        return pack_strength(5, values[:5])
+
+    @classmethod
+    def rank_strength(cls, counts):
+        """
+        Strength of the best non-flush hand for the given value counts
+
+        Args:
+            counts: list
+                number of cards of each value, indexed by value
+
+        Returns:
+            int strength
+        """
+        by_count = [[], [], [], [], []]
+        value_mask = 0
+        for value in range(14, 1, -1):
+            if counts[value] > 4:
+                raise ValueError("Cannot be more than four-of-a-kind")
+            if counts[value]:
+                by_count[counts[value]].append(value)
+                value_mask |= 1 << value - 2
+        singles, pairs, trips, quads = by_count[1], by_count[2], by_count[3], by_count[4]
+
+        if quads:
+            others = sorted(pairs + trips + singles + quads[1:], reverse=True)
+            return pack_strength(7, [quads[0]] * 4 + others[:1])
+        if trips and (pairs or len(trips) > 1):
+            pair = max(pairs + trips[1:])
+            return pack_strength(6, [trips[0]] * 3 + [pair] * 2)
+
+        top = cls.straight_top(value_mask)
+        if top:
+            values = list(range(top, top - 4, -1)) + [top - 4 if top > 5 else 14]
+            return pack_strength(4, values)
+
+        if trips:
+            return pack_strength(3, [trips[0]] * 3 + singles[:2])
+        if len(pairs) > 1:
+            kickers = sorted(pairs[2:] + singles, reverse=True)
+            return pack_strength(2, [pairs[0]] * 2 + [pairs[1]] * 2 + kickers[:1])
+        if pairs:
+            return pack_strength(1, [pairs[0]] * 2 + singles[:3])
+        return pack_strength(0, singles[:5])
+
+    @classmethod
+    def build_tables(cls):
+        """
+        Precomputes the flush table and the rank table for all hands of 1 to 7 cards
+        """
+        flush_table = [0] * 8192
+        for value_mask in range(8192):
+            if bin(value_mask).count("1") >= 5:
+                flush_table[value_mask] = cls.flush_strength(value_mask)
+
+        rank_table = {}
+        counts = [0] * 15
+        value_keys = {value: 5 ** (value - 2) + 5 ** 13 for value in range(2, 15)}
+
+        def add_value(value, key, number_of_cards):
+            if value > 14:
+                if number_of_cards:
+                    rank_table[key] = cls.rank_strength(counts)
+                return
+            for count in range(min(4, 7 - number_of_cards) + 1):
+                counts[value] = count
+                add_value(
+                    value + 1, key + count * value_keys[value], number_of_cards + count
+                )
+            counts[value] = 0
+
+        add_value(2, 0, 0)
+
+        cls.rank_table = rank_table
+        cls.flush_table = flush_table
+
+    @classmethod
+    def ensure_tables(cls):
+        """
+        Builds the tables unless they are built already, calling it before starting a process pool lets forked
+        workers inherit them
+        """
+        if not cls.flush_table:
+            cls.build_tables()
+
+    @classmethod
+    def evaluate(cls, cards):
+        """
+        Evaluates a hand of any number of cards
+
+        Args:
+            cards: list
+                Card objects (player cards and table cards)
+
+        Returns:
+            int strength, higher is better. See pack_strength for the layout
+        """
+        cls.ensure_tables()
+
+        key = 0
+        mask = 0
+        card_keys = cls.card_keys
+        for card in cards:
+            key += card_keys[card.index]
+            mask |= card.mask
+
+        strength = cls.rank_table.get(key)
+        if strength is None:
+            counts = [0] * 15
+            for card in cards:
+                counts[card.value] += 1
+            strength = cls.rank_table[key] = cls.rank_strength(counts)
+
+        flush_table = cls.flush_table
+        for shift in (0, 13, 26, 39):
+            flush = flush_table[mask >> shift & 0x1FFF]
+            if flush > strength:
+                strength = flush
+        return strength
+
+    @staticmethod
+    def hand_data(strength, cards):
+        """
+        Rebuilds the (hand class, cards, ranking, kickers) tuple used by HandRanking from a strength
+
+        Args:
+            strength: int
+                strength returned by evaluate
+            cards: list
+                the cards that were evaluated
+
+        Returns:
+            tuple
+        """
+        hand_class, values = unpack_strength(strength)
+
+        pool = list(cards)
+        if hand_class in (5, 8, 9):
+            suit = Counter(card.suit for card in pool).most_common(1)[0][0]
+            pool = [card for card in pool if card.suit == suit]
+
+        hand_cards = []
+        for value in values:
+            for i, card in enumerate(pool):
+                if card.value == value:
+                    hand_cards.append(pool.pop(i))
+                    break
+
+        kickers = {
+            0: values,
+            1: values[2:],
+            2: values[4:],
+            3: values[3:],
+            4: [],
+            5: values,
+            6: values[0:1] + values[3:4],
+            7: values[4:],
+            8: sorted(values, reverse=True),
+            9: values,
+        }[hand_class]
+
+        return hand_class, hand_cards, values[0] if values else 0, kickers
+
+
+class HandState(object):
+    """
+    Incremental evaluator state for a growing set of cards
+
+    The state keeps the additive rank key (a base-5 histogram of the card values), the 52-bit card mask (which
+    holds the 13-bit value mask of every suit), the number of cards of each suit and the best strength so far.
+    Adding a card updates all of them with a constant number of table lookups and copying a state is cheap, so
+    turn and river runouts can extend a shared flop state instead of evaluating every card again.
+    """
+
+    __slots__ = ("key", "mask", "suit_counts", "flush", "strength", "number_of_cards")
+
+    def __init__(self, cards=None):
+        """
+
+        Args:
+            cards: list
+                initial Card objects
+        """
+        LookupEvaluator.ensure_tables()
+        self.key = 0
+        self.mask = 0
+        self.suit_counts = [0, 0, 0, 0]
+        self.flush = 0
+        self.strength = 0
+        self.number_of_cards = 0
+        for card in cards or []:
+            self.add(card)
+
+    def add(self, card):
+        """
+        Adds one card to the state in place
+
+        Args:
+            card: Card
+
+        Returns:
+            the state itself
+        """
+        if self.mask & card.mask:
+            raise ValueError(f"{card} is already part of the hand")
+
+        self.key += LookupEvaluator.card_keys[card.index]
+        self.mask |= card.mask
+        self.number_of_cards += 1
+        suit = card.index // 13
+        self.suit_counts[suit] += 1
+
+        strength = LookupEvaluator.rank_table.get(self.key)
+        if strength is None:
+            strength = LookupEvaluator.rank_table[self.key] = LookupEvaluator.rank_strength(
+                self.histogram
+            )
+        if self.suit_counts[suit] >= 5:
+            flush = LookupEvaluator.flush_table[self.mask >> 13 * suit & 0x1FFF]
+            if flush > self.flush:
+                self.flush = flush
+        self.strength = max(strength, self.flush)
+        return self
+
+    def added(self, card):
+        """
+        Returns a copy of the state with one more card, leaving this state unchanged
+        """
+        return self.copy().add(card)
+
+    def copy(self):
+        state = HandState.__new__(HandState)
+        state.key = self.key
+        state.mask = self.mask
+        state.suit_counts = list(self.suit_counts)
+        state.flush = self.flush
+        state.strength = self.strength
+        state.number_of_cards = self.number_of_cards
+        return state
+
+    @property
+    def histogram(self):
+        """
+        Number of cards of each value, indexed by value
+        """
+        digits = self.key % 5 ** 13
+        counts = [0] * 15
+        for value in range(2, 15):
+            digits, counts[value] = divmod(digits, 5)
+        return counts
+
+    @property
+    def hand_class(self):
+        return self.strength >> 20
+
+    @property
+    def cards(self):
+        return mask_to_cards(self.mask)
+
+    def __repr__(self):
+        return f"HandState({''.join(str(card) for card in self.cards)}, class {self.hand_class})"
@@ -0,0 +1,173 @@
+import argparse
+import itertools
+import math
+import mmap
+import os
+import struct
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from .equity import exact_equity
+from .equity_cache import canonical_key
+from .poker_main import COMBOS, DECK, HAND_CLASS_INDEX, HAND_CLASSES, combo_index, hand_class
+
+MAGIC = b"PFEQTBL1"
+HEADER = struct.Struct("<8sII")
+
+
+def matchup_equity(task):
+    """
+    Computes one canonical matchup, run inside the worker processes
+
+    Args:
+        task: tuple
+            (canonical key, equity function)
+
+    Returns:
+        tuple of the key and the equity of the first hand of the key
+    """
+    key, equity_function = task
+    hands = key.split("|")[0].split(",")
+    return key, equity_function(hands)[0].equity
+
+
+def build_preflop_table(path, workers=None, equity_function=exact_equity, hand_classes=None):
+    """
+    Computes heads-up all-in equities and writes them to a table file for PreflopTable
+
+    Every pair of non-overlapping combos is reduced to its suit isomorphic canonical matchup (with the two hands
+    in the smaller of both orders), each distinct matchup is computed once across a process pool and the results
+    are written as:
+
+        header: magic, number of hand classes, number of combos
+        169 x 169 float32: average equity of the row class against the column class over all compatible combos
+        1326 x 1326 float32: equity of the row combo against the column combo, nan where they share a card
+
+    The exact build evaluates ~47,000 matchups of 1.7M runouts each, so it is meant to be run once on many cores.
+
+    Args:
+        path: str
+            output file
+        workers: int
+            number of worker processes, defaults to the number of cores
+        equity_function: callable
+            function with the signature of exact_equity used for each matchup
+        hand_classes: list
+            only build matchups between these classes (the rest of the table is nan), all classes if None
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    selected = None if hand_classes is None else set(hand_classes)
+
+    combo_classes = [hand_class(DECK[first], DECK[second]) for first, second in COMBOS]
+    matchups = {}
+    for i, j in itertools.combinations(range(len(COMBOS)), 2):
+        if set(COMBOS[i]) & set(COMBOS[j]):
+            continue
+        if selected is not None and not (
+            combo_classes[i] in selected and combo_classes[j] in selected
+        ):
+            continue
+        first = [DECK[index] for index in COMBOS[i]]
+        second = [DECK[index] for index in COMBOS[j]]
+        key = canonical_key([first, second])
+        reversed_key = canonical_key([second, first])
+        if reversed_key < key:
+            matchups[(i, j)] = (reversed_key, True)
+        else:
+            matchups[(i, j)] = (key, False)
+
+    tasks = sorted(set(key for key, _ in matchups.values()))
+    if workers == 1:
+        equities = dict(matchup_equity((key, equity_function)) for key in tasks)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            equities = dict(
+                executor.map(
+                    matchup_equity,
+                    [(key, equity_function) for key in tasks],
+                    chunksize=max(1, len(tasks) // (workers * 16)),
+                )
+            )
+
+    number_of_combos = len(COMBOS)
+    combo_table = array("f", [math.nan]) * (number_of_combos * number_of_combos)
+    class_totals = [0.0] * (len(HAND_CLASSES) ** 2)
+    class_counts = [0] * (len(HAND_CLASSES) ** 2)
+
+    for (i, j), (key, flipped) in matchups.items():
+        equity = 1 - equities[key] if flipped else equities[key]
+        combo_table[i * number_of_combos + j] = equity
+        combo_table[j * number_of_combos + i] = 1 - equity
+
+        row, column = HAND_CLASS_INDEX[combo_classes[i]], HAND_CLASS_INDEX[combo_classes[j]]
+        for position, value in (
+            (row * len(HAND_CLASSES) + column, equity),
+            (column * len(HAND_CLASSES) + row, 1 - equity),
+        ):
+            class_totals[position] += value
+            class_counts[position] += 1
+
+    class_table = array(
+        "f", [total / count if count else math.nan for total, count in zip(class_totals, class_counts)]
+    )
+
+    with open(path, "wb") as table_file:
+        table_file.write(HEADER.pack(MAGIC, len(HAND_CLASSES), number_of_combos))
+        table_file.write(class_table.tobytes())
+        table_file.write(combo_table.tobytes())
+
+
+class PreflopTable(object):
+    """
+    Read-only, memory-mapped view of a file written by build_preflop_table
+
+    Nothing is parsed at startup and every lookup reads one float at a computed offset, so lookups are O(1) and
+    processes mapping the same file share its pages through the OS page cache.
+    """
+
+    value = struct.Struct("<f")
+
+    def __init__(self, path):
+        self.file = open(path, "rb")
+        self.buffer = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, number_of_classes, number_of_combos = HEADER.unpack_from(self.buffer, 0)
+        if magic != MAGIC or number_of_classes != len(HAND_CLASSES) or number_of_combos != len(COMBOS):
+            self.close()
+            raise ValueError(f"{path} is not a preflop equity table")
+
+        self.class_offset = HEADER.size
+        self.combo_offset = self.class_offset + 4 * number_of_classes ** 2
+
+    def class_equity(self, hero, villain):
+        """
+        Average all-in equity of one starting hand class against another, e.g. class_equity("AKs", "QQ")
+        """
+        position = HAND_CLASS_INDEX[hero] * len(HAND_CLASSES) + HAND_CLASS_INDEX[villain]
+        return self.value.unpack_from(self.buffer, self.class_offset + 4 * position)[0]
+
+    def combo_equity(self, hero, villain):
+        """
+        Exact all-in equity of two specific hands, e.g. combo_equity("AhKh", "QsQd"), nan if they share a card
+        """
+        position = combo_index(hero) * len(COMBOS) + combo_index(villain)
+        return self.value.unpack_from(self.buffer, self.combo_offset + 4 * position)[0]
+
+    def close(self):
+        self.buffer.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the preflop all-in equity table")
+    parser.add_argument("path", help="output file")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    arguments = parser.parse_args()
+    build_preflop_table(arguments.path, workers=arguments.workers)
@@ -0,0 +1,295 @@
+import numpy as np
+
+from .batch_evaluation import BatchEvaluator
+from .poker_main import COMBOS as COMBO_PAIRS
+from .poker_main import DECK, RANKS_TO_VALUES, VALUES_TO_RANKS, Hand, cards_to_mask, combo_index, hand_class
+
+# the combos of poker_main.COMBOS as an (N, 2) array of card indices, combo i is COMBOS[i]
+COMBOS = np.array(COMBO_PAIRS, dtype=np.int64)
+NUMBER_OF_COMBOS = len(COMBOS)
+
+# CARD_BLOCKERS[card index] is True for every combo containing that card
+CARD_BLOCKERS = np.zeros((52, NUMBER_OF_COMBOS), dtype=bool)
+CARD_BLOCKERS[COMBOS[:, 0], np.arange(NUMBER_OF_COMBOS)] = True
+CARD_BLOCKERS[COMBOS[:, 1], np.arange(NUMBER_OF_COMBOS)] = True
+
+
+def build_hand_class_combos():
+    """
+    Groups the combo indices by starting hand class
+
+    Returns:
+        dict of hand class name to array of combo indices (6 for pairs, 4 suited, 12 offsuit)
+    """
+    hand_class_combos = {}
+    for i, (first, second) in enumerate(COMBOS.tolist()):
+        hand_class_combos.setdefault(hand_class(DECK[first], DECK[second]), []).append(i)
+    return {name: np.array(combos, dtype=np.int64) for name, combos in hand_class_combos.items()}
+
+
+HAND_CLASS_COMBOS = build_hand_class_combos()
+
+
+def expand_hand_classes(token):
+    """
+    Expands one range token without weight into hand class names
+
+    Supported forms are pairs ("TT"), suited / offsuit / any hands ("AKs", "AKo", "AK"), plus ranges ("TT+",
+    "ATs+") and dash ranges in either order ("22-55" or "55-22", "A2s-A5s").
+
+    Args:
+        token: str
+
+    Returns:
+        list of hand class names
+    """
+    try:
+        names = hand_class_names(token)
+    except (KeyError, IndexError):
+        raise ValueError(f"Invalid range token {token}")
+
+    expanded = []
+    for name in names:
+        if len(name) == 2 and name[0] != name[1]:
+            expanded += [name + "s", name + "o"]
+        else:
+            expanded.append(name)
+    for name in expanded:
+        if name not in HAND_CLASS_COMBOS:
+            raise ValueError(f"Invalid hand class {name}")
+    return expanded
+
+
+def hand_class_names(token):
+    """
+    Lists the hand names covered by a token, without splitting "AK" into suited and offsuit
+    """
+    plus = token.endswith("+")
+    token = token.rstrip("+")
+
+    if "-" in token:
+        start, end = token.split("-")
+        pairs = start[0] == start[1]
+        if len(start) != len(end) or pairs != (end[0] == end[1]) or not pairs and start[0::2] != end[0::2]:
+            raise ValueError(f"Invalid range token {token}")
+        if pairs:
+            low, high = sorted([RANKS_TO_VALUES[start[0]], RANKS_TO_VALUES[end[0]]])
+            names = [VALUES_TO_RANKS[value] * 2 for value in range(low, high + 1)]
+        else:
+            low, high = sorted([RANKS_TO_VALUES[start[1]], RANKS_TO_VALUES[end[1]]])
+            names = [start[0] + VALUES_TO_RANKS[value] + start[2:] for value in range(low, high + 1)]
+    elif len(token) >= 2 and token[0] == token[1]:
+        top = 14 if plus else RANKS_TO_VALUES[token[0]]
+        names = [VALUES_TO_RANKS[value] * 2 for value in range(RANKS_TO_VALUES[token[0]], top + 1)]
+    elif len(token) >= 2:
+        high, low = RANKS_TO_VALUES[token[0]], RANKS_TO_VALUES[token[1]]
+        if low > high:
+            raise ValueError(f"Invalid range token {token}")
+        top = high - 1 if plus else low
+        names = [token[0] + VALUES_TO_RANKS[value] + token[2:] for value in range(low, top + 1)]
+    else:
+        raise ValueError(f"Invalid range token {token}")
+    return names
+
+
+class Range(object):
+    """
+    A weighted hand range held as a vector of 1326 combo weights (one per two card combination, see COMBOS)
+    """
+
+    def __init__(self, weights=None):
+        """
+
+        Args:
+            weights: array_like
+                1326 weights between 0 and 1, an empty range if None
+        """
+        if weights is None:
+            weights = np.zeros(NUMBER_OF_COMBOS)
+        self.weights = np.asarray(weights, dtype=np.float64)
+        if self.weights.shape != (NUMBER_OF_COMBOS,):
+            raise ValueError(f"A range needs {NUMBER_OF_COMBOS} combo weights")
+
+    @classmethod
+    def from_string(cls, text):
+        """
+        Parses a range like "TT+, AJs+, KQo, AhKh, 76s:0.5"
+
+        Tokens are separated by commas or spaces. A token is a hand class form accepted by expand_hand_classes or
+        a specific combo such as "AhKh", optionally followed by ":weight". Later tokens overwrite earlier weights.
+
+        Args:
+            text: str
+
+        Returns:
+            Range
+        """
+        weights = np.zeros(NUMBER_OF_COMBOS)
+        for token in text.replace(",", " ").split():
+            weight = 1.0
+            if ":" in token:
+                token, weight = token.split(":")
+                weight = float(weight)
+            if not 0 <= weight <= 1:
+                raise ValueError(f"Range weights must be between 0 and 1, not {weight}")
+
+            if len(token) == 4 and token[1] in "cdhs" and token[3] in "cdhs":
+                weights[combo_index(Hand(token).cards)] = weight
+            else:
+                for name in expand_hand_classes(token):
+                    weights[HAND_CLASS_COMBOS[name]] = weight
+        return cls(weights)
+
+    @staticmethod
+    def blocked(cards):
+        """
+        Boolean mask of the combos that contain any of the given cards
+
+        Args:
+            cards: Union[list, str]
+                Card objects or a string of cards
+
+        Returns:
+            (1326,) bool array
+        """
+        if isinstance(cards, str):
+            cards = Hand(cards).cards
+        indices = [card.index for card in cards]
+        if not indices:
+            return np.zeros(NUMBER_OF_COMBOS, dtype=bool)
+        return CARD_BLOCKERS[indices].any(axis=0)
+
+    def remove_cards(self, cards):
+        """
+        Conditions the range on known cards (board, own hand, dead cards) by zeroing every combo they block
+
+        Returns:
+            a new Range
+        """
+        return Range(np.where(self.blocked(cards), 0.0, self.weights))
+
+    def combos(self):
+        """
+        Lists the combos with a non-zero weight
+
+        Returns:
+            list of ([Card, Card], weight)
+        """
+        return [
+            ([DECK[COMBOS[i, 0]], DECK[COMBOS[i, 1]]], float(self.weights[i]))
+            for i in np.flatnonzero(self.weights)
+        ]
+
+    @property
+    def number_of_combos(self):
+        return float(self.weights.sum())
+
+    def __contains__(self, cards):
+        return bool(self.weights[combo_index(cards)])
+
+    def __repr__(self):
+        return f"Range({self.number_of_combos:g} combos)"
+
+
+def river_sweep(hero_weights, villain_weights, board_indices):
+    """
+    Hero versus villain results on one complete board
+
+    Every live combo is evaluated once and sorted by strength. Cumulative villain weights, in total and per card,
+    then give for each hero combo the villain weight it beats, ties and faces, with the combos sharing a card with
+    the hero combo removed by inclusion-exclusion.
+
+    Args:
+        hero_weights: (1326,) array
+            hero combo weights, already conditioned on the board
+        villain_weights: (1326,) array
+            villain combo weights, already conditioned on the board
+        board_indices: list
+            the 5 board card indices
+
+    Returns:
+        tuple of hero combo indices, villain weight beaten plus half the weight tied, and villain weight faced
+    """
+    live = np.flatnonzero((hero_weights > 0) | (villain_weights > 0))
+    hero = live[hero_weights[live] > 0]
+    if not len(hero):
+        return hero, np.zeros(0), np.zeros(0)
+
+    cards = np.hstack([COMBOS[live], np.tile(board_indices, (len(live), 1))])
+    strengths = BatchEvaluator.evaluate(cards)[0]
+
+    order = np.argsort(strengths, kind="stable")
+    sorted_strengths = strengths[order]
+    sorted_combos = COMBOS[live[order]]
+    sorted_weights = villain_weights[live[order]]
+
+    cumulative = np.concatenate([[0.0], np.cumsum(sorted_weights)])
+    card_weights = np.zeros((52, len(live)))
+    positions = np.arange(len(live))
+    card_weights[sorted_combos[:, 0], positions] = sorted_weights
+    card_weights[sorted_combos[:, 1], positions] = sorted_weights
+    card_cumulative = np.concatenate([np.zeros((52, 1)), np.cumsum(card_weights, axis=1)], axis=1)
+
+    hero_strengths = strengths[np.searchsorted(live, hero)]
+    first, second = COMBOS[hero, 0], COMBOS[hero, 1]
+    own_weight = villain_weights[hero]
+    below = np.searchsorted(sorted_strengths, hero_strengths, side="left")
+    up_to = np.searchsorted(sorted_strengths, hero_strengths, side="right")
+
+    def villain_weight(end):
+        return cumulative[end] - card_cumulative[first, end] - card_cumulative[second, end]
+
+    beaten = villain_weight(below)
+    tied = villain_weight(up_to) - beaten + own_weight
+    faced = villain_weight(len(live)) + own_weight
+
+    return hero, beaten + tied / 2, faced
+
+
+def range_vs_range_equity(hero_range, villain_range, board, dead_cards=None):
+    """
+    Equity of every hero combo against a villain range on a river or turn board
+
+    On the turn every river card is swept in turn and the results are summed, so each combo's equity is weighted
+    by the villain weight it faces on each river.
+
+    Args:
+        hero_range: Range
+        villain_range: Range
+        board: Union[list, str]
+            4 or 5 table cards
+        dead_cards: Union[list, str]
+            cards known to be out of the deck
+
+    Returns:
+        tuple of (1326,) combo equities (nan where the hero combo is not in the range or faces no villain combos)
+        and the equity of the whole hero range
+    """
+    board = Hand(board).cards if isinstance(board, str) else list(board)
+    dead_cards = Hand(dead_cards).cards if isinstance(dead_cards, str) else list(dead_cards or [])
+    if len(board) not in (4, 5):
+        raise ValueError("Range equity needs a turn or river board")
+
+    known_mask = cards_to_mask(board + dead_cards)
+    rivers = [[]] if len(board) == 5 else [[card] for card in DECK if not card.mask & known_mask]
+
+    scores = np.zeros(NUMBER_OF_COMBOS)
+    faced = np.zeros(NUMBER_OF_COMBOS)
+    for river in rivers:
+        known_cards = board + dead_cards + river
+        blocked = Range.blocked(known_cards)
+        hero, river_scores, river_faced = river_sweep(
+            np.where(blocked, 0.0, hero_range.weights),
+            np.where(blocked, 0.0, villain_range.weights),
+            [card.index for card in board + river],
+        )
+        scores[hero] += river_scores
+        faced[hero] += river_faced
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        combo_equities = np.where(faced > 0, scores / faced, np.nan)
+
+    weighted_faced = (hero_range.weights * faced).sum()
+    if not weighted_faced:
+        return combo_equities, float("nan")
+    return combo_equities, float((hero_range.weights * scores).sum() / weighted_faced)
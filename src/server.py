@@ -0,0 +1,401 @@
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import random
+import time
+
+from .poker_main import ActionType, Player, Strategy, action_string, cards_string, check_action
+from .table import PokerTable
+
+logger = logging.getLogger(__name__)
+
+
+def encode(message):
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def default_action(decision):
+    """
+    Action taken for a player who does not answer in time: check if possible, otherwise fold
+    """
+    if ActionType.CHECK in decision.legal_actions:
+        return ActionType.CHECK, 0
+    return ActionType.FOLD, 0
+
+
+def decision_message(decision, decision_id):
+    """
+    The JSON message asking a client for an action, amounts are in chip units
+    """
+    return {
+        "type": "decision",
+        "id": decision_id,
+        "round": decision.betting_round,
+        "position": decision.position,
+        "cards": cards_string(decision.cards),
+        "board": cards_string(decision.board),
+        "pot": decision.pot,
+        "to_call": decision.to_call,
+        "current_bet": decision.current_bet,
+        "stack": decision.stack,
+        "stacks": list(decision.stacks),
+        "legal": [kind.name.lower() for kind in decision.legal_actions],
+        "min_raise": decision.min_raise,
+        "max_raise": decision.max_raise,
+    }
+
+
+class Connection(Strategy):
+    """
+    A client seated at a table, newline delimited JSON over a stream
+
+    The table asks for an action with a decision message and waits at most action_timeout for a reply with the
+    same id, late or invalid replies get the default action. Every write waits for the transport buffer to drain
+    below its limit, a client that does not read for send_timeout is disconnected so a slow client can only slow
+    down its own table.
+    """
+
+    def __init__(self, name, reader, writer, action_timeout, send_timeout):
+        self.name = name
+        self.reader = reader
+        self.writer = writer
+        self.action_timeout = action_timeout
+        self.send_timeout = send_timeout
+        self.closed = False
+        self.timeouts = 0
+        self.done = asyncio.get_running_loop().create_future()
+        self.watcher = None
+
+    def decide(self, decision):
+        return default_action(decision)
+
+    async def send(self, message):
+        if self.closed:
+            return
+        self.writer.write(encode(message))
+        try:
+            await asyncio.wait_for(self.writer.drain(), self.send_timeout)
+        except (asyncio.TimeoutError, OSError):
+            self.close()
+
+    async def request(self, decision, decision_id):
+        """
+        Asks the client for the action of a decision
+
+        Returns:
+            the compiled action
+        """
+        await self.send(decision_message(decision, decision_id))
+        deadline = time.monotonic() + self.action_timeout
+        while not self.closed:
+            try:
+                line = await asyncio.wait_for(self.reader.readline(), deadline - time.monotonic())
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                break
+            except OSError:
+                self.close()
+                break
+            if not line:
+                self.close()
+                break
+            try:
+                message = json.loads(line)
+                if message.get("id") != decision_id:
+                    continue
+                return check_action(decision, message["action"])
+            except (ValueError, KeyError, TypeError, AttributeError):
+                break
+        return default_action(decision)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.writer.close()
+        if not self.done.done():
+            self.done.set_result(None)
+
+    def __repr__(self):
+        return f"Connection({self.name})"
+
+
+class GameServer(object):
+    """
+    Hosts many InteractivePoker tables in one asyncio process
+
+    Clients connect over TCP or a Unix socket and send {"join": name}. Clients are seated in the order they
+    join and every table_size clients start a new table, which runs as its own coroutine over a headless
+    PokerTable. Each decision is sent to the player to act and their {"id": ..., "action": "call"} reply is
+    acknowledged with {"type": "ack", "id": ...} once applied. After every hand each client gets a result with
+    their chips, players who lost every chip are given a new stack, and after hands_per_table hands (or once every
+    client has left) the table sends {"type": "closed"}. A hand that fails with an error is logged, counted in
+    failed_hands and voided, every stack goes back to what it was before the hand and the table plays on. A client
+    that disconnects while waiting for a table leaves the queue and is never seated.
+    """
+
+    # pending connections the listening socket accepts, load tests connect every client at once
+    backlog = 4096
+
+    def __init__(
+        self, table_size=6, chips=100, hands_per_table=None, action_timeout=5.0, send_timeout=5.0, seed=None
+    ):
+        if not 2 <= table_size <= 9:
+            raise ValueError("A table needs between 2 and 9 players")
+        self.table_size = table_size
+        self.chips = chips
+        self.hands_per_table = hands_per_table
+        self.action_timeout = action_timeout
+        self.send_timeout = send_timeout
+        self.seed = seed
+        self.waiting = []
+        self.tables = {}
+        self.table_ids = itertools.count()
+        self.hands_played = 0
+        self.failed_hands = 0
+        self.actions = 0
+        self.server = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """
+        Starts listening on a Unix socket if a path is given, otherwise on TCP
+
+        Returns:
+            the asyncio server
+        """
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client, path=path, backlog=self.backlog)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port, backlog=self.backlog)
+        return self.server
+
+    async def handle_client(self, reader, writer):
+        try:
+            message = json.loads(await asyncio.wait_for(reader.readline(), self.action_timeout))
+            name = str(message["join"])
+        except (asyncio.TimeoutError, OSError, ValueError, KeyError, TypeError):
+            writer.close()
+            return
+
+        connection = Connection(name, reader, writer, self.action_timeout, self.send_timeout)
+        self.waiting.append(connection)
+        if len(self.waiting) >= self.table_size:
+            connections, self.waiting = self.waiting[: self.table_size], self.waiting[self.table_size :]
+            table_id = next(self.table_ids)
+            self.tables[table_id] = asyncio.create_task(self.run_table(table_id, connections))
+        else:
+            connection.watcher = asyncio.create_task(self.watch_waiting(connection))
+        await connection.done
+
+    async def watch_waiting(self, connection):
+        """
+        Reads from a queued client until it is seated, a client that disconnects first leaves the queue
+        """
+        try:
+            while await connection.reader.readline():
+                pass
+        except (OSError, ValueError):
+            pass
+        if connection in self.waiting:
+            self.waiting.remove(connection)
+        connection.close()
+
+    async def run_table(self, table_id, connections):
+        """
+        Plays hands at one table until hands_per_table is reached or every client has left
+        """
+        # the table reads the clients' replies from here on
+        watchers = [connection.watcher for connection in connections if connection.watcher is not None]
+        for watcher in watchers:
+            watcher.cancel()
+        await asyncio.gather(*watchers, return_exceptions=True)
+
+        players = [Player(connection.name, chips=self.chips) for connection in connections]
+        seats = dict(zip(players, connections))
+        rng = random.Random(None if self.seed is None else f"{self.seed}:{table_id}")
+        table = PokerTable(players, rng=rng, headless=True, strategies=seats)
+        decision_ids = itertools.count()
+
+        for seat, connection in enumerate(connections):
+            await connection.send({"type": "seated", "table": table_id, "seat": seat})
+
+        try:
+            hands = itertools.count() if self.hands_per_table is None else range(self.hands_per_table)
+            for hand in hands:
+                if all(connection.closed for connection in connections):
+                    break
+                for player in players:
+                    if player.chip_units <= 0:
+                        player.chips = self.chips
+
+                stacks = [player.chip_units for player in players]
+                try:
+                    await self.play_hand(table, seats, decision_ids)
+                except Exception:
+                    logger.exception("Hand %s at table %s failed and was voided", hand, table_id)
+                    self.failed_hands += 1
+                    for player, stack in zip(players, stacks):
+                        player.chip_units = stack
+                else:
+                    self.hands_played += 1
+                table.finish_hand()
+
+                for player, connection in seats.items():
+                    await connection.send({"type": "result", "hand": hand, "chips": player.chips})
+        finally:
+            for connection in connections:
+                await connection.send({"type": "closed"})
+                connection.close()
+            del self.tables[table_id]
+
+    async def play_hand(self, table, seats, decision_ids):
+        """
+        Plays one hand at a table, asking the connection of each player to act for their decisions
+        """
+        steps = table.start_hand().play_steps()
+        decision = next(steps, None)
+        while decision is not None:
+            connection = seats[decision.player]
+            decision_id = next(decision_ids)
+            action = await connection.request(decision, decision_id)
+            try:
+                decision = steps.send(action)
+            except StopIteration:
+                decision = None
+            self.actions += 1
+            await connection.send({"type": "ack", "id": decision_id, "action": action_string(action)})
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for task in list(self.tables.values()):
+            task.cancel()
+        for connection in self.waiting:
+            connection.close()
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def bot_client(name, host="127.0.0.1", port=None, path=None, latencies=None):
+    """
+    A load-test client that checks or calls every decision and records the time from each action to its ack
+
+    Returns:
+        number of hands played
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    writer.write(encode({"join": name}))
+
+    sent = {}
+    hands = 0
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        message = json.loads(line)
+        kind = message["type"]
+        if kind == "decision":
+            action = "check" if "check" in message["legal"] else "call"
+            sent[message["id"]] = time.perf_counter()
+            writer.write(encode({"id": message["id"], "action": action}))
+        elif kind == "ack":
+            start = sent.pop(message["id"], None)
+            if start is not None and latencies is not None:
+                latencies.append(time.perf_counter() - start)
+        elif kind == "result":
+            hands += 1
+        elif kind == "closed":
+            break
+    writer.close()
+    return hands
+
+
+async def load_test(tables=100, table_size=6, hands_per_table=20, path=None, seed=0):
+    """
+    Runs a GameServer and enough bot clients to fill every table in this process
+
+    Args:
+        tables: int
+        table_size: int
+        hands_per_table: int
+        path: str
+            Unix socket path, TCP on a free local port if None
+        seed: int
+
+    Returns:
+        dict of hands, failed_hands, actions, seconds, actions_per_second and p50/p99 action latency in
+        milliseconds
+    """
+    server = GameServer(table_size=table_size, hands_per_table=hands_per_table, seed=seed)
+    listener = await server.start(path=path)
+    port = None if path is not None else listener.sockets[0].getsockname()[1]
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(
+        *[
+            bot_client(f"bot {i}", port=port, path=path, latencies=latencies)
+            for i in range(tables * table_size)
+        ]
+    )
+    seconds = time.perf_counter() - start
+    await server.close()
+
+    return {
+        "hands": server.hands_played,
+        "failed_hands": server.failed_hands,
+        "actions": server.actions,
+        "seconds": seconds,
+        "actions_per_second": server.actions / seconds,
+        "p50_latency_ms": 1000 * percentile(latencies, 0.5),
+        "p99_latency_ms": 1000 * percentile(latencies, 0.99),
+    }
+
+
+async def serve(host, port, path, table_size, action_timeout):
+    server = GameServer(table_size=table_size, action_timeout=action_timeout)
+    listener = await server.start(host, port, path)
+    async with listener:
+        await listener.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Multi-table poker server")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve_parser = subparsers.add_parser("serve", help="run the server")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=7000)
+    serve_parser.add_argument("--path", default=None, help="Unix socket path instead of TCP")
+    serve_parser.add_argument("--table-size", type=int, default=6)
+    serve_parser.add_argument("--action-timeout", type=float, default=5.0)
+
+    load_parser = subparsers.add_parser("load", help="run a local load test")
+    load_parser.add_argument("--tables", type=int, default=100)
+    load_parser.add_argument("--table-size", type=int, default=6)
+    load_parser.add_argument("--hands", type=int, default=20, help="hands per table")
+    load_parser.add_argument("--path", default=None, help="Unix socket path instead of TCP")
+    arguments = parser.parse_args()
+
+    if arguments.command == "serve":
+        asyncio.run(
+            serve(arguments.host, arguments.port, arguments.path, arguments.table_size, arguments.action_timeout)
+        )
+    else:
+        results = asyncio.run(load_test(arguments.tables, arguments.table_size, arguments.hands, arguments.path))
+        print(
+            f"{results['hands']} hands ({results['failed_hands']} failed), {results['actions']} actions in "
+            f"{results['seconds']:.2f} s: "
+            f"{results['actions_per_second']:.0f} actions per second, "
+            f"p50 {results['p50_latency_ms']:.2f} ms, p99 {results['p99_latency_ms']:.2f} ms"
+        )
@@ -0,0 +1,289 @@
+import argparse
+import os
+import random
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from .equity import chunk_seed
+from .history import HandHistoryWriter
+from .poker_main import (
+    CHIP_UNITS,
+    HAND_CLASS_INDEX,
+    HAND_CLASSES,
+    POSITION_INDEX,
+    POSITIONS,
+    LookupEvaluator,
+    Player,
+    hand_class,
+    to_chip_units,
+)
+from .table import PokerTable
+
+# each seat of each hand is one record of these integers, positions are indices into POSITIONS
+RECORD_FIELDS = ("seat", "position", "hand_class", "chip_delta", "flags")
+SHOWDOWN = 1
+WON = 2
+
+
+def calling_station():
+    """
+    Position scripts where everyone limps or checks their option pre-flop and checks every later street
+    """
+    check_down = {"post-flop": ["check"], "turn": ["check"], "river": ["check"]}
+    return {
+        position: dict(check_down, **{"pre-flop": ["check" if position == "BB" else "call"]})
+        for position in POSITIONS
+    }
+
+
+def simulate_chunk(task):
+    """
+    Plays one chunk of hands on a fresh headless table, run inside the worker processes
+
+    Every hand starts from the same stacks so the hands are independent and the chip deltas add up across
+    tables. The table's random stream only depends on (seed, table, chunk) and the button starts where it would
+    be after the earlier chunks of the table, so results are the same for any number of workers.
+
+    Args:
+        task: tuple
+            (seed, table index, chunk index, chunk size, number of hands, number of players, starting chips,
+            position actions, seat strategies, hand history directory or None)
+
+    Returns:
+        tuple of the number of hands and an array('i') of RECORD_FIELDS per seat per hand
+    """
+    seed, table_index, chunk, chunk_size, number_of_hands, number_of_players, chips = task[:7]
+    position_actions, strategies, history = task[7:]
+    rng = random.Random(chunk_seed(seed, f"{table_index}:{chunk}"))
+    players = [Player(f"seat {seat}", chips=chips) for seat in range(number_of_players)]
+    # the table knows bots by their Player object, which only exists in this worker
+    strategies = {players[seat]: strategy for seat, strategy in (strategies or {}).items()} or None
+    writer = None
+    if history is not None:
+        writer = HandHistoryWriter(os.path.join(history, f"table-{table_index}-chunk-{chunk}.phh"))
+    table = PokerTable(
+        players, rng=rng, sink=writer, headless=True, button=chunk * chunk_size, strategies=strategies
+    )
+    starting_units = to_chip_units(chips)
+
+    records = array("i")
+    for _ in range(number_of_hands):
+        for player in players:
+            player.chips = chips
+        table.play_session(1, position_actions)
+
+        game = table.game
+        showdown = len(game.players) > 1
+        winners = game.winners or []
+        for seat, player in enumerate(players):
+            flags = 0
+            if showdown and player in game.players:
+                flags |= SHOWDOWN
+            if player in winners:
+                flags |= WON
+            records.extend(
+                (
+                    seat,
+                    POSITION_INDEX[player.current_position],
+                    HAND_CLASS_INDEX[hand_class(player.cards[0], player.cards[1])],
+                    player.chip_units - starting_units,
+                    flags,
+                )
+            )
+    if writer is not None:
+        writer.close()
+    return number_of_hands, records
+
+
+class SimulationStats(object):
+    """
+    Aggregated results of simulated hands, chip amounts in chip units
+    """
+
+    def __init__(self, number_of_players):
+        self.number_of_players = number_of_players
+        self.hands = 0
+        self.seat_chips = [0] * number_of_players
+        self.position_hands = [0] * len(POSITIONS)
+        self.position_chips = [0] * len(POSITIONS)
+        self.position_showdowns = [0] * len(POSITIONS)
+        self.position_wins = [0] * len(POSITIONS)
+        self.hand_class_hands = [0] * len(HAND_CLASSES)
+        self.hand_class_chips = [0] * len(HAND_CLASSES)
+        self.hand_class_wins = [0] * len(HAND_CLASSES)
+
+    def add(self, number_of_hands, records):
+        """
+        Adds one batch of records as returned by simulate_chunk
+        """
+        self.hands += number_of_hands
+        for i in range(0, len(records), len(RECORD_FIELDS)):
+            seat, position, hand_class_index, chip_delta, flags = records[i:i + len(RECORD_FIELDS)]
+            won = flags & WON and 1
+            self.seat_chips[seat] += chip_delta
+            self.position_hands[position] += 1
+            self.position_chips[position] += chip_delta
+            self.position_showdowns[position] += flags & SHOWDOWN
+            self.position_wins[position] += won
+            self.hand_class_hands[hand_class_index] += 1
+            self.hand_class_chips[hand_class_index] += chip_delta
+            self.hand_class_wins[hand_class_index] += won
+
+    def big_blinds_per_100(self, chips, hands):
+        return 100 * chips / (CHIP_UNITS * hands) if hands else 0.0
+
+    def position_table(self):
+        """
+        Rows of (position, hands, bb/100, showdown frequency, win rate) for every position played
+        """
+        return [
+            (
+                position,
+                self.position_hands[i],
+                self.big_blinds_per_100(self.position_chips[i], self.position_hands[i]),
+                self.position_showdowns[i] / self.position_hands[i],
+                self.position_wins[i] / self.position_hands[i],
+            )
+            for i, position in enumerate(POSITIONS)
+            if self.position_hands[i]
+        ]
+
+    def hand_class_table(self):
+        """
+        Rows of (hand class, hands, bb/100, win rate) for every hand class dealt
+        """
+        return [
+            (
+                name,
+                self.hand_class_hands[i],
+                self.big_blinds_per_100(self.hand_class_chips[i], self.hand_class_hands[i]),
+                self.hand_class_wins[i] / self.hand_class_hands[i],
+            )
+            for i, name in enumerate(HAND_CLASSES)
+            if self.hand_class_hands[i]
+        ]
+
+    def report(self):
+        lines = [f"{self.hands} hands"]
+        for seat, chips in enumerate(self.seat_chips):
+            lines.append(f"seat {seat}: {self.big_blinds_per_100(chips, self.hands):+.2f} bb/100")
+        for position, hands, rate, showdowns, wins in self.position_table():
+            lines.append(
+                f"{position}: {hands} hands, {rate:+.2f} bb/100, showdown {showdowns:.2%}, won {wins:.2%}"
+            )
+        return "\n".join(lines)
+
+    def __repr__(self):
+        return f"SimulationStats({self.hands} hands)"
+
+
+def simulate(
+    number_of_tables,
+    hands_per_table,
+    number_of_players=6,
+    seed=0,
+    workers=None,
+    chips=100,
+    position_actions=None,
+    chunk_size=1000,
+    history=None,
+    strategies=None,
+):
+    """
+    Plays many independent headless tables across a process pool and aggregates the results
+
+    Every table is split into chunks of hands, each chunk is played on its own seeded table in a worker and its
+    per-hand records come back as one compact int array that is folded into the statistics as soon as it
+    arrives. Chunks share nothing, so throughput scales with the number of workers.
+
+    Seats with a strategy are played by it and all other seats follow the position scripts. Every chunk gets its
+    own copy of the strategies, so they must be picklable when more than one worker is used and any state they
+    keep is not shared between chunks.
+
+    Args:
+        number_of_tables: int
+        hands_per_table: int
+        number_of_players: int
+            players at each table, 2 to 9
+        seed: int
+            master seed, results only depend on it and not on the number of workers
+        workers: int
+            number of worker processes, defaults to the number of cores
+        chips: float
+            stack every player starts each hand with, in big blinds
+        position_actions: dict
+            scripted actions by position as for PokerTable.play_session, calling_station() if None
+        chunk_size: int
+            hands per chunk
+        history: str
+            directory where every chunk writes its hands as a binary hand history (see HandHistoryWriter)
+        strategies: dict
+            Strategy of each bot seat by seat index, e.g. {0: PotOddsStrategy()}
+
+    Returns:
+        SimulationStats
+    """
+    if not 2 <= number_of_players <= 9:
+        raise ValueError("A table needs between 2 and 9 players")
+    if strategies and not all(0 <= seat < number_of_players for seat in strategies):
+        raise ValueError("Strategies must be given by seat index")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if position_actions is None:
+        position_actions = calling_station()
+
+    tasks = []
+    for table_index in range(number_of_tables):
+        for chunk, first_hand in enumerate(range(0, hands_per_table, chunk_size)):
+            hands = min(chunk_size, hands_per_table - first_hand)
+            tasks.append(
+                (
+                    seed,
+                    table_index,
+                    chunk,
+                    chunk_size,
+                    hands,
+                    number_of_players,
+                    chips,
+                    position_actions,
+                    strategies,
+                    history,
+                )
+            )
+
+    stats = SimulationStats(number_of_players)
+    if workers == 1:
+        for result in map(simulate_chunk, tasks):
+            stats.add(*result)
+    else:
+        LookupEvaluator.ensure_tables()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for result in executor.map(simulate_chunk, tasks):
+                stats.add(*result)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate many headless poker tables")
+    parser.add_argument("tables", type=int, help="number of tables")
+    parser.add_argument("hands", type=int, help="hands per table")
+    parser.add_argument("--players", type=int, default=6, help="players per table")
+    parser.add_argument("--seed", type=int, default=0, help="master seed")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--bots", type=int, default=0, help="seats played by PotOddsStrategy, starting at seat 0")
+    arguments = parser.parse_args()
+
+    strategies = None
+    if arguments.bots:
+        from .bots import PotOddsStrategy
+
+        strategies = {seat: PotOddsStrategy() for seat in range(arguments.bots)}
+
+    start = time.perf_counter()
+    results = simulate(
+        arguments.tables, arguments.hands, arguments.players, arguments.seed, arguments.workers, strategies=strategies
+    )
+    elapsed = time.perf_counter() - start
+    print(results.report())
+    print(f"{results.hands / elapsed:.0f} hands per second")
@@ -0,0 +1,158 @@
+from .poker_main import InteractivePoker, Poker
+
+
+class PokerTable(object):
+    """
+    A table that plays hand after hand with the same players
+
+    One Poker game and the Player objects are reset in place between hands rather than rebuilt, and the button
+    moves one seat to the left after every hand, so a long session keeps a flat memory footprint. Players without
+    chips sit out until they are given more.
+    """
+
+    def __init__(self, players, rng=None, sink=None, headless=False, button=0, strategies=None):
+        """
+
+        Args:
+            players: list
+                Player objects in seat order
+            rng: random.Random
+                source of randomness for dealing, shared by every hand
+            sink: EventSink
+                receives the events of every hand
+            headless: bool
+                if True and no sink is given nothing is printed
+            button: int
+                seat of the first button
+            strategies: dict
+                Strategy of each bot player, hands are played with InteractivePoker if given
+        """
+        if len(players) > 9:
+            raise ValueError("A table has at most 9 seats")
+        self.players = players
+        self.button = button % len(players)
+        self.rng = rng
+        self.sink = sink
+        self.headless = headless
+        self.strategies = strategies
+        self.game = None
+        self.hands_played = 0
+
+    def seated_players(self):
+        """
+        Players with chips, starting with the seat left of the button and ending with the button
+        """
+        number_of_seats = len(self.players)
+        seats = [(self.button + 1 + i) % number_of_seats for i in range(number_of_seats)]
+        return [self.players[seat] for seat in seats if self.players[seat].chip_units > 0]
+
+    def assign_positions(self, players):
+        """
+        Gives each player their position for the next hand, players must start left of the button
+        """
+        _, _, post_flop_order = Poker.position_map(len(players))
+        for player, position in zip(players, post_flop_order):
+            player.current_position = position
+
+    def play_hand(self, actions=None, cards=None, table_cards=None):
+        """
+        Plays one hand and moves the button
+
+        Args:
+            see start_hand
+
+        Returns:
+            the Poker game, valid until the next hand is played
+        """
+        game = self.start_hand(actions, cards, table_cards)
+        game.play_game()
+        self.finish_hand()
+        return game
+
+    def start_hand(self, actions=None, cards=None, table_cards=None):
+        """
+        Sets up the next hand without playing it, the hand is played with the game's play_game or play_steps and
+        must be followed by finish_hand
+
+        Args:
+            actions: dict
+                scripted actions of each player as a dict of betting round ('pre-flop', 'post-flop', 'turn' or
+                'river') to list of actions, players without a script take no action
+            cards: dict
+                hole cards of any player whose cards are already defined
+            table_cards: list
+                any table cards that are already defined
+
+        Returns:
+            the Poker game, valid until the next hand is played
+        """
+        actions = actions or {}
+        cards = cards or {}
+
+        players = self.seated_players()
+        if len(players) < 2:
+            raise ValueError("A hand needs at least two players with chips")
+        self.assign_positions(players)
+
+        for player in self.players:
+            script = actions.get(player, {})
+            player.new_hand(
+                cards=list(cards.get(player, [])),
+                pre_flop=list(script.get("pre-flop", [])),
+                post_flop=list(script.get("post-flop", [])),
+                turn=list(script.get("turn", [])),
+                river=list(script.get("river", [])),
+            )
+
+        if self.game is None and self.strategies is not None:
+            self.game = InteractivePoker(
+                players,
+                strategies=self.strategies,
+                table_cards=table_cards,
+                rng=self.rng,
+                sink=self.sink,
+                headless=self.headless,
+            )
+        elif self.game is None:
+            self.game = Poker(
+                players, table_cards=table_cards, rng=self.rng, sink=self.sink, headless=self.headless
+            )
+        else:
+            self.game.new_hand(players, table_cards)
+        return self.game
+
+    def finish_hand(self):
+        """
+        Moves the button once a hand started with start_hand has been played
+        """
+        self.hands_played += 1
+        self.button = (self.button + 1) % len(self.players)
+
+    def play_session(self, number_of_hands, position_actions=None):
+        """
+        Plays a number of hands, stopping early if fewer than two players have chips
+
+        Args:
+            number_of_hands: int
+            position_actions: dict
+                scripted actions by position (e.g. 'SB') as a dict of betting round to list of actions, every
+                hand each player follows the script of the position they are in
+
+        Returns:
+            number of hands played
+        """
+        position_actions = position_actions or {}
+        for hand in range(number_of_hands):
+            players = self.seated_players()
+            if len(players) < 2:
+                return hand
+            self.assign_positions(players)
+            self.play_hand(
+                actions={
+                    player: position_actions.get(player.current_position, {}) for player in players
+                }
+            )
+        return number_of_hands
+
+    def __repr__(self):
+        return f"PokerTable({self.players}, {self.hands_played} hands played)"
@@ -0,0 +1,36 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.poker_main import DECK, Hand, LookupEvaluator
+from src.batch_evaluation import BatchEvaluator, hands_to_array
+
+
+def test_batch_matches_lookup_evaluator():
+    random.seed(11)
+    hands = [random.sample(DECK, 7) for _ in range(2000)]
+    strengths, hand_classes = BatchEvaluator.evaluate(hands_to_array(hands))
+
+    expected = [LookupEvaluator.evaluate(hand) for hand in hands]
+    assert strengths.tolist() == expected
+    assert hand_classes.tolist() == [strength >> 20 for strength in expected]
+
+
+def test_batch_partial_hands():
+    hands = [Hand("AhAd7c8s2d").cards, Hand("Ah2h3h4h5h").cards, Hand("KsKdKc9h9d2c").cards]
+    strengths, hand_classes = BatchEvaluator.evaluate(hands_to_array(hands, size=6))
+
+    assert hand_classes.tolist() == [1, 8, 6]
+    assert strengths.tolist() == [LookupEvaluator.evaluate(hand) for hand in hands]
+
+
+def test_batch_rejects_wide_arrays():
+    with pytest.raises(ValueError):
+        BatchEvaluator.evaluate(np.zeros((1, 8), dtype=np.int64))
+
+
+@pytest.mark.parametrize("hands", [[[]], [Hand("Ah2h3h4h5h").cards, Hand("AhAd").cards]])
+def test_batch_rejects_hands_with_fewer_than_five_cards(hands):
+    with pytest.raises(ValueError, match="at least 5 cards"):
+        BatchEvaluator.evaluate(hands_to_array(hands))
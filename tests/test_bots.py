@@ -0,0 +1,58 @@
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.poker_main import ActionType, InteractivePoker, Player
+from src.bots import PotOddsStrategy, decision_arrays
+
+
+class CountingStrategy(PotOddsStrategy):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.batch_sizes = []
+
+    def decide_arrays(self, arrays):
+        self.batch_sizes.append(len(arrays["pot"]))
+        return super().decide_arrays(arrays)
+
+
+def bot_games(number_of_games, strategy):
+    games = []
+    for seed in range(number_of_games):
+        players = [
+            Player("a", chips=50, current_position="SB"),
+            Player("b", chips=50, current_position="BB"),
+            Player("c", chips=50, current_position="BTN"),
+        ]
+        games.append(
+            InteractivePoker(
+                players, strategies={player: strategy for player in players}, rng=random.Random(seed), headless=True
+            )
+        )
+    return games
+
+
+def test_play_tables_batches_decisions():
+    bot = CountingStrategy(0.3, 0.5)
+    games = bot_games(50, bot)
+    rounds = InteractivePoker.play_tables(games)
+
+    assert len(bot.batch_sizes) == rounds
+    assert bot.batch_sizes[0] == 50
+    assert sum(sum(player.chips for player in game.seated_players) for game in games) == 50 * 150
+
+
+def test_decision_arrays():
+    bot = CountingStrategy(0.5)
+    game = bot_games(1, bot)[0]
+    steps = game.play_steps()
+    decision = next(steps)
+    arrays = decision_arrays([decision])
+
+    assert decision.position == "BTN"
+    assert arrays["to_call"].tolist() == [100]
+    assert arrays["legal"].tolist() == [[True, False, True, True]]
+    assert arrays["board"].tolist() == [[-1] * 7]
+    assert arrays["cards"].tolist() == [[card.index for card in decision.cards]]
+    assert bot.decide(decision) == (ActionType.CALL, 0)
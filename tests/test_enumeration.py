@@ -0,0 +1,22 @@
+import pytest
+from src.enumeration import EXPECTED_FREQUENCIES, frequency_shard, frequency_table, hand_frequencies
+
+
+def test_five_card_frequencies():
+    counts = hand_frequencies(5, workers=1)
+
+    assert counts == EXPECTED_FREQUENCIES[5]
+    assert frequency_table(counts).startswith("A royal flush occurs 4 times")
+
+
+@pytest.mark.parametrize("number_of_cards, first, second", [(5, 20, 30), (7, 12, 35)])
+def test_engines_agree_on_a_shard(number_of_cards, first, second):
+    lookup_counts = frequency_shard((number_of_cards, first, second, "lookup"))
+    legacy_counts = frequency_shard((number_of_cards, first, second, "legacy"))
+
+    assert lookup_counts == legacy_counts
+
+
+def test_invalid_hand_size():
+    with pytest.raises(ValueError):
+        hand_frequencies(4)
@@ -0,0 +1,67 @@
+import pytest
+from src.poker_main import BoardAnalysis, DECK, Hand, Player, cards_to_mask
+from src.equity import exact_equity, monte_carlo_equity
+
+
+@pytest.mark.parametrize("hands, board", [
+    (["AhKh", "QsQd"], "Qh7h2c5d"),
+    (["AhKh", "QsQd", "7c6c"], "Kc8c2d9s"),
+    (["AsKs", "AdKd"], "2c3c4h5h"),
+])
+def test_exact_equity_matches_board_analysis(hands, board):
+    results = exact_equity(hands, board)
+
+    hand_cards = [Hand(hand).cards for hand in hands]
+    board_cards = Hand(board).cards
+    used_mask = cards_to_mask(board_cards + [card for hand in hand_cards for card in hand])
+    rivers = [card for card in DECK if not card.mask & used_mask]
+
+    shares = [0.0] * len(hands)
+    for river in rivers:
+        players = [Player(str(i), cards=cards) for i, cards in enumerate(hand_cards)]
+        winners = BoardAnalysis(players, board_cards + [river]).winners
+        for winner in winners:
+            shares[int(winner.name)] += 1 / len(winners)
+
+    assert all(result.runouts == len(rivers) for result in results)
+    assert [result.equity for result in results] == pytest.approx([share / len(rivers) for share in shares])
+    assert sum(result.equity for result in results) == pytest.approx(1)
+
+
+def test_exact_equity_dead_cards_and_complete_board():
+    results = exact_equity(["AsKs", "AdKd"], "2c3c4h5h6d")
+
+    assert results[0].runouts == 1
+    assert (results[0].tie, results[0].equity, results[1].equity) == (1, 0.5, 0.5)
+
+    flop_results = exact_equity(["AhAd", "KhKd"], "Ks7c2d", dead_cards="AcAs")
+    assert flop_results[0].win == 0
+    assert flop_results[0].lose == 1
+
+
+@pytest.mark.parametrize("hands, board", [
+    (["AhKh"], None),
+    (["AhKh", "AhQd"], None),
+    (["AhKh", "QsQd"], "2c3c4c5c6c7c"),
+])
+def test_exact_equity_invalid_spots(hands, board):
+    with pytest.raises(ValueError):
+        exact_equity(hands, board)
+
+
+def test_monte_carlo_equity_is_independent_of_workers():
+    single = monte_carlo_equity(["AhKh", "QsQd", None], trials=3000, seed=5, workers=1, chunk_size=1000)
+    pooled = monte_carlo_equity(["AhKh", "QsQd", None], trials=3000, seed=5, workers=2, chunk_size=1000)
+
+    assert [result.share_units for result in single] == [result.share_units for result in pooled]
+    assert [result.standard_error for result in single] == [result.standard_error for result in pooled]
+    assert sum(result.equity for result in single) == pytest.approx(1)
+
+
+def test_monte_carlo_equity_close_to_exact():
+    exact = exact_equity(["AhKh", "QsQd"], "Qh7h2c")
+    sampled = monte_carlo_equity(["AhKh", "QsQd"], "Qh7h2c", trials=20000, seed=1, workers=1)
+
+    for exact_result, sampled_result in zip(exact, sampled):
+        assert 0 < sampled_result.standard_error < 0.01
+        assert abs(exact_result.equity - sampled_result.equity) < 4 * sampled_result.standard_error
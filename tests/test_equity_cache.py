@@ -0,0 +1,30 @@
+from src.equity_cache import EquityCache, canonical_key
+
+
+def test_canonical_key_ignores_suit_permutations_and_order():
+    key = canonical_key(["AhKh", "QsQd"], "2c7h9d")
+
+    assert canonical_key(["KsAs", "QhQc"], "9c2d7s") == key
+    assert canonical_key(["AhKh", "QsQd"], "2c7d9h") != key
+    assert canonical_key(["QsQd", "AhKh"], "2c7h9d") != key
+
+
+def test_cache_hits_in_memory_and_on_disk(tmp_path):
+    path = str(tmp_path / "equities.sqlite")
+
+    with EquityCache(maxsize=1, path=path) as cache:
+        first = cache.equity(["AhKh", "QsQd"], "2c7h9d")
+        second = cache.equity(["AdKd", "QcQs"], "2h7d9s")
+        cache.equity(["AhAd", "7c6c"], "2c7h9d")
+
+        assert [result.share_units for result in first] == [result.share_units for result in second]
+        assert str(second[0]).startswith("A\u2666K\u2666")
+        assert (cache.memory_hits, cache.disk_hits, cache.misses) == (1, 0, 2)
+        assert len(cache.memory) == 1
+
+    with EquityCache(path=path) as cache:
+        results = cache.equity(["AsKs", "QhQd"], "2c7s9d")
+
+        assert cache.disk_hits == 1
+        assert cache.hit_rate == 1
+        assert [result.equity for result in results] == [result.equity for result in first]
@@ -0,0 +1,70 @@
+import os
+import random
+
+import pytest
+
+from src.history import HandHistoryWriter, read_hand_history
+from src.poker_main import ActionType, EventLog, Player
+from src.simulation import calling_station, simulate
+from src.table import PokerTable
+
+
+def record_hands(path, number_of_hands, **writer_options):
+    players = [Player(f"p{seat}", chips=100) for seat in range(4)]
+    with HandHistoryWriter(path, batch_size=3, **writer_options) as writer:
+        table = PokerTable(players, rng=random.Random(5), sink=writer)
+        table.play_session(number_of_hands, calling_station())
+    return players
+
+
+@pytest.mark.parametrize(
+    "format, compression", [("binary", None), ("jsonl", None), ("binary", "gzip"), ("jsonl", "xz")]
+)
+def test_hand_history_round_trip(tmp_path, format, compression):
+    path = str(tmp_path / "hands")
+    players = record_hands(path, 5, format=format, compression=compression)
+    records = list(read_hand_history(path))
+
+    assert [record.hand for record in records] == list(range(5))
+    for record in records:
+        assert len(record.seats) == 4 and len(record.board) == 5
+        assert all(len(cards) == 2 for _, _, _, cards in record.seats)
+        assert sorted(amount for _, amount in record.blinds) == [50, 100]
+        assert record.actions[0][1] == "pre-flop" and record.actions[-1][1] == "river"
+        assert record.actions[0][2] == (ActionType.CALL, 0)
+        assert sum(amount for _, amount in record.payouts) == 400
+
+    stacks = {player.name: 0 for player in players}
+    for record in records:
+        for seat, amount in record.payouts:
+            stacks[record.seats[seat][0]] += amount
+    assert sum(stacks.values()) == 5 * 400
+
+
+def test_hand_history_appends(tmp_path):
+    path = str(tmp_path / "hands.phh")
+    record_hands(path, 2, compression="gzip")
+    record_hands(path, 3, compression="gzip")
+    assert [record.hand for record in read_hand_history(path)] == [0, 1, 0, 1, 2]
+
+
+def test_writer_attached_mid_hand_skips_the_hand(tmp_path):
+    log = EventLog()
+    table = PokerTable([Player(f"p{seat}", chips=100) for seat in range(3)], rng=random.Random(1), sink=log)
+    table.play_session(2, calling_station())
+    first_blind = next(i for i, event in enumerate(log.events) if event.kind == "blind")
+
+    path = str(tmp_path / "hands.phh")
+    with HandHistoryWriter(path) as writer:
+        for event in log.events[first_blind:]:
+            writer.emit(event)
+    records = list(read_hand_history(path))
+    assert [record.hand for record in records] == [0]
+    assert len(records[0].seats) == 3 and len(records[0].blinds) == 2
+
+
+def test_simulation_history(tmp_path):
+    stats = simulate(1, 12, number_of_players=3, seed=2, workers=1, chunk_size=5, history=str(tmp_path))
+    files = sorted(os.listdir(tmp_path))
+    assert files == ["table-0-chunk-0.phh", "table-0-chunk-1.phh", "table-0-chunk-2.phh"]
+    assert sum(len(list(read_hand_history(str(tmp_path / name)))) for name in files) == stats.hands
@@ -0,0 +1,74 @@
+import os
+import random
+
+from src.importer import HandHistoryImporter, parse_chunk
+from src.poker_main import BoardAnalysis, Hand
+
+EXAMPLE = os.path.join(os.path.dirname(__file__), "..", "example_data", "multigame_example_anonymized.txt")
+
+
+def import_example(**kwargs):
+    importer = HandHistoryImporter(**kwargs)
+    return importer, list(importer.import_files([EXAMPLE]))
+
+
+def test_import_example_hands():
+    importer, hands = import_example(workers=1)
+    assert (importer.hands, importer.errors, len(hands)) == (14, 0, 14)
+    assert importer.bytes == os.path.getsize(EXAMPLE)
+    assert importer.hands_per_second > 0
+
+    hand = hands[0]
+    assert hand.hand_id == "223646450352" and hand.big_blind == 0.02
+    assert hand.table_cards == Hand("9s6h7h").cards
+    players = {player.name: player for player in hand.players}
+    assert [player.current_position for player in hand.players][:2] == ["SB", "BB"]
+    assert players["Willie_Dustice"].current_position == "SB"
+    assert players["Darryl_Archideld"].current_position == "BTN"
+    assert players["Bobson_Dugnutt"].cards == Hand("9cJc").cards
+    assert players["Bobson_Dugnutt"].pre_flop_actions == ["check"]
+    assert players["Bobson_Dugnutt"].post_flop_actions == ["raise to 1", "fold"]
+    assert players["Sleve_McDichael"].post_flop_actions == ["raise to 4.5"]
+    assert players["Sleve_McDichael"].chips == 101.5
+    assert players["Sleve_McDichael"].winnings == 6.5
+
+
+def test_import_showdown():
+    _, hands = import_example(workers=1)
+    showdowns = [hand for hand in hands if len(hand.known_players()) > 1]
+    assert len(showdowns) == 2
+
+    hand = showdowns[0]
+    players = {player.name: player for player in hand.players}
+    assert players["Mike_Truk"].cards == Hand("JsJc").cards
+    assert players["Mike_Truk"].river_actions == ["call"]
+    assert players["Bobson_Dugnutt"].river_actions == ["raise to 25"]
+    analysis = BoardAnalysis(hand.known_players(), hand.table_cards)
+    assert [player.name for player in analysis.winners] == ["Mike_Truk"]
+
+
+def test_import_is_independent_of_chunks_and_workers():
+    _, hands = import_example(workers=1)
+    expected = [hand.hand_id for hand in hands]
+    for chunk_size in (1, 777, 5000):
+        _, chunked = import_example(workers=1, chunk_size=chunk_size)
+        assert [hand.hand_id for hand in chunked] == expected
+    importer, pooled = import_example(workers=2, chunk_size=4000)
+    assert [hand.hand_id for hand in pooled] == expected
+    assert [hand.seats for hand in pooled] == [hand.seats for hand in hands]
+
+
+def number_of_players(hand):
+    return len(hand.players)
+
+
+def test_import_process_and_replay():
+    importer = HandHistoryImporter(workers=1, chunk_size=3000)
+    assert list(importer.import_files([EXAMPLE], process=number_of_players)) == [9] * 14
+    assert importer.hands == 14
+
+    assert parse_chunk((EXAMPLE, 0, 1, None))[1] == 1
+    _, hands = import_example(workers=1)
+    game = hands[0].game(rng=random.Random(0), headless=True)
+    game.play_game()
+    assert sum(player.chips for player in hands[0].players) > 0
@@ -91,8 +91,8 @@ def test_always_passes():
 
     # flush over flush (low)
     (
-            [Card("8s"), Card("6s"), Card("4s"), Card("3s"), Card("2s")],
-            [Card("7c"), Card("6c"), Card("5c"), Card("3c"), Card("2c")]
+            [Card("8s"), Card("7s"), Card("4s"), Card("3s"), Card("2s")],
+            [Card("7c"), Card("6c"), Card("3c"), Card("2c"), Card("Kd")]
     ),
 
     # boat over boat (pair over)
@@ -213,3 +213,59 @@ def test_heads_up_single_street_betting_single_winner_a(winner_cards, loser_card
 
 class HeadsUpTests(object):
     pass
+
+
+def test_three_way_all_in_side_pot():
+    players = [
+        Player("A", chips=10, current_position="SB", pre_flop=["call"], cards=[Card("Ah"), Card("Ad")]),
+        Player("B", chips=20, current_position="BB", pre_flop=["call"], cards=[Card("Kh"), Card("Kd")]),
+        Player("C", chips=30, current_position="BTN", pre_flop=["raise to 30"], cards=[Card("7c"), Card("2s")]),
+    ]
+    table_cards = [Card("2h"), Card("4c"), Card("5s"), Card("8d"), Card("9h")]
+    game = Poker(players, table_cards=table_cards, headless=True)
+    game.play_game()
+
+    assert [player.chips for player in players] == [30, 20, 10]
+    assert [(pot.amount, pot.winners) for pot in game.pots] == [(3000, [players[0]]), (2000, [players[1]])]
+
+
+def test_resolve_pots_odd_chips_follow_seat_order():
+    a, b, c = Player("a"), Player("b"), Player("c")
+    winnings, pots = resolve_pots({a: 101, b: 101, c: 101}, [[b, a], [c]], seat_order=[a, b, c])
+
+    assert winnings == {a: 152, b: 151, c: 0}
+    assert len(pots) == 1 and pots[0].shares == [152, 151]
+
+
+def test_resolve_pots_dead_money_and_side_pots():
+    folded, short, deep = Player("folded"), Player("short"), Player("deep")
+
+    winnings, pots = resolve_pots({folded: 50, short: 30, deep: 100}, [[short], [deep]])
+    assert winnings == {folded: 0, short: 90, deep: 90}
+    assert [pot.amount for pot in pots] == [90, 40, 50]
+
+    winnings, pots = resolve_pots({folded: 100, short: 50, deep: 50}, [[short], [deep]])
+    assert winnings == {folded: 0, short: 200, deep: 0}
+
+    with pytest.raises(ValueError):
+        resolve_pots({folded: 10}, [])
+
+
+def test_uncalled_part_of_a_raise_is_returned():
+    small_blind = Player("SB", chips=6, current_position="SB", pre_flop=["raise to 3", "fold"],
+                         cards=[Card("Ah"), Card("Ad")])
+    big_blind = Player("BB", chips=4, current_position="BB", pre_flop=["raise to 4"], cards=[Card("7c"), Card("2s")])
+    log = EventLog()
+    game = Poker([small_blind, big_blind], sink=log)
+    game.play_game()
+
+    assert (small_blind.chips, big_blind.chips) == (3, 7)
+    returned = log.of_kind("bet_returned")[0]
+    assert (returned["player"], returned["amount"]) == (big_blind, 1)
+
+
+def test_resolve_pots_dead_money_without_live_contributions():
+    folded, live = Player("folded"), Player("live")
+    winnings, pots = resolve_pots({folded: 300, live: 0}, [[live]])
+    assert winnings == {folded: 0, live: 300}
+    assert [(pot.amount, pot.level, pot.winners) for pot in pots] == [(300, 0, [live])]
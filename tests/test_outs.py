@@ -0,0 +1,34 @@
+import pytest
+from src.poker_main import BoardAnalysis, Card, Hand, Player
+from src.outs import OutsAnalysis
+
+
+@pytest.mark.parametrize("hands, board", [
+    (["AhKh", "QsQd"], "Qh7h2c"),
+    (["AhKh", "QsQd", "9c8c"], "Qh7h2cTd"),
+    (["AsKs", "AdKd"], "2c3c4h"),
+])
+def test_outs_match_board_analysis(hands, board):
+    analysis = OutsAnalysis(hands, board)
+
+    assert len(analysis.cards) == 52 - len(board) // 2 - 2 * len(hands)
+    for out in analysis.cards:
+        players = [Player(str(i), cards=Hand(hand).cards) for i, hand in enumerate(hands)]
+        winners = BoardAnalysis(players, Hand(board).cards + [out.card], engine="lookup").winners
+        assert out.winners == tuple(int(player.name) for player in winners)
+
+
+def test_flush_draw_outs_and_improvements():
+    analysis = OutsAnalysis(["AhKh", "QsQd"], "Qh7h2c5d")
+
+    assert analysis.winners == (1,)
+    outs = analysis.outs(0)
+    assert Card("3h") in outs and Card("Jh") in outs
+    assert Card("Ac") not in outs and Card("7d") not in outs
+    assert analysis.number_of_outs() == [len(outs), 0]
+
+    river = next(out for out in analysis.cards if out.card == Card("3h"))
+    assert river.improvement_names() == ["flush", None]
+
+    with pytest.raises(ValueError):
+        OutsAnalysis(["AhKh", "QsQd"], "Qh7h")
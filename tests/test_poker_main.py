@@ -1,5 +1,9 @@
 import pytest
-from src.poker_main import Poker, Card, Player, BoardAnalysis
+import random
+from src.poker_main import (Poker, Card, Player, BoardAnalysis, Hand, HandRanking, HandState, EventLog, Deck,
+                            BettingRound, LookupEvaluator, DECK, ActionType, cards_to_mask, mask_to_cards,
+                            pack_strength, unpack_strength, compile_action, compile_script, validate_script,
+                            InteractivePoker, Strategy)
 
 
 def test_all_rankings():
@@ -68,3 +72,470 @@ def test_two_pair():
 
 class MultiWayPots:
     pass
+
+
+def test_cards_are_interned():
+    assert Card("Ah") is Card("Ah")
+    assert Card("Kds") is Card("Kd")
+    assert {Card("2c"): 1}[Card("2c")] == 1
+    assert Card("2c").index == 0 and Card("Ah").index == 51
+
+    with pytest.raises(AttributeError):
+        Card("Ah").value = 2
+
+
+def test_card_masks_round_trip():
+    cards = [Card("Ah"), Card("2c"), Card("Ts")]
+    mask = cards_to_mask(cards)
+
+    assert bin(mask).count("1") == 3
+    assert mask_to_cards(mask) == sorted(cards, key=lambda x: x.index)
+    assert len(Player("a", cards=cards).remaining_deck) == 49
+
+
+def test_lookup_engine_matches_legacy_rankings():
+    random.seed(7)
+    for _ in range(200):
+        cards = random.sample(DECK, 11)
+        table_cards = cards[:5]
+        rankings = {}
+        for engine in BoardAnalysis.engines:
+            players = [Player(name, cards=cards[5 + 2 * i:7 + 2 * i]) for i, name in enumerate("abc")]
+            analysis = BoardAnalysis(players, table_cards, engine=engine)
+            rankings[engine] = (
+                [[player.name for player in ranking] for ranking in analysis.ranked_players],
+                [player.hand_ranking.single_parameter for player in analysis.players],
+            )
+
+        assert rankings["lookup"] == rankings["legacy"]
+
+
+def seven_card_hands():
+    rng = random.Random(3)
+    hands = [rng.sample(DECK, 7) for _ in range(2000)]
+
+    # boards with two three of a kinds are rare in random samples, so some are always included
+    hands += [Hand(cards).cards for cards in ("6h8d8c6d6cTs8h", "AhAdAc2s2c2hKd", "3h3d3c4s4c4hQd", "9h9d9cTsTcThTd")]
+    return hands
+
+
+def test_engines_agree_on_seven_card_hands():
+    for cards in seven_card_hands():
+        hand_data = {}
+        for engine in BoardAnalysis.engines:
+            player = Player("a", cards=cards[:2])
+            BoardAnalysis([player], cards[2:], engine=engine)
+            hand_data[engine] = (player.hand_ranking.strength, player.hand_ranking.hand_data)
+
+        assert hand_data["lookup"] == hand_data["legacy"], cards
+
+
+@pytest.mark.parametrize("cards, hand_class, values", [
+    ("Ah", 0, [14]),
+    ("AhAc", 1, [14, 14]),
+    ("AhAcKdKs", 2, [14, 14, 13, 13]),
+    ("9h9c9d2s2c", 6, [9, 9, 9, 2, 2]),
+    ("9h9c9d2s2c2h", 6, [9, 9, 9, 2, 2]),
+    ("Ah2c3d4s5c6h", 4, [6, 5, 4, 3, 2]),
+    ("Ah2h3h4h5h", 8, [5, 4, 3, 2, 14]),
+])
+def test_lookup_evaluator_strengths(cards, hand_class, values):
+    strength = LookupEvaluator.evaluate(Hand(cards).cards)
+
+    assert unpack_strength(strength) == (hand_class, values)
+    assert strength == pack_strength(hand_class, values)
+
+
+@pytest.mark.parametrize("cards, straight_values, straight_ranking", [
+    ("Ah2c3d4s5c6h", [6, 5, 4, 3, 2], 6),
+    ("Ah2c3d4s5cKh", [5, 4, 3, 2, 14], 5),
+    ("AhKcQdJsTc9h", [14, 13, 12, 11, 10], 14),
+    ("AhKcQdJs9c", None, None),
+])
+def test_straight_check(cards, straight_values, straight_ranking):
+    values, _, _, ranking = BoardAnalysis.straight_check(Hand(cards).cards)
+
+    assert values == straight_values
+    assert ranking == straight_ranking
+
+
+@pytest.mark.parametrize("cards, flush, flush_ranking, flush_string", [
+    ("9s8s7s6s5sKs2h", 8, 9, "9s8s7s6s5s"),
+    ("Ah2h3h4h5h9c", 8, 5, "5h4h3h2hAh"),
+    ("AcKcQcJcTc", 9, 14, "AcKcQcJcTc"),
+    ("Ad9d7d5d3d2d", 5, 14, "Ad9d7d5d3d"),
+    ("Ad9d7d5dKs", None, None, None),
+])
+def test_flush_check(cards, flush, flush_ranking, flush_string):
+    flush_cards, hand_class, ranking = BoardAnalysis.flush_check(Hand(cards).cards)
+
+    assert hand_class == flush
+    assert ranking == flush_ranking
+    if flush_string:
+        assert flush_cards == Hand(flush_string).cards
+
+
+@pytest.mark.parametrize("engine", BoardAnalysis.engines)
+def test_split_pot_rankings_grouped_by_strength(engine):
+    players = [
+        Player("a", cards=[Card("Ah"), Card("Kd")]),
+        Player("b", cards=[Card("Qh"), Card("8d")]),
+        Player("c", cards=[Card("Ac"), Card("Ks")]),
+    ]
+    table_cards = [Card("2h"), Card("7c"), Card("9s"), Card("Td"), Card("3c")]
+    analysis = BoardAnalysis(players, table_cards, engine=engine)
+
+    assert [player.name for player in analysis.winners] == ["a", "c"]
+    assert [[player.name for player in ranking] for ranking in analysis.ranked_players] == [["a", "c"], ["b"]]
+    assert analysis.rankings[0] == HandRanking.from_strength(analysis.rankings[0].strength)
+
+
+def test_hand_ranking_builds_cards_lazily():
+    cards = Hand("AhAdKs7c2d").cards
+    ranking = HandRanking.from_strength(LookupEvaluator.evaluate(cards), cards)
+
+    assert ranking._hand_data is None
+    assert ranking.hand_class == 1
+    assert sorted([ranking, HandRanking.from_strength(0)])[0].strength == 0
+    assert ranking._hand_data is None
+    assert str(ranking) == "".join(str(card) for card in Hand("AhAdKs7c2d").cards)
+
+
+def test_hand_state_matches_full_evaluation():
+    rng = random.Random(13)
+    for _ in range(200):
+        cards = rng.sample(DECK, 7)
+        flop = HandState(cards[:3])
+        turn = flop.added(cards[3])
+        river = turn.copy().add(cards[4]).add(cards[5]).add(cards[6])
+
+        assert flop.strength == LookupEvaluator.evaluate(cards[:3])
+        assert turn.strength == LookupEvaluator.evaluate(cards[:4])
+        assert river.strength == LookupEvaluator.evaluate(cards)
+        assert flop.number_of_cards == 3 and flop.mask == cards_to_mask(cards[:3])
+
+
+def test_hand_state_rejects_duplicate_cards():
+    with pytest.raises(ValueError):
+        HandState(Hand("AhKh").cards).add(Card("Ah"))
+
+
+def test_poker_extends_table_state_each_street():
+    players = [Player("a", cards=Hand("AhAd").cards), Player("b", cards=Hand("7c2s").cards)]
+    game = Poker(players, rng=random.Random(1))
+    game.deal()
+    game.flop()
+    game.turn()
+    game.river()
+
+    assert game.table_state.mask == cards_to_mask(game.table_cards)
+    states = game.hand_states()
+    for player in players:
+        assert states[player].strength == LookupEvaluator.evaluate(player.cards + game.table_cards)
+
+
+def heads_up_players():
+    return [
+        Player("A", chips=10, current_position="BB", pre_flop=["check"], post_flop=["raise to 5", "call"],
+               cards=Hand("AhAd").cards),
+        Player("B", chips=10, current_position="SB", pre_flop=["call"], post_flop=["check", "raise to 10"],
+               cards=Hand("7c2s").cards),
+    ]
+
+
+def test_headless_game_prints_nothing(capsys):
+    table_cards = Hand("2h4c5s8d9h").cards
+    game = Poker(heads_up_players(), table_cards=table_cards, headless=True)
+    game.play_game()
+
+    assert capsys.readouterr().out == ""
+    assert game.winners[0].name == "A" and game.winners[0].chips == 20
+
+
+def test_stacks_are_kept_in_whole_chip_units():
+    players = heads_up_players()
+    players[0].chips = 10.37
+    game = Poker(players, table_cards=Hand("2h4c5s8d9h").cards, headless=True)
+    game.play_game()
+
+    assert [player.chip_units for player in players] == [2037, 0]
+    assert all(type(player.chip_units) is int for player in players)
+    assert players[0].chips == 20.37 and game.pot_units == 0
+
+
+def test_events_are_streamed_to_the_sink(capsys):
+    log = EventLog()
+    game = Poker(heads_up_players(), table_cards=Hand("2h4c5s8d9h").cards, sink=log)
+    game.play_game()
+
+    assert capsys.readouterr().out == ""
+    assert sorted(event["blind"] for event in log.of_kind("blind")) == ["big", "small"]
+    assert [event["street"] for event in log.of_kind("street")] == ["flop", "turn", "river"]
+    assert log.of_kind("all_in")[0]["player"].name == "B"
+
+    payout = log.of_kind("payout")[0]
+    assert (payout["player"].name, payout["amount"], payout["rank"]) == ("A", 20, 1)
+    assert str(payout) == f"In Rank 1 A with {game.winners[0].print_ranking} and collects 20.0"
+    assert str(log.of_kind("street")[1]) == "Turn card: 8♦\nTable Cards: 2♥4♣5♠(8♦)"
+
+
+def test_deck_deals_and_removes_each_card_once():
+    deck = Deck(random.Random(17))
+    deck.remove(Card("Ah"))
+    deck.remove_cards([Card("Ah"), Card("Kd")])
+    dealt = deck.deal(50)
+
+    assert len(deck) == 0 and Card("Ah") not in deck
+    assert sorted(card.index for card in dealt + Hand("AhKd").cards) == list(range(52))
+    with pytest.raises(ValueError):
+        deck.deal()
+
+    deck.reset()
+    assert len(deck) == 52 and Card("Ah") in deck
+
+
+def test_predefined_cards_are_never_dealt():
+    for seed in range(20):
+        players = [Player("a", cards=Hand("AhAd").cards), Player("b", cards=Hand("KsKc").cards)]
+        game = Poker(players, table_cards=Hand("QhQc2d").cards, rng=random.Random(seed), headless=True)
+        game.deal()
+        game.flop()
+        game.turn()
+        game.river()
+
+        dealt = game.table_cards + players[0].cards + players[1].cards
+        assert len(set(dealt)) == len(dealt) == 9
+        assert not cards_to_mask(game.remaining_deck) & cards_to_mask(dealt)
+
+
+def test_compile_action():
+    assert compile_action("fold") == (ActionType.FOLD, 0)
+    assert compile_action("Call") == (ActionType.CALL, 0)
+    assert compile_action("raise to 2.5") == (ActionType.RAISE, 250)
+    assert compile_action("raise to 2.5") is compile_action("raise to 2.5")
+    assert compile_action((3, 400)) == (ActionType.RAISE, 400)
+    for action in ["all in", "raise to", "raise to -1", "raise to x"]:
+        with pytest.raises(ValueError):
+            compile_action(action)
+
+
+@pytest.mark.parametrize("scripts", [
+    {"pre_flop": ["fold"], "post_flop": ["check"]},
+    {"pre_flop": ["raise to 5", "raise to 3"]},
+    {"pre_flop": ["call"], "post_flop": ["fold"], "river": ["check"]},
+])
+def test_validate_script_rejects_impossible_scripts(scripts):
+    player = Player("a", chips=10, **scripts)
+    with pytest.raises(ValueError):
+        validate_script(player, compile_script(player))
+
+    game = Poker([player, Player("b", chips=10, current_position="BB")], headless=True)
+    with pytest.raises(ValueError):
+        game.play_game()
+    assert player.cards == []
+
+
+def test_scripted_raise_over_the_stack_goes_all_in():
+    players = [
+        Player("A", chips=10, current_position="SB", pre_flop=["raise to 50"], cards=Hand("AhAd").cards),
+        Player("B", chips=100, current_position="BB", pre_flop=["call"], cards=Hand("7c2s").cards),
+    ]
+    a, b = players
+    log = EventLog()
+    game = Poker(players, table_cards=Hand("2h4c5s8d9h").cards, sink=log)
+    game.play_game()
+
+    adjusted = log.of_kind("raise_adjusted")[0]
+    assert (adjusted["player"], adjusted["requested"], adjusted["size"], adjusted["reason"]) == (a, 50, 10, "chips")
+    assert a.all_in_round == "pre-flop"
+    assert (a.chips, b.chips) == (20, 90)
+
+
+def test_betting_round_reopens_action_after_a_raise():
+    check_down = {"post_flop": ["check"], "turn": ["check"], "river": ["check"]}
+    players = [
+        Player("A", chips=100, current_position="SB", pre_flop=["raise to 9"], cards=Hand("AhAd").cards,
+               **check_down),
+        Player("B", chips=100, current_position="BB", pre_flop=["fold"], cards=Hand("7c2s").cards),
+        Player("C", chips=100, current_position="BTN", pre_flop=["raise to 3", "call"], cards=Hand("KhKd").cards,
+               **check_down),
+    ]
+    a, b, c = players
+    log = EventLog()
+    game = Poker(players, table_cards=Hand("2h4c5s8d9h").cards, sink=log)
+    game.play_game()
+
+    pre_flop_actions = log.of_kind("action")[:4]
+    assert [event["player"].name for event in pre_flop_actions] == ["C", "A", "B", "C"]
+    assert [player.name for player in game.players] == ["A", "C"]
+    assert (a.chips, b.chips, c.chips) == (110, 99, 91)
+
+
+def test_betting_round_ring():
+    players = [Player(name) for name in "abc"]
+    state = BettingRound(players, [10, 20, 30])
+
+    state.acted()
+    state.raised()
+    assert not state.closed and state.player_to_act() is players[2]
+    state.leave()
+    assert state.player_to_act() is players[0] and state.pending == 1
+    state.acted()
+    assert state.closed and state.size == 2
+    assert state.largest_matchable_stack() == 20
+    state.remove_stack(30)
+    assert state.largest_matchable_stack() == 10
+
+
+def test_betting_round_closes_with_one_player_left():
+    players = [Player(name) for name in "ab"]
+    state = BettingRound(players, [10, 20])
+    assert not state.closed
+    state.remove_stack(10)
+    state.leave()
+    assert state.closed and state.largest_matchable_stack() == 0
+
+
+def test_hand_ends_when_everyone_else_folds():
+    players = [
+        Player("A", chips=100, current_position="SB", pre_flop=["fold"]),
+        Player("B", chips=100, current_position="BB", pre_flop=["fold"]),
+        Player("C", chips=100, current_position="BTN", pre_flop=["fold"]),
+    ]
+    a, b, c = players
+    log = EventLog()
+    game = Poker(players, sink=log)
+    game.play_game()
+
+    assert [event["player"] for event in log.of_kind("action")] == [c, a]
+    assert game.players == [b] and game.table_cards == []
+    assert (a.chips, b.chips, c.chips) == (99.5, 100.5, 100)
+
+
+class CheckCallStrategy(Strategy):
+    def __init__(self):
+        self.decisions = []
+
+    def decide(self, decision):
+        self.decisions.append(decision)
+        return "check" if decision.to_call == 0 else "call"
+
+
+def test_interactive_poker_strategy():
+    check_down = {"post_flop": ["check"], "turn": ["check"], "river": ["check"]}
+    players = [
+        Player("A", chips=100, current_position="SB", pre_flop=["raise to 4"], cards=Hand("AhAd").cards,
+               **check_down),
+        Player("B", chips=100, current_position="BB", cards=Hand("KhKd").cards),
+    ]
+    a, b = players
+    bot = CheckCallStrategy()
+    game = InteractivePoker(players, strategies={b: bot}, table_cards=Hand("2h4c5s8d9h").cards, headless=True)
+    game.play_game()
+
+    first = bot.decisions[0]
+    assert (first.player, first.betting_round, first.to_call, first.current_bet) == (b, "pre-flop", 300, 400)
+    assert first.legal_actions == (ActionType.FOLD, ActionType.CALL, ActionType.RAISE)
+    assert (first.min_raise, first.max_raise) == (700, 10000)
+    assert [decision.betting_round for decision in bot.decisions] == ["pre-flop", "post-flop", "turn", "river"]
+    assert bot.decisions[1].board == tuple(game.table_cards[:3])
+    assert (a.chips, b.chips) == (104, 96)
+
+
+class RandomStrategy(Strategy):
+    def __init__(self, rng):
+        self.rng = rng
+
+    def decide(self, decision):
+        kind = self.rng.choice(decision.legal_actions)
+        if kind == ActionType.RAISE:
+            return kind, self.rng.randint(decision.min_raise, decision.max_raise)
+        return kind, 0
+
+
+def test_interactive_poker_random_legal_actions():
+    rng = random.Random(22)
+    for _ in range(300):
+        players = [Player(f"p{i}", chips=rng.choice([0.7, 3, 10, 100])) for i in range(rng.randint(2, 6))]
+        _, _, post_flop_order = Poker.position_map(len(players))
+        for player, position in zip(players, post_flop_order):
+            player.current_position = position
+        total = sum(player.chip_units for player in players)
+        strategies = {player: RandomStrategy(rng) for player in players}
+        game = InteractivePoker(list(players), strategies=strategies, rng=rng, headless=True)
+        game.play_game()
+
+        assert len(game.players) >= 1 and game.pot_units == 0
+        assert all(player.chip_units >= 0 for player in players)
+        assert sum(player.chip_units for player in players) == total
+
+
+def test_decision_without_opponents_only_checks_or_calls():
+    players = [Player("A", chips=10, current_position="SB"), Player("B", chips=10, current_position="BB")]
+    game = InteractivePoker(players, strategies={}, headless=True)
+    players[1].folded = True
+    decision = game.decision_state(players[0], "river", 0, BettingRound([players[0]], [1000]))
+
+    assert decision.legal_actions == (ActionType.CHECK,)
+    assert (decision.min_raise, decision.max_raise) == (0, 0)
+
+
+def test_interactive_poker_rejects_illegal_actions():
+    class Checker(Strategy):
+        def decide(self, decision):
+            return "check"
+
+    players = [
+        Player("A", chips=100, current_position="SB", pre_flop=["raise to 4"]),
+        Player("B", chips=100, current_position="BB"),
+    ]
+    game = InteractivePoker(players, strategies={players[1]: Checker()}, headless=True)
+    with pytest.raises(ValueError):
+        game.play_game()
+
+
+class ScriptedStrategy(Strategy):
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.decisions = []
+
+    def decide(self, decision):
+        self.decisions.append(decision)
+        return self.actions.pop(0)
+
+
+def test_reraise_is_at_least_the_last_raise():
+    players = [
+        Player("A", chips=100, current_position="SB"),
+        Player("B", chips=100, current_position="BB", pre_flop=["raise to 10"]),
+    ]
+    a, b = players
+    bot = ScriptedStrategy(["raise to 4", "call"])
+    game = InteractivePoker(players, strategies={a: bot}, headless=True)
+    game.betting_action("pre-flop")
+
+    opening, facing_reraise = bot.decisions
+    assert (opening.current_bet, opening.min_raise) == (100, 200)
+    assert (facing_reraise.current_bet, facing_reraise.min_raise) == (1000, 1600)
+
+    players = [
+        Player("A", chips=100, current_position="SB"),
+        Player("B", chips=100, current_position="BB", pre_flop=["raise to 10"]),
+    ]
+    game = InteractivePoker(players, strategies={players[0]: ScriptedStrategy(["raise to 4", "raise to 12"])},
+                            headless=True)
+    with pytest.raises(ValueError):
+        game.betting_action("pre-flop")
+
+
+def test_interactive_poker_original_call_form():
+    players = [
+        Player("A", chips=100, current_position="SB", pre_flop=["call"], post_flop=["check"], turn=["check"],
+               river=["check"]),
+        Player("B", chips=100, current_position="BB", pre_flop=["check"], post_flop=["check"], turn=["check"],
+               river=["check"]),
+    ]
+    game = InteractivePoker(2, 0, players, headless=True)
+    assert (game.num_players, game.num_bots, game.strategies) == (2, 0, {})
+    game.play_game()
+    assert sum(player.chips for player in players) == 200
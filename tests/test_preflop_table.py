@@ -0,0 +1,35 @@
+import math
+import pytest
+from src.equity import monte_carlo_equity
+from src.preflop_table import HAND_CLASSES, PreflopTable, build_preflop_table
+
+
+def sampled_equity(hands):
+    return monte_carlo_equity(hands, trials=4000, seed=1, workers=1)
+
+
+def test_hand_classes():
+    assert len(HAND_CLASSES) == len(set(HAND_CLASSES)) == 169
+    assert HAND_CLASSES[:2] == ["AA", "KK"]
+    assert HAND_CLASSES[13] == "AKs"
+
+
+def test_build_and_lookup(tmp_path):
+    path = str(tmp_path / "preflop.bin")
+    build_preflop_table(path, workers=1, equity_function=sampled_equity, hand_classes=["AA", "KK"])
+
+    with PreflopTable(path) as table:
+        assert table.class_equity("AA", "KK") == pytest.approx(0.82, abs=0.03)
+        assert table.class_equity("AA", "KK") + table.class_equity("KK", "AA") == pytest.approx(1)
+        assert table.combo_equity("AhAd", "KsKc") + table.combo_equity("KsKc", "AhAd") == pytest.approx(1)
+        assert table.combo_equity("AhAd", "KsKc") == table.combo_equity("AsAc", "KhKd")
+        assert math.isnan(table.combo_equity("AhAd", "AhKd"))
+        assert math.isnan(table.class_equity("AKs", "QQ"))
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\0" * 64)
+
+    with pytest.raises(ValueError):
+        PreflopTable(str(path))
@@ -0,0 +1,86 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from src.poker_main import DECK, Hand, LookupEvaluator, cards_to_mask
+from src.ranges import (HAND_CLASS_COMBOS, NUMBER_OF_COMBOS, Range, combo_index, expand_hand_classes,
+                        range_vs_range_equity)
+
+
+def test_hand_classes_cover_every_combo():
+    assert NUMBER_OF_COMBOS == 1326
+    assert len(HAND_CLASS_COMBOS) == 169
+    assert sum(len(combos) for combos in HAND_CLASS_COMBOS.values()) == 1326
+
+
+@pytest.mark.parametrize("token, hand_classes", [
+    ("TT+", ["TT", "JJ", "QQ", "KK", "AA"]),
+    ("AJs+", ["AJs", "AQs", "AKs"]),
+    ("KQo", ["KQo"]),
+    ("AK", ["AKs", "AKo"]),
+    ("22-44", ["22", "33", "44"]),
+    ("55-22", ["22", "33", "44", "55"]),
+    ("A2s-A4s", ["A2s", "A3s", "A4s"]),
+    ("A4o-A2o", ["A2o", "A3o", "A4o"]),
+])
+def test_expand_hand_classes(token, hand_classes):
+    assert expand_hand_classes(token) == hand_classes
+
+
+@pytest.mark.parametrize("token", ["A", "KAs", "XXs", "AK-QJ", "22-A5", "A2s-A5o"])
+def test_invalid_tokens(token):
+    with pytest.raises(ValueError):
+        expand_hand_classes(token)
+
+
+def test_parse_weighted_range():
+    hand_range = Range.from_string("TT+, AJs+, KQo, 76s:0.5, AhKh:0")
+
+    assert hand_range.number_of_combos == 30 + 12 - 1 + 12 + 2
+    assert Hand("AsKs").cards in hand_range
+    assert Hand("AhKh").cards not in hand_range
+    assert Hand("KhQs").cards in hand_range
+
+
+def test_card_removal():
+    hand_range = Range.from_string("AA, KK")
+    conditioned = hand_range.remove_cards(Hand("AhKsKd").cards)
+
+    assert conditioned.number_of_combos == 3 + 1
+    assert hand_range.number_of_combos == 12
+    assert conditioned.number_of_combos == Range(hand_range.weights * ~Range.blocked("AhKsKd")).number_of_combos
+
+
+@pytest.mark.parametrize("board", ["Ah7d7c2s9h", "Kh8h3c2d"])
+def test_range_vs_range_equity_matches_pairwise(board):
+    hero_range = Range.from_string("AK, 77, 98s, QhJh:0.5")
+    villain_range = Range.from_string("AA-QQ, AQ, T9s:0.25, 2c2d")
+    combo_equities, equity = range_vs_range_equity(hero_range, villain_range, board)
+
+    board_cards = Hand(board).cards
+    rivers = [[]] if len(board_cards) == 5 else [
+        [card] for card in DECK if not card.mask & cards_to_mask(board_cards)
+    ]
+    total_score = total_faced = 0.0
+    for hero_cards, hero_weight in hero_range.combos():
+        score = faced = 0.0
+        for river in rivers:
+            table_cards = board_cards + river
+            used_mask = cards_to_mask(table_cards + hero_cards)
+            if cards_to_mask(hero_cards) & cards_to_mask(table_cards):
+                continue
+            hero_strength = LookupEvaluator.evaluate(table_cards + hero_cards)
+            for villain_cards, villain_weight in villain_range.combos():
+                if cards_to_mask(villain_cards) & used_mask:
+                    continue
+                villain_strength = LookupEvaluator.evaluate(table_cards + villain_cards)
+                faced += villain_weight
+                score += villain_weight * (
+                    (hero_strength > villain_strength) + 0.5 * (hero_strength == villain_strength)
+                )
+        if faced:
+            assert combo_equities[combo_index(hero_cards)] == pytest.approx(score / faced)
+        total_score += hero_weight * score
+        total_faced += hero_weight * faced
+
+    assert equity == pytest.approx(total_score / total_faced)
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+from src.server import GameServer, bot_client, encode, load_test
+
+
+def test_load_test_over_tcp():
+    results = asyncio.run(load_test(tables=3, table_size=3, hands_per_table=4))
+    assert results["hands"] == 12
+    assert results["actions"] > 0
+    assert results["p99_latency_ms"] >= results["p50_latency_ms"] > 0
+
+
+def test_load_test_over_unix_socket(tmp_path):
+    results = asyncio.run(load_test(tables=2, table_size=2, hands_per_table=3, path=str(tmp_path / "poker.sock")))
+    assert results["hands"] == 6
+
+
+async def silent_table():
+    server = GameServer(table_size=2, hands_per_table=2, action_timeout=0.05, seed=1)
+    listener = await server.start()
+    port = listener.sockets[0].getsockname()[1]
+
+    # one client joins and never answers, every decision falls back to check or fold
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(encode({"join": "silent"}))
+    hands, messages = await asyncio.gather(bot_client("bot", port=port), read_messages(reader))
+    writer.close()
+    await server.close()
+    return hands, messages
+
+
+async def read_messages(reader):
+    messages = []
+    while True:
+        line = await reader.readline()
+        if not line:
+            return messages
+        messages.append(json.loads(line))
+
+
+def test_silent_client_times_out():
+    hands, messages = asyncio.run(silent_table())
+    kinds = [message["type"] for message in messages]
+    assert hands == 2
+    assert kinds[0] == "seated" and kinds[-1] == "closed"
+    assert kinds.count("result") == 2
+    acks = [message["action"] for message in messages if message["type"] == "ack"]
+    assert acks and set(acks) <= {"check", "fold"}
+    assert sum(message["chips"] for message in messages if message["type"] == "result") > 0
+
+
+class FailingServer(GameServer):
+    async def play_hand(self, table, seats, decision_ids):
+        if not self.failed_hands:
+            raise ValueError("engine error")
+        await super().play_hand(table, seats, decision_ids)
+
+
+async def failing_table():
+    server = FailingServer(table_size=2, hands_per_table=3, seed=2)
+    listener = await server.start()
+    port = listener.sockets[0].getsockname()[1]
+    hands = await asyncio.gather(bot_client("a", port=port), bot_client("b", port=port))
+    await server.close()
+    return server, hands
+
+
+def test_failed_hand_is_voided(caplog):
+    server, hands = asyncio.run(failing_table())
+    assert (server.failed_hands, server.hands_played) == (1, 2)
+    assert hands == [3, 3]
+    assert "failed and was voided" in caplog.text
+
+
+async def table_after_early_drop():
+    server = GameServer(table_size=3, hands_per_table=2, seed=3)
+    listener = await server.start()
+    port = listener.sockets[0].getsockname()[1]
+
+    # a client joins and disconnects before its table fills up
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(encode({"join": "dropped"}))
+    while not server.waiting:
+        await asyncio.sleep(0.01)
+    writer.close()
+    while server.waiting:
+        await asyncio.sleep(0.01)
+
+    hands = await asyncio.gather(*[bot_client(f"bot {i}", port=port) for i in range(3)])
+    await server.close()
+    return server, hands
+
+
+def test_client_dropping_while_queued_is_not_seated():
+    server, hands = asyncio.run(asyncio.wait_for(table_after_early_drop(), 10))
+    assert hands == [2, 2, 2]
+    assert (server.hands_played, server.failed_hands) == (2, 0)
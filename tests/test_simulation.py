@@ -0,0 +1,60 @@
+import pytest
+
+from src.poker_main import POSITIONS
+from src.simulation import RECORD_FIELDS, SimulationStats, simulate, simulate_chunk
+
+
+def test_simulation_conserves_chips():
+    stats = simulate(2, 30, number_of_players=4, seed=3, workers=1, chunk_size=10)
+    assert stats.hands == 60
+    assert sum(stats.seat_chips) == 0
+    assert sum(stats.position_chips) == 0
+    assert sum(stats.hand_class_hands) == 60 * 4
+    for position, hands, _, showdowns, wins in stats.position_table():
+        assert hands == 60
+        assert 0 <= wins <= showdowns <= 1
+
+
+def test_simulation_is_independent_of_workers():
+    single = simulate(3, 20, number_of_players=3, seed=7, workers=1, chunk_size=8)
+    pooled = simulate(3, 20, number_of_players=3, seed=7, workers=2, chunk_size=8)
+    assert single.seat_chips == pooled.seat_chips
+    assert single.position_table() == pooled.position_table()
+    assert single.hand_class_table() == pooled.hand_class_table()
+
+
+def test_simulate_chunk_records():
+    task = (0, 0, 0, 5, 5, 3, 100, {}, None, None)
+    number_of_hands, records = simulate_chunk(task)
+    assert number_of_hands == 5
+    assert len(records) == 5 * 3 * len(RECORD_FIELDS)
+    assert simulate_chunk(task)[1] == records
+
+    stats = SimulationStats(3)
+    stats.add(number_of_hands, records)
+    assert stats.hands == 5
+    assert sum(stats.seat_chips) == 0
+
+
+def test_simulation_with_strategies():
+    bots = pytest.importorskip("src.bots")
+    strategies = {0: bots.PotOddsStrategy(max_price=0.4, raise_fraction=0.5), 2: bots.PotOddsStrategy()}
+    single = simulate(2, 20, number_of_players=3, seed=5, workers=1, chunk_size=7, strategies=strategies)
+    pooled = simulate(2, 20, number_of_players=3, seed=5, workers=2, chunk_size=7, strategies=strategies)
+    scripted = simulate(2, 20, number_of_players=3, seed=5, workers=1, chunk_size=7)
+    assert single.hands == 40
+    assert sum(single.seat_chips) == 0
+    assert single.seat_chips == pooled.seat_chips
+    assert single.position_table() == pooled.position_table()
+    assert single.seat_chips != scripted.seat_chips
+
+    with pytest.raises(ValueError):
+        simulate(1, 5, number_of_players=3, workers=1, strategies={3: bots.PotOddsStrategy()})
+
+
+def test_short_last_chunk_continues_the_button():
+    # the last of three chunks of 4 hands holds hands 8 and 9 of the table, the button is on seat 8 % 3
+    number_of_hands, records = simulate_chunk((0, 0, 2, 4, 2, 3, 100, {}, None, None))
+    first_hand = [records[i:i + len(RECORD_FIELDS)] for i in range(0, 3 * len(RECORD_FIELDS), len(RECORD_FIELDS))]
+    button = next(seat for seat, position, _, _, _ in first_hand if POSITIONS[position] == "BTN")
+    assert (number_of_hands, button) == (2, 2)
@@ -0,0 +1,113 @@
+import random
+
+import pytest
+from src.poker_main import Card, EventLog, HandRanking, Player
+from src.table import PokerTable
+
+
+CHECK_DOWN = {"post-flop": ["check"], "turn": ["check"], "river": ["check"]}
+POSITION_ACTIONS = {
+    "SB": dict(CHECK_DOWN, **{"pre-flop": ["call"]}),
+    "BB": dict(CHECK_DOWN, **{"pre-flop": ["check"]}),
+    "BTN": dict(CHECK_DOWN, **{"pre-flop": ["call"]}),
+}
+
+
+def test_button_rotates_and_game_is_reused():
+    players = [Player(name, chips=100) for name in "abc"]
+    table = PokerTable(players, rng=random.Random(16), headless=True)
+
+    positions = []
+    table.play_session(1, POSITION_ACTIONS)
+    game = table.game
+    for _ in range(3):
+        positions.append(players[0].current_position)
+        table.play_session(1, POSITION_ACTIONS)
+        assert table.game is game
+
+    assert sorted(positions) == ["BB", "BTN", "SB"]
+    assert table.hands_played == 4
+    assert all(isinstance(player.hand_ranking, HandRanking) for player in players)
+
+
+def test_session_keeps_chips_and_state_flat():
+    players = [Player("a", chips=50), Player("b", chips=50)]
+    table = PokerTable(players, rng=random.Random(7), headless=True)
+
+    assert table.play_session(200, POSITION_ACTIONS) == 200
+    assert sum(player.chips for player in players) == pytest.approx(100)
+    assert len(table.game.remaining_deck) == 52 - 9
+    assert len(players[0].cards) == 2
+
+
+def test_scripted_hand_on_a_table():
+    players = [Player("a", chips=10), Player("b", chips=10)]
+    log = EventLog()
+    table = PokerTable(players, sink=log)
+
+    table.play_hand(
+        actions={players[1]: {"pre-flop": ["call"]}, players[0]: {"pre-flop": ["check"]}},
+        cards={players[0]: [Card("Ah"), Card("Ad")], players[1]: [Card("7c"), Card("2s")]},
+        table_cards=[Card("2h"), Card("4c"), Card("5s"), Card("8d"), Card("9h")],
+    )
+
+    assert (players[0].chips, players[1].chips) == (11, 9)
+    assert log.of_kind("payout")[0]["player"] is players[0]
+
+
+def test_short_stacks_post_what_they_have():
+    players = [Player("a", chips=0.3), Player("b", chips=10), Player("c", chips=8.9e-16)]
+    log = EventLog()
+    table = PokerTable(players, rng=random.Random(3), sink=log, button=1)
+
+    assert table.seated_players() == players[:2]
+    table.play_session(1, POSITION_ACTIONS)
+
+    assert [event["amount"] for event in log.of_kind("blind")] == [0.3, 1.0]
+    assert log.of_kind("all_in")[0]["player"] is players[0]
+    assert all(player.chip_units >= 0 for player in players)
+    assert sum(player.chip_units for player in players) == 1030
+
+
+def random_script(rng, chips):
+    """
+    A valid random script: no action after a fold and rising raises that fit the stack
+    """
+    script = {}
+    folded = False
+    for betting_round in ("pre-flop", "post-flop", "turn", "river"):
+        actions = []
+        last_raise = 0
+        for _ in range(rng.randint(0, 3)):
+            choice = rng.random()
+            if folded:
+                break
+            if choice < 0.2:
+                actions.append("fold")
+                folded = True
+            elif choice < 0.45:
+                actions.append("check")
+            elif choice < 0.75:
+                actions.append("call")
+            else:
+                sizes = [size for size in (2, 3, 4, 7.5, 12, 40) if last_raise < size <= chips]
+                if sizes:
+                    last_raise = rng.choice(sizes)
+                    actions.append(f"raise to {last_raise}")
+        script[betting_round] = actions
+    return script
+
+
+def test_random_sessions_conserve_chips():
+    for seed in range(200):
+        rng = random.Random(seed)
+        players = [Player(f"p{i}", chips=rng.choice([1.5, 4, 6, 10, 25])) for i in range(rng.randint(2, 6))]
+        total = sum(player.chip_units for player in players)
+        table = PokerTable(players, rng=rng, headless=True)
+        for _ in range(10):
+            seated = table.seated_players()
+            if len(seated) < 2:
+                break
+            table.play_hand(actions={player: random_script(rng, player.chips) for player in seated})
+            assert all(player.chip_units >= 0 for player in players)
+        assert sum(player.chip_units for player in players) == total